@@ -7,7 +7,6 @@ JMX XML 构建器
 
 import xml.etree.ElementTree as ET
 from datetime import datetime
-from xml.dom import minidom
 from typing import Any, Dict, List, Optional, Tuple
 
 
@@ -19,6 +18,51 @@ class AssertionTestType:
     NOT = "16"
 
 
+class TimerType:
+    """思考时间定时器类型 -> (JMeter 元素标签, guiclass, 默认名称)"""
+    CONSTANT = "constant"
+    UNIFORM = "uniform"
+    GAUSSIAN = "gaussian"
+    POISSON = "poisson"
+
+    ELEMENTS = {
+        CONSTANT: ("ConstantTimer", "ConstantTimerGui", "Constant Timer"),
+        UNIFORM: ("UniformRandomTimer", "UniformRandomTimerGui", "Uniform Random Timer"),
+        GAUSSIAN: ("GaussianRandomTimer", "GaussianRandomTimerGui", "Gaussian Random Timer"),
+        POISSON: ("PoissonRandomTimer", "PoissonRandomTimerGui", "Poisson Random Timer"),
+    }
+
+
+def _escape_pretty(text: str) -> str:
+    """与 minidom 写出时的转义一致（& < " > 四个字符）。"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+
+def _write_pretty(elem: ET.Element, out: List[str], indent: str) -> None:
+    """
+    单次遍历写出格式化 XML，输出与「ET.tostring → minidom 解析 → toprettyxml(indent="  ")」逐字节相同，
+    免去序列化两次并构建 DOM 的开销：只含文本的元素写在一行，其余子元素逐级缩进两个空格。
+    """
+    out.append(indent + "<" + elem.tag)
+    for name, value in elem.attrib.items():
+        out.append(f' {name}="{_escape_pretty(value)}"')
+    text = elem.text
+    if text:
+        # 解析 XML 时文本中的 \r\n、\r 会规范化为 \n
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if len(elem):
+        out.append(">\n")
+        if text:
+            out.append(indent + "  " + _escape_pretty(text) + "\n")
+        for child in elem:
+            _write_pretty(child, out, indent + "  ")
+        out.append(indent + "</" + elem.tag + ">\n")
+    elif text:
+        out.append(">" + _escape_pretty(text) + "</" + elem.tag + ">\n")
+    else:
+        out.append("/>\n")
+
+
 class JmxBuilder:
     """JMX XML 构建器"""
     
@@ -128,7 +172,9 @@ class JmxBuilder:
                         path: str, method: str = "GET", port: int = 80, protocol: str = "http",
                         parameters: Optional[List[Dict[str, Any]]] = None,
                         headers: Optional[Dict[str, str]] = None,
-                        body: Optional[str] = None) -> Tuple[ET.Element, ET.Element]:
+                        body: Optional[str] = None,
+                        form_fields: Optional[List[Tuple[str, str]]] = None,
+                        files: Optional[List[Dict[str, str]]] = None) -> Tuple[ET.Element, ET.Element]:
         """
         添加 HTTP 请求
 
@@ -143,6 +189,8 @@ class JmxBuilder:
             parameters: 查询参数列表
             headers: 请求头字典
             body: 请求体
+            form_fields: multipart/form-data 的文本字段 [(名称, 值)]；与 files 任一非空时按 multipart 发送，忽略 body
+            files: multipart/form-data 的文件字段 [{"path", "name", "mimetype"}]
 
         Returns:
             (HTTP 请求元素, 请求的 hashTree 元素)
@@ -157,17 +205,25 @@ class JmxBuilder:
 
         collection_prop = ET.SubElement(element_prop, "collectionProp", name="Arguments.arguments")
 
-        has_body = body and method.upper() in ['POST', 'PUT', 'PATCH']
+        accepts_body = method.upper() in ['POST', 'PUT', 'PATCH']
+        multipart = bool(form_fields or files) and accepts_body
+        has_body = body and accepts_body and not multipart
 
-        # 添加查询参数或拼接到 URL
-        if parameters and not has_body:
+        # 添加查询参数或拼接到 URL（Arguments 用于请求体时）
+        if parameters and not (has_body or multipart):
             self._add_query_parameters(collection_prop, parameters)
 
         actual_path = path
-        if parameters and has_body:
+        if parameters and (has_body or multipart):
             actual_path = self._build_path_with_query(path, parameters)
 
-        self._add_sampler_properties(http_sampler, domain, port, protocol, actual_path, method)
+        if multipart:
+            for field_name, field_value in form_fields or []:
+                self._add_argument(collection_prop, field_name, field_value)
+            if files:
+                self._add_files(http_sampler, files)
+
+        self._add_sampler_properties(http_sampler, domain, port, protocol, actual_path, method, multipart)
 
         # HTTPSamplerProxy 后面需要 hashTree
         http_sampler_hash_tree = ET.SubElement(parent_hash_tree, "hashTree")
@@ -194,13 +250,29 @@ class JmxBuilder:
             if not default_value:
                 default_value = self._generate_default_param_value(param)
 
-            element_prop_arg = ET.SubElement(collection_prop, "elementProp",
-                                            name=param_name, elementType="HTTPArgument")
-            self._set_prop(element_prop_arg, "stringProp", "Argument.name", param_name)
-            self._set_prop(element_prop_arg, "stringProp", "Argument.value", str(default_value))
-            self._set_prop(element_prop_arg, "stringProp", "Argument.metadata", "=")
-            self._set_prop(element_prop_arg, "boolProp", "HTTPArgument.always_encode", "false")
-            self._set_prop(element_prop_arg, "boolProp", "HTTPArgument.use_equals", "true")
+            self._add_argument(collection_prop, param_name, str(default_value))
+
+    def _add_argument(self, collection_prop: ET.Element, name: str, value: str) -> None:
+        """添加一个名称/值参数（查询参数或 multipart 文本字段）。"""
+        element_prop_arg = ET.SubElement(collection_prop, "elementProp",
+                                        name=name, elementType="HTTPArgument")
+        self._set_prop(element_prop_arg, "stringProp", "Argument.name", name)
+        self._set_prop(element_prop_arg, "stringProp", "Argument.value", value)
+        self._set_prop(element_prop_arg, "stringProp", "Argument.metadata", "=")
+        self._set_prop(element_prop_arg, "boolProp", "HTTPArgument.always_encode", "false")
+        self._set_prop(element_prop_arg, "boolProp", "HTTPArgument.use_equals", "true")
+
+    def _add_files(self, http_sampler: ET.Element, files: List[Dict[str, str]]) -> None:
+        """添加 multipart 上传的文件（HTTPsampler.Files），文件在 JMeter 运行时按路径读取。"""
+        files_prop = ET.SubElement(http_sampler, "elementProp", name="HTTPsampler.Files",
+                                   elementType="HTTPFileArgs")
+        collection_prop = ET.SubElement(files_prop, "collectionProp", name="HTTPFileArgs.files")
+        for file in files:
+            file_arg = ET.SubElement(collection_prop, "elementProp", name=file['path'],
+                                     elementType="HTTPFileArg")
+            self._set_prop(file_arg, "stringProp", "File.path", file['path'])
+            self._set_prop(file_arg, "stringProp", "File.paramname", file.get('name', ''))
+            self._set_prop(file_arg, "stringProp", "File.mimetype", file.get('mimetype') or 'application/octet-stream')
 
     def _build_path_with_query(self, path: str,
                                parameters: List[Dict[str, Any]]) -> str:
@@ -222,7 +294,7 @@ class JmxBuilder:
 
     def _add_sampler_properties(self, http_sampler: ET.Element, domain: str,
                                 port: int, protocol: str, path: str,
-                                method: str) -> None:
+                                method: str, multipart: bool = False) -> None:
         """添加 HTTPSamplerProxy 的标准属性。"""
         props = [
             ("stringProp", "HTTPSampler.domain", domain),
@@ -234,7 +306,7 @@ class JmxBuilder:
             ("boolProp", "HTTPSampler.follow_redirects", "true"),
             ("boolProp", "HTTPSampler.auto_redirects", "false"),
             ("boolProp", "HTTPSampler.use_keepalive", "true"),
-            ("boolProp", "HTTPSampler.DO_MULTIPART_POST", "false"),
+            ("boolProp", "HTTPSampler.DO_MULTIPART_POST", "true" if multipart else "false"),
             ("stringProp", "HTTPSampler.embedded_url_re", ""),
             ("stringProp", "HTTPSampler.connect_timeout", ""),
             ("stringProp", "HTTPSampler.response_timeout", ""),
@@ -338,6 +410,154 @@ class JmxBuilder:
 
         return assertion
     
+    def add_timer(self, parent_hash_tree: ET.Element, timer_type: str = TimerType.CONSTANT,
+                  delay: int = 0, random_range: float = 0) -> ET.Element:
+        """
+        添加思考时间定时器（作用于同一 hashTree 下的取样器，在取样器执行前等待）
+
+        Args:
+            parent_hash_tree: 父 hashTree 元素
+            timer_type: 定时器类型（constant/uniform/gaussian/poisson）
+            delay: 固定延迟（毫秒）；随机定时器中为偏移量
+            random_range: 随机部分（uniform 为最大随机值，gaussian 为标准差，poisson 为 lambda，单位毫秒）
+
+        Returns:
+            定时器元素
+        """
+        if timer_type not in TimerType.ELEMENTS:
+            raise ValueError(f"不支持的定时器类型: {timer_type}")
+
+        tag, guiclass, testname = TimerType.ELEMENTS[timer_type]
+        timer = ET.SubElement(parent_hash_tree, tag, guiclass=guiclass, testclass=tag,
+                              testname=testname, enabled="true")
+        self._set_prop(timer, "stringProp", "ConstantTimer.delay", str(int(delay)))
+        if timer_type != TimerType.CONSTANT:
+            self._set_prop(timer, "stringProp", "RandomTimer.range", str(float(random_range)))
+
+        # Timer 后面需要 hashTree
+        ET.SubElement(parent_hash_tree, "hashTree")
+
+        return timer
+
+    def add_pacing(self, parent_hash_tree: ET.Element, pacing_ms: int) -> ET.Element:
+        """
+        添加迭代节奏控制（pacing）：每个线程每次迭代的最短间隔
+
+        在线程组开头放置一个暂停时长为 0 的 Flow Control Action，并为其挂载
+        「仅当前线程」模式的 Constant Throughput Timer（吞吐量 = 60000 / pacing 次/分钟），
+        使每次迭代的起始时间间隔不小于 pacing_ms。
+
+        Args:
+            parent_hash_tree: 线程组的 hashTree 元素
+            pacing_ms: 迭代间隔（毫秒）
+
+        Returns:
+            Flow Control Action 元素
+        """
+        if pacing_ms <= 0:
+            raise ValueError("pacing 必须大于 0")
+
+        action = ET.SubElement(parent_hash_tree, "TestAction", guiclass="TestActionGui",
+                               testclass="TestAction", testname="Pacing", enabled="true")
+        # action=1 暂停，target=0 当前线程
+        self._set_prop(action, "intProp", "ActionProcessor.action", "1")
+        self._set_prop(action, "intProp", "ActionProcessor.target", "0")
+        self._set_prop(action, "stringProp", "ActionProcessor.duration", "0")
+        action_hash_tree = ET.SubElement(parent_hash_tree, "hashTree")
+
+        timer = ET.SubElement(action_hash_tree, "ConstantThroughputTimer", guiclass="TestBeanGUI",
+                              testclass="ConstantThroughputTimer", testname="Pacing Timer", enabled="true")
+        # calcMode=0: this thread only
+        self._set_prop(timer, "intProp", "calcMode", "0")
+        throughput = ET.SubElement(timer, "doubleProp")
+        ET.SubElement(throughput, "name").text = "throughput"
+        ET.SubElement(throughput, "value").text = repr(60000.0 / pacing_ms)
+        ET.SubElement(throughput, "savedValue").text = "0.0"
+        ET.SubElement(action_hash_tree, "hashTree")
+
+        return action
+
+    def add_once_only_controller(self, parent_hash_tree: ET.Element,
+                                 name: str = "Once Only Controller") -> Tuple[ET.Element, ET.Element]:
+        """
+        添加仅一次控制器：其中的取样器每个线程只在第一次迭代时执行（用于登录等会话初始化）
+
+        Args:
+            parent_hash_tree: 父 hashTree 元素（通常为线程组的 hashTree）
+            name: 控制器名称
+
+        Returns:
+            (控制器元素, 控制器的 hashTree 元素)
+        """
+        controller = ET.SubElement(parent_hash_tree, "OnceOnlyController",
+                                   guiclass="OnceOnlyControllerGui", testclass="OnceOnlyController",
+                                   testname=name, enabled="true")
+        controller_hash_tree = ET.SubElement(parent_hash_tree, "hashTree")
+        return controller, controller_hash_tree
+
+    def add_json_extractor(self, parent_hash_tree: ET.Element, name: str, ref_name: str,
+                           json_path: str, default_value: str = "", match_no: int = 1) -> ET.Element:
+        """
+        添加 JSON 提取器（JSONPostProcessor），将响应中的值保存为 JMeter 变量
+
+        Args:
+            parent_hash_tree: 取样器的 hashTree 元素
+            name: 提取器名称
+            ref_name: 变量名，后续请求中以 ${ref_name} 引用
+            json_path: JSONPath 表达式
+            default_value: 未匹配时的默认值
+            match_no: 匹配序号（0 随机，-1 全部，n 第 n 个）
+
+        Returns:
+            JSON 提取器元素
+        """
+        extractor = ET.SubElement(parent_hash_tree, "JSONPostProcessor",
+                                  guiclass="JSONPostProcessorGui", testclass="JSONPostProcessor",
+                                  testname=name, enabled="true")
+        self._set_prop(extractor, "stringProp", "JSONPostProcessor.referenceNames", ref_name)
+        self._set_prop(extractor, "stringProp", "JSONPostProcessor.jsonPathExprs", json_path)
+        self._set_prop(extractor, "stringProp", "JSONPostProcessor.match_numbers", str(match_no))
+        self._set_prop(extractor, "stringProp", "JSONPostProcessor.defaultValues", default_value)
+
+        # PostProcessor 后面需要 hashTree
+        ET.SubElement(parent_hash_tree, "hashTree")
+
+        return extractor
+
+    def add_regex_extractor(self, parent_hash_tree: ET.Element, name: str, ref_name: str,
+                            regex: str, template: str = "$1$", default_value: str = "",
+                            match_no: int = 1, use_headers: bool = False) -> ET.Element:
+        """
+        添加正则表达式提取器（RegexExtractor），将响应中的值保存为 JMeter 变量
+
+        Args:
+            parent_hash_tree: 取样器的 hashTree 元素
+            name: 提取器名称
+            ref_name: 变量名，后续请求中以 ${ref_name} 引用
+            regex: 正则表达式
+            template: 模板，$1$ 表示第一个分组
+            default_value: 未匹配时的默认值
+            match_no: 匹配序号（0 随机，-1 全部，n 第 n 个）
+            use_headers: True 时匹配响应头，否则匹配响应体
+
+        Returns:
+            正则表达式提取器元素
+        """
+        extractor = ET.SubElement(parent_hash_tree, "RegexExtractor",
+                                  guiclass="RegexExtractorGui", testclass="RegexExtractor",
+                                  testname=name, enabled="true")
+        self._set_prop(extractor, "stringProp", "RegexExtractor.useHeaders", "true" if use_headers else "false")
+        self._set_prop(extractor, "stringProp", "RegexExtractor.refname", ref_name)
+        self._set_prop(extractor, "stringProp", "RegexExtractor.regex", regex)
+        self._set_prop(extractor, "stringProp", "RegexExtractor.template", template)
+        self._set_prop(extractor, "stringProp", "RegexExtractor.default", default_value)
+        self._set_prop(extractor, "stringProp", "RegexExtractor.match_number", str(match_no))
+
+        # PostProcessor 后面需要 hashTree
+        ET.SubElement(parent_hash_tree, "hashTree")
+
+        return extractor
+
     def add_listener(self, parent_hash_tree: ET.Element, listener_type: str = "ViewResultsTree") -> ET.Element:
         """
         添加监听器
@@ -473,9 +693,9 @@ class JmxBuilder:
             raise ValueError("请先创建测试计划")
         
         if pretty:
-            rough_string = ET.tostring(self.root, encoding='utf-8')
-            reparsed = minidom.parseString(rough_string)
-            return reparsed.toprettyxml(indent="  ", encoding='utf-8').decode('utf-8')
+            out = ['<?xml version="1.0" encoding="utf-8"?>\n']
+            _write_pretty(self.root, out, "")
+            return "".join(out)
         else:
             return ET.tostring(self.root, encoding='utf-8').decode('utf-8')
     
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+容量建模：从多次压测结果（JTL）拟合 USL / Amdahl 模型
+
+每个 JTL 文件视为一次固定并发的压测，按 label 汇总出（并发数, 吞吐量）数据点，
+再用最小二乘拟合通用可扩展性定律（Universal Scalability Law）：
+
+    X(N) = λN / (1 + σ(N - 1) + κN(N - 1))
+
+σ 为争用系数（contention），κ 为一致性系数（coherency），κ = 0 时退化为 Amdahl 定律。
+输出每个 label 的系数、吞吐峰值对应的并发数，以及可直接传给 generate_jmx.py 的 num_threads。
+
+用法:
+    python capacity_model.py --input run_10.jtl run_20.jtl run_40.jtl --output capacity.json
+    python capacity_model.py --input run_a.jtl:10 run_b.jtl:20 run_c.jtl:40 --model amdahl
+"""
+
+import argparse
+import csv
+import json
+import logging
+import math
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Amdahl 模型没有吞吐峰值，推荐并发取吞吐达到渐近上限该比例时的并发数
+AMDAHL_SATURATION = 0.9
+
+# 拟合所需的最少数据点（USL 三个参数，Amdahl 两个参数）
+MIN_POINTS = {'usl': 3, 'amdahl': 2}
+
+
+def _split_input_spec(spec: str) -> Tuple[str, Optional[int]]:
+    """解析 `path[:concurrency]` 形式的输入，冒号后为显式指定的并发数。"""
+    path, sep, concurrency = spec.rpartition(':')
+    if sep and concurrency.isdigit() and path:
+        return path, int(concurrency)
+    return spec, None
+
+
+def read_jtl_points(file_path: str, concurrency: Optional[int] = None) -> Dict[str, Tuple[int, float]]:
+    """
+    从单个 JTL（CSV 格式）文件中按 label 统计并发数与吞吐量
+
+    Args:
+        file_path: JTL 文件路径
+        concurrency: 显式指定的并发数；为空时取 grpThreads（缺失则取 allThreads）的最大值
+
+    Returns:
+        {label: (并发数, 吞吐量 req/s)}
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"文件不存在: {file_path}")
+
+    # label -> [样本数, 最早开始时间, 最晚结束时间, 最大线程数]
+    stats: Dict[str, List[float]] = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or 'timeStamp' not in reader.fieldnames or 'label' not in reader.fieldnames:
+            raise ValueError(f"无法识别的 JTL 格式（需要 CSV 表头包含 timeStamp、label）: {file_path}")
+        for row in reader:
+            if row.get('success', 'true').strip().lower() != 'true':
+                continue
+            try:
+                start = int(row['timeStamp'])
+                end = start + int(row.get('elapsed') or 0)
+            except (TypeError, ValueError):
+                continue
+            threads = row.get('grpThreads') or row.get('allThreads') or '0'
+            try:
+                threads_num = int(threads)
+            except ValueError:
+                threads_num = 0
+
+            entry = stats.get(row['label'])
+            if entry is None:
+                stats[row['label']] = [1, start, end, threads_num]
+            else:
+                entry[0] += 1
+                entry[1] = min(entry[1], start)
+                entry[2] = max(entry[2], end)
+                entry[3] = max(entry[3], threads_num)
+
+    points: Dict[str, Tuple[int, float]] = {}
+    for label, (count, start, end, threads_num) in stats.items():
+        n = concurrency if concurrency is not None else int(threads_num)
+        duration = (end - start) / 1000.0
+        if n <= 0 or duration <= 0:
+            logger.warning("跳过 %s 中的 %s：无法确定并发数或压测时长", file_path, label)
+            continue
+        points[label] = (n, count / duration)
+    return points
+
+
+def collect_points(input_specs: List[str]) -> Dict[str, List[Tuple[int, float]]]:
+    """汇总多个 JTL 文件的数据点，同一 label 同一并发下取吞吐均值。"""
+    merged: Dict[str, Dict[int, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for spec in input_specs:
+        file_path, concurrency = _split_input_spec(spec)
+        for label, (n, throughput) in read_jtl_points(file_path, concurrency).items():
+            merged[label][n].append(throughput)
+
+    return {
+        label: sorted((n, sum(values) / len(values)) for n, values in by_n.items())
+        for label, by_n in merged.items()
+    }
+
+
+def fit_model(points: List[Tuple[int, float]], model: str = 'usl') -> Dict[str, Any]:
+    """
+    对单个 label 的数据点拟合 USL 或 Amdahl 模型
+
+    USL 可线性化为 N/X = a + b(N-1) + cN(N-1)，其中 λ = 1/a，σ = b/a，κ = c/a，
+    因此可以直接用 numpy.linalg.lstsq 求解，无需迭代优化。
+
+    Args:
+        points: [(并发数, 吞吐量)] 列表
+        model: usl 或 amdahl
+
+    Returns:
+        拟合结果字典（lambda、sigma、kappa、peak_concurrency、recommended_threads 等）
+    """
+    if np is None:
+        raise ImportError("容量建模需要安装 numpy: pip install numpy")
+    if model not in MIN_POINTS:
+        raise ValueError(f"不支持的模型: {model}")
+    if len(points) < MIN_POINTS[model]:
+        raise ValueError(f"{model} 模型至少需要 {MIN_POINTS[model]} 个不同并发的数据点，当前 {len(points)} 个")
+
+    n = np.array([p[0] for p in points], dtype=float)
+    x = np.array([p[1] for p in points], dtype=float)
+
+    columns = [np.ones_like(n), n - 1]
+    if model == 'usl':
+        columns.append(n * (n - 1))
+    coef, *_ = np.linalg.lstsq(np.column_stack(columns), n / x, rcond=None)
+    if model == 'amdahl':
+        coef = np.append(coef, 0.0)
+    a, b, c = (float(v) for v in coef)
+
+    # 负的一致性系数没有物理意义：退化为 Amdahl 重新拟合
+    if model == 'usl' and c < 0:
+        result = fit_model(points, 'amdahl')
+        result['model'] = 'usl'
+        return result
+    if a <= 0:
+        raise ValueError("拟合失败：数据点不满足单调的吞吐-并发关系")
+
+    lam = 1.0 / a
+    sigma = max(b / a, 0.0)
+    kappa = max(c / a, 0.0)
+
+    predicted = lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+    ss_res = float(np.sum((x - predicted) ** 2))
+    ss_tot = float(np.sum((x - x.mean()) ** 2))
+    r_squared = 1 - ss_res / ss_tot if ss_tot > 0 else 1.0
+
+    result: Dict[str, Any] = {
+        'model': model,
+        'points': [[int(p[0]), round(p[1], 3)] for p in points],
+        'lambda': lam,
+        'sigma': sigma,
+        'kappa': kappa,
+        'r_squared': r_squared,
+        'peak_concurrency': None,
+        'peak_throughput': None,
+        'recommended_threads': None,
+    }
+
+    if kappa > 0 and sigma < 1:
+        peak_n = math.sqrt((1 - sigma) / kappa)
+        result['peak_concurrency'] = peak_n
+        result['peak_throughput'] = lam * peak_n / (1 + sigma * (peak_n - 1) + kappa * peak_n * (peak_n - 1))
+        result['recommended_threads'] = max(1, int(math.floor(peak_n)))
+    elif 0 < sigma < 1:
+        # Amdahl：吞吐渐近上限为 λ/σ，取达到上限 AMDAHL_SATURATION 比例时的并发
+        result['peak_throughput'] = lam / sigma
+        saturation_n = AMDAHL_SATURATION * (1 - sigma) / (sigma * (1 - AMDAHL_SATURATION))
+        result['recommended_threads'] = max(1, int(math.ceil(saturation_n)))
+
+    return result
+
+
+def build_capacity_report(points_by_label: Dict[str, List[Tuple[int, float]]],
+                          model: str = 'usl') -> Dict[str, Any]:
+    """为每个 label 拟合模型，并给出整体推荐的 num_threads（各 label 推荐值中的最小值）。"""
+    labels: Dict[str, Any] = {}
+    for label in sorted(points_by_label):
+        try:
+            labels[label] = fit_model(points_by_label[label], model)
+        except ValueError as e:
+            logger.warning("跳过 %s：%s", label, e)
+
+    recommended = [r['recommended_threads'] for r in labels.values() if r['recommended_threads']]
+    return {
+        'model': model,
+        'num_threads': min(recommended) if recommended else None,
+        'labels': labels,
+    }
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s', stream=sys.stderr)
+
+    parser = argparse.ArgumentParser(description="从多次压测结果拟合 USL/Amdahl 容量模型")
+    parser.add_argument("--input", required=True, nargs='+',
+                        help="JTL 结果文件，可用 path:并发数 显式指定并发")
+    parser.add_argument("--output", default=None, help="输出容量模型 JSON 路径（缺省输出到标准输出）")
+    parser.add_argument("--model", choices=sorted(MIN_POINTS), default='usl', help="拟合模型")
+    args = parser.parse_args()
+
+    try:
+        points = collect_points(args.input)
+        report = build_capacity_report(points, args.model)
+    except (FileNotFoundError, ValueError, ImportError) as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    if not report['labels']:
+        logger.error("没有可拟合的 label：每个 label 需要多个不同并发的数据点")
+        sys.exit(1)
+
+    for label, result in report['labels'].items():
+        peak = result['peak_concurrency']
+        logger.info("%s: σ=%.4f κ=%.6f 峰值并发=%s 推荐线程数=%s",
+                    label, result['sigma'], result['kappa'],
+                    f"{peak:.1f}" if peak else "-", result['recommended_threads'] or "-")
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+        logger.info("容量模型已保存: %s", args.output)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
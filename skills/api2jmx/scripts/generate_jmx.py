@@ -6,30 +6,163 @@
 用法:
     python generate_jmx.py --input endpoints.json --output test.jmx
     python generate_jmx.py --input endpoints.json --output perf.jmx --threads 50 --ramp 30 --loops 5
+    python generate_jmx.py --input collection.json --format postman --output test.jmx
+    python generate_jmx.py --input commands.sh --format curl --output test.jmx
+    python generate_jmx.py --input endpoints.json --output perf.jmx --think-time gaussian:3000:500 --pacing 10000
+    python generate_jmx.py --input endpoints.json --output perf.jmx --watch
+
+输入、选项与脚本均未变化时跳过生成（记录在输出目录的 .build-manifest.json），--force 强制重新生成。
+
+--watch 生成后常驻，按（大小, mtime）轮询输入文件，保存后在同一进程内重新生成：
+模块不再重复导入，未变化的线程组（端点或场景及其线程数、定时器等输入均相同）直接复用上次构建的元素，
+生成结果与上次相同时不改写输出文件；输入保存到一半或格式错误时只输出错误，等待下一次保存。
 """
 
 import argparse
 import json
 import logging
+import os
 import sys
+import time
 from pathlib import Path
+from typing import Optional
 
 try:
-    from .generator import JmxGenerator
+    from .build_cache import BuildCache
+    from .generator import THINK_TIME_RANGE_KEYS, JmxGenerator, normalize_think_time
+    from .parsers import CurlParser, PostmanParser
 except ImportError:
-    from generator import JmxGenerator
+    from build_cache import BuildCache
+    from generator import THINK_TIME_RANGE_KEYS, JmxGenerator, normalize_think_time
+    from parsers import CurlParser, PostmanParser
 
 logger = logging.getLogger(__name__)
 
+# --watch 的默认轮询间隔（秒）
+DEFAULT_WATCH_INTERVAL = 0.2
+
+
+def _load_endpoints_data(input_path: str, input_format: str) -> dict:
+    """读取输入文件并转换为 endpoints.json 结构。"""
+    if input_format == "postman":
+        parser = PostmanParser()
+        endpoints = parser.parse(input_path)
+        return {"base_url": parser.get_base_url(), "endpoints": endpoints}
+    if input_format == "curl":
+        parser = CurlParser()
+        endpoints = parser.parse(input_path)
+        return {"base_url": parser.get_base_url(), "endpoints": endpoints}
+    return json.loads(Path(input_path).read_text(encoding="utf-8"))
+
+
+def parse_think_time(value: str) -> dict:
+    """解析 --think-time 参数：none | constant:延迟 | uniform|gaussian|poisson:延迟:随机部分（毫秒）。"""
+    parts = value.split(":")
+    timer_type = parts[0].lower()
+    spec = {"type": timer_type}
+    if len(parts) > 1:
+        spec["delay"] = parts[1]
+    if len(parts) > 2 and timer_type in THINK_TIME_RANGE_KEYS:
+        spec[THINK_TIME_RANGE_KEYS[timer_type]] = parts[2]
+    try:
+        normalize_think_time(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return spec
+
+
+def _generate(args: argparse.Namespace, generator: JmxGenerator) -> Optional[str]:
+    """读取输入并生成 JMX，返回 XML 字符串；输入无效时记录错误并返回 None。"""
+    try:
+        endpoints_data = _load_endpoints_data(args.input, args.format)
+    except json.JSONDecodeError as e:
+        logger.error("JSON 格式无效 - %s", e)
+        return None
+    except ValueError as e:
+        logger.error("%s", e)
+        return None
+
+    if not endpoints_data.get("endpoints") and not endpoints_data.get("scenarios"):
+        logger.error("endpoints 为空")
+        return None
+
+    # 生成 JMX
+    try:
+        return generator.generate_from_endpoints(
+            endpoints_data,
+            test_plan_name=args.name,
+            num_threads=args.threads,
+            ramp_time=args.ramp,
+            loops=args.loops,
+            think_time=args.think_time,
+            pacing=args.pacing,
+        )
+    except ValueError as e:
+        logger.error("%s", e)
+        return None
+
+
+def _input_stamp(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _watch(args: argparse.Namespace, cache: BuildCache) -> None:
+    """监视模式：同一个生成器实例常驻，线程组缓存跨次生成保留。"""
+    generator = JmxGenerator()
+    generator.thread_group_cache = {}
+    output_path = Path(args.output)
+    previous = output_path.read_text(encoding="utf-8") if output_path.exists() else None
+    stamp = None
+    print(f"正在监视 {args.input}（Ctrl+C 退出）", flush=True)
+    try:
+        while True:
+            current = _input_stamp(args.input)
+            if current is not None and current != stamp:
+                stamp = current
+                start = time.perf_counter()
+                # 缓存只保留本次用到的线程组，生成前已在缓存中的即为复用的线程组
+                previous_keys = set(generator.thread_group_cache)
+                xml = _generate(args, generator)
+                if xml is None:
+                    print("输入无效，等待下次保存", flush=True)
+                elif xml == previous:
+                    cache.record()
+                    print(f"未变化：{args.output}", flush=True)
+                else:
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    output_path.write_text(xml, encoding="utf-8")
+                    previous = xml
+                    cache.record()
+                    reused = len(previous_keys.intersection(generator.thread_group_cache))
+                    print(f"[{time.strftime('%H:%M:%S')}] 已生成：{args.output}（复用 "
+                          f"{reused}/{len(generator.thread_group_cache)} 个线程组，"
+                          f"{(time.perf_counter() - start) * 1000:.0f}ms）", flush=True)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("已停止监视")
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="从 endpoints.json 生成 JMX 测试脚本")
     parser.add_argument("--input", required=True, help="endpoints.json 文件路径")
+    parser.add_argument("--format", choices=["endpoints", "postman", "curl"], default="endpoints",
+                        help="输入格式：endpoints.json（默认）、Postman Collection v2.1 或 curl 命令文件")
     parser.add_argument("--output", required=True, help="输出 JMX 文件路径")
     parser.add_argument("--name", default=None, help="测试计划名称")
     parser.add_argument("--threads", type=int, default=None, help="线程数")
     parser.add_argument("--ramp", type=int, default=None, help="启动时间（秒）")
     parser.add_argument("--loops", type=int, default=None, help="循环次数")
+    parser.add_argument("--think-time", type=parse_think_time, default=None,
+                        help="默认思考时间（毫秒）：none、constant:500、uniform:300:400、gaussian:300:100、poisson:300:200")
+    parser.add_argument("--pacing", type=int, default=None, help="默认迭代间隔（毫秒），每个线程每次迭代的最短间隔")
+    parser.add_argument("--force", action="store_true", help="输入与选项未变化时也重新生成")
+    parser.add_argument("--watch", action="store_true", help="生成后持续监视输入文件，保存后增量重新生成")
+    parser.add_argument("--interval", type=float, default=DEFAULT_WATCH_INTERVAL,
+                        help=f"--watch 的轮询间隔（秒，默认 {DEFAULT_WATCH_INTERVAL:g}）")
     args = parser.parse_args()
 
     # 读取 endpoints.json
@@ -38,26 +171,22 @@ def main() -> None:
         logger.error("文件不存在 - %s", args.input)
         sys.exit(1)
 
-    try:
-        endpoints_data = json.loads(input_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as e:
-        logger.error("JSON 格式无效 - %s", e)
-        sys.exit(1)
-
-    if not endpoints_data.get("endpoints"):
-        logger.error("endpoints 为空")
-        sys.exit(1)
+    options = {key: value for key, value in vars(args).items()
+               if key not in ("input", "output", "force", "watch", "interval")}
+    cache = BuildCache(args.output, [args.input], options)
+    if args.watch:
+        _watch(args, cache)
+        return
+    if not args.force and cache.is_fresh():
+        print(f"未变化，跳过：{args.output}")
+        return
 
-    # 生成 JMX
     generator = JmxGenerator()
-    generator.generate_from_endpoints(
-        endpoints_data,
-        test_plan_name=args.name,
-        num_threads=args.threads,
-        ramp_time=args.ramp,
-        loops=args.loops,
-    )
-    generator.save_jmx(args.output)
+    xml = _generate(args, generator)
+    if xml is None:
+        sys.exit(1)
+    generator.save_jmx(xml, args.output)
+    cache.record()
 
 
 if __name__ == "__main__":
@@ -7,26 +7,66 @@ JMX 测试脚本生成器
 
 import json
 import logging
+import threading
 import xml.etree.ElementTree as ET
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
 try:
-    from .builder import AssertionTestType, JmxBuilder
-    from .parsers import MarkdownParser, OpenApiParser
+    from .builder import AssertionTestType, JmxBuilder, TimerType
+    from .parsers import CurlParser, MarkdownParser, OpenApiParser, PostmanParser
 except ImportError:
-    from builder import AssertionTestType, JmxBuilder
-    from parsers import MarkdownParser, OpenApiParser
+    from builder import AssertionTestType, JmxBuilder, TimerType
+    from parsers import CurlParser, MarkdownParser, OpenApiParser, PostmanParser
 
 logger = logging.getLogger(__name__)
 
+# 随机定时器中表示随机部分的字段名（uniform 为最大随机值，gaussian 为标准差，poisson 为 lambda）
+THINK_TIME_RANGE_KEYS = {
+    TimerType.UNIFORM: 'range',
+    TimerType.GAUSSIAN: 'deviation',
+    TimerType.POISSON: 'lambda',
+}
+
+
+def normalize_think_time(spec: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    校验并规范化思考时间配置
+
+    Args:
+        spec: 如 {"type": "gaussian", "delay": 300, "deviation": 100}；None 或 type=none 表示不加定时器
+
+    Returns:
+        {"type", "delay", "range"}，或 None
+
+    Raises:
+        ValueError: 类型不支持或数值非法
+    """
+    if not spec:
+        return None
+    timer_type = str(spec.get('type', TimerType.CONSTANT)).lower()
+    if timer_type == 'none':
+        return None
+    if timer_type not in TimerType.ELEMENTS:
+        raise ValueError(f"不支持的思考时间类型: {timer_type}（可选 constant/uniform/gaussian/poisson/none）")
+    try:
+        delay = int(spec.get('delay', 0))
+        random_range = float(spec.get(THINK_TIME_RANGE_KEYS.get(timer_type, ''), 0) or 0)
+    except (TypeError, ValueError):
+        raise ValueError(f"思考时间数值无效: {spec}") from None
+    if delay < 0 or random_range < 0:
+        raise ValueError(f"思考时间不能为负数: {spec}")
+    return {'type': timer_type, 'delay': delay, 'range': random_range}
+
 
 class JmxGenerator:
     """JMX 测试脚本生成器"""
 
     def __init__(self):
-        self.builder = JmxBuilder()
-        self.base_url = ""
-        self.endpoints = []
+        # 生成过程只使用局部状态，同一实例可被多个线程并发调用
+        # 设为字典时按线程组的全部输入缓存已构建的元素，再次生成时未变化的线程组直接复用（监视模式）
+        self.thread_group_cache: Optional[Dict[str, List[ET.Element]]] = None
+        self._cache_lock = threading.Lock()
     
     def generate_from_openapi(self, openapi_file: str,
                              test_plan_name: str = "API Test Plan",
@@ -48,9 +88,8 @@ class JmxGenerator:
         """
         parser = OpenApiParser()
         parser.parse(openapi_file)
-        self.endpoints = parser.get_endpoints()
-        self.base_url = parser.get_base_url()
-        return self._generate_jmx(test_plan_name, num_threads, ramp_time, loops)
+        return self._generate_jmx(parser.get_endpoints(), parser.get_base_url(),
+                                  test_plan_name, num_threads, ramp_time, loops)
 
     def generate_from_markdown(self, markdown_file: str,
                               test_plan_name: str = "API Test Plan",
@@ -71,15 +110,65 @@ class JmxGenerator:
             JMX XML 字符串
         """
         parser = MarkdownParser()
-        self.endpoints = parser.parse(markdown_file)
-        self.base_url = parser.get_base_url()
-        return self._generate_jmx(test_plan_name, num_threads, ramp_time, loops)
+        endpoints = parser.parse(markdown_file)
+        return self._generate_jmx(endpoints, parser.get_base_url(),
+                                  test_plan_name, num_threads, ramp_time, loops)
+
+    def generate_from_postman(self, collection_file: str,
+                              test_plan_name: str = "API Test Plan",
+                              num_threads: int = 1,
+                              ramp_time: int = 1,
+                              loops: int = 1,
+                              variables: Optional[Dict[str, str]] = None) -> str:
+        """
+        从 Postman Collection v2.1 生成 JMX 测试脚本
+
+        Args:
+            collection_file: Postman Collection JSON 文件路径
+            test_plan_name: 测试计划名称
+            num_threads: 线程数
+            ramp_time: 启动时间（秒）
+            loops: 循环次数
+            variables: 覆盖集合变量（如环境变量）
+
+        Returns:
+            JMX XML 字符串
+        """
+        parser = PostmanParser()
+        endpoints = parser.parse(collection_file, variables)
+        return self._generate_jmx(endpoints, parser.get_base_url(),
+                                  test_plan_name, num_threads, ramp_time, loops)
+
+    def generate_from_curl(self, curl_file: str,
+                           test_plan_name: str = "API Test Plan",
+                           num_threads: int = 1,
+                           ramp_time: int = 1,
+                           loops: int = 1) -> str:
+        """
+        从 curl 命令文件（可包含多条命令）生成 JMX 测试脚本
+
+        Args:
+            curl_file: 包含 curl 命令的文本文件路径
+            test_plan_name: 测试计划名称
+            num_threads: 线程数
+            ramp_time: 启动时间（秒）
+            loops: 循环次数
+
+        Returns:
+            JMX XML 字符串
+        """
+        parser = CurlParser()
+        endpoints = parser.parse(curl_file)
+        return self._generate_jmx(endpoints, parser.get_base_url(),
+                                  test_plan_name, num_threads, ramp_time, loops)
 
     def generate_from_endpoints(self, endpoints_data: dict,
                                 test_plan_name: Optional[str] = None,
                                 num_threads: Optional[int] = None,
                                 ramp_time: Optional[int] = None,
-                                loops: Optional[int] = None) -> str:
+                                loops: Optional[int] = None,
+                                think_time: Optional[Dict[str, Any]] = None,
+                                pacing: Optional[int] = None) -> str:
         """
         从 endpoints 数据字典生成 JMX 测试脚本
 
@@ -89,48 +178,203 @@ class JmxGenerator:
             num_threads: 线程数（覆盖 JSON 中的值）
             ramp_time: 启动时间（覆盖 JSON 中的值）
             loops: 循环次数（覆盖 JSON 中的值）
+            think_time: 默认思考时间（覆盖 JSON 顶层的值，端点/场景自身的 think_time 仍然优先）
+            pacing: 默认迭代间隔毫秒（覆盖 JSON 顶层的值，端点/场景自身的 pacing 仍然优先）
 
         Returns:
             JMX XML 字符串
         """
-        self.endpoints = endpoints_data.get('endpoints', [])
-        self.base_url = endpoints_data.get('base_url', '')
-
         # CLI 参数优先于 JSON 中的值
         plan_name = test_plan_name or endpoints_data.get('test_plan_name', 'API Test Plan')
         threads = num_threads if num_threads is not None else endpoints_data.get('num_threads', 1)
         ramp = ramp_time if ramp_time is not None else endpoints_data.get('ramp_time', 1)
         loop_count = loops if loops is not None else endpoints_data.get('loops', 1)
+        default_think_time = think_time if think_time is not None else endpoints_data.get('think_time')
+        default_pacing = pacing if pacing is not None else endpoints_data.get('pacing')
+
+        return self._generate_jmx(endpoints_data.get('endpoints', []), endpoints_data.get('base_url', ''),
+                                  plan_name, threads, ramp, loop_count,
+                                  default_think_time, default_pacing,
+                                  endpoints_data.get('scenarios'))
+
+    def _generate_jmx(self, endpoints: List[Dict[str, Any]], base_url: str,
+                      test_plan_name: str, num_threads: int,
+                      ramp_time: int, loops: int,
+                      think_time: Optional[Dict[str, Any]] = None,
+                      pacing: Optional[int] = None,
+                      scenarios: Optional[List[Dict[str, Any]]] = None) -> str:
+        """
+        生成 JMX 测试脚本的核心逻辑（供各 generate_from_* 方法共用）
 
-        return self._generate_jmx(plan_name, threads, ramp, loop_count)
-
-    def _generate_jmx(self, test_plan_name: str, num_threads: int,
-                      ramp_time: int, loops: int) -> str:
-        """生成 JMX 测试脚本的核心逻辑（供 generate_from_openapi/generate_from_markdown 共用）。"""
-        url_parts = self._parse_url(self.base_url)
+        定义了 scenarios 时每个场景生成一个线程组，endpoints 仅作为场景步骤可引用的接口定义；
+        否则每个端点生成一个线程组。构建器与输入都是本次调用的局部变量，可重入。
+        """
+        url_parts = self._parse_url(base_url)
 
-        # 创建新的 builder 实例（每次生成都创建新的）
-        self.builder = JmxBuilder()
+        # 每次生成都使用新的 builder，不与其他调用共享
+        builder = JmxBuilder()
+        used_keys: List[str] = []
 
         # 创建测试计划
-        self.builder.create_test_plan(test_plan_name, {
-            'base_url': self.base_url
+        builder.create_test_plan(test_plan_name, {
+            'base_url': base_url
         })
 
-        # 为每个端点创建线程组和请求
-        for endpoint in self.endpoints:
-            self._add_endpoint(endpoint, url_parts, num_threads, ramp_time, loops)
-
-        return self.builder.to_xml_string()
+        if scenarios:
+            # 显式指定 threads 的场景不参与按 weight 分配
+            allocated = self._weighted_threads([{} if s.get('threads') else s for s in scenarios], num_threads)
+            for scenario, weighted in zip(scenarios, allocated):
+                threads = scenario.get('threads') or weighted
+                timing = {
+                    'think_time': scenario.get('think_time', think_time),
+                    'pacing': scenario.get('pacing', pacing),
+                }
+                # 场景步骤可引用 endpoints，端点定义也是线程组的输入
+                self._add_thread_group_cached(
+                    builder, used_keys, ['scenario', scenario, endpoints, url_parts, threads, ramp_time, loops, timing],
+                    lambda: self._add_scenario(builder, scenario, endpoints, url_parts,
+                                               threads, ramp_time, loops, timing))
+        else:
+            # 端点带 weight 时，num_threads 视为总线程数，按权重分配到各线程组
+            allocated = self._weighted_threads(endpoints, num_threads)
+
+            # 为每个端点创建线程组和请求
+            for endpoint, threads in zip(endpoints, allocated):
+                timing = {
+                    'think_time': endpoint.get('think_time', think_time),
+                    'pacing': endpoint.get('pacing', pacing),
+                }
+                self._add_thread_group_cached(
+                    builder, used_keys, ['endpoint', endpoint, url_parts, threads, ramp_time, loops, timing],
+                    lambda: self._add_endpoint(builder, endpoint, url_parts, threads, ramp_time, loops, timing))
+
+        self._prune_thread_group_cache(used_keys)
+        return builder.to_xml_string()
+
+    def _add_thread_group_cached(self, builder: JmxBuilder, used_keys: List[str], inputs: List[Any],
+                                 build: Callable[[], None]) -> None:
+        """
+        未启用缓存时直接构建；否则以线程组的全部输入为键，命中时把缓存的元素（线程组及其 hashTree）
+        直接挂到本次的测试计划下。生成后不再修改已构建的元素，多棵树共享同一子树是安全的；
+        缓存字典的读写持锁，构建本身不持锁，并发生成互不阻塞。
+        """
+        cache = self.thread_group_cache
+        if cache is None:
+            build()
+            return
+        key = json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str)
+        used_keys.append(key)
+        with self._cache_lock:
+            cached = cache.get(key)
+        if cached is not None:
+            builder.hash_tree.extend(cached)
+            return
+        start = len(builder.hash_tree)
+        build()
+        with self._cache_lock:
+            cache[key] = list(builder.hash_tree)[start:]
+
+    def _prune_thread_group_cache(self, used_keys: List[str]) -> None:
+        """只保留本次生成用到的线程组，缓存大小不随编辑次数增长。"""
+        if self.thread_group_cache is not None:
+            kept = set(used_keys)
+            with self._cache_lock:
+                for key in [key for key in self.thread_group_cache if key not in kept]:
+                    del self.thread_group_cache[key]
+
+    @staticmethod
+    def _weighted_threads(items: List[Dict[str, Any]], num_threads: int) -> List[int]:
+        """
+        按 weight 占比用最大余数法把 num_threads 分配给带 weight 的端点（或场景），合计等于 num_threads；
+        无 weight 的项使用 num_threads。
 
-    def _add_endpoint(self, endpoint: Dict[str, Any], url_parts: Dict[str, Any],
-                      num_threads: int, ramp_time: int, loops: int) -> None:
-        """为单个端点创建线程组、HTTP 请求和断言。"""
+        每个线程组至少 1 个线程：份额不足 1 的线程组从超出份额最多的线程组借出；
+        带 weight 的线程组多于 num_threads 时无法借出，合计超过 num_threads 并记录警告。
+        """
+        weights = [item.get('weight') or 0 for item in items]
+        total = sum(weights)
+        if total <= 0:
+            return [num_threads] * len(items)
+        weighted = [i for i, weight in enumerate(weights) if weight > 0]
+        quotas = [num_threads * weight / total for weight in weights]
+        counts = [int(quota) for quota in quotas]
+        # 余下的线程按小数部分从大到小各加 1（相同时按原顺序）
+        for i in sorted(weighted, key=lambda i: counts[i] - quotas[i])[:num_threads - sum(counts)]:
+            counts[i] += 1
+        for i in weighted:
+            if counts[i]:
+                continue
+            counts[i] = 1
+            donors = [j for j in weighted if counts[j] > 1]
+            if donors:
+                counts[max(donors, key=lambda j: counts[j] - quotas[j])] -= 1
+        assigned = sum(counts[i] for i in weighted)
+        if assigned > num_threads:
+            logger.warning("带 weight 的线程组有 %d 个，每个至少 1 个线程，合计 %d 个线程，超过 num_threads=%d",
+                           len(weighted), assigned, num_threads)
+        return [counts[i] if weights[i] > 0 else num_threads for i in range(len(items))]
+
+    def _add_endpoint(self, builder: JmxBuilder, endpoint: Dict[str, Any], url_parts: Dict[str, Any],
+                      num_threads: int, ramp_time: int, loops: int,
+                      timing: Optional[Dict[str, Any]] = None) -> None:
+        """为单个端点创建线程组、HTTP 请求、断言以及思考时间/节奏定时器。"""
+        timing = timing or {}
         thread_group_name = f"{endpoint['method']} {endpoint['path']}"
-        thread_group, thread_group_hash_tree = self.builder.add_thread_group(
+        thread_group, thread_group_hash_tree = builder.add_thread_group(
             thread_group_name, num_threads, ramp_time, loops
         )
+        if timing.get('pacing'):
+            builder.add_pacing(thread_group_hash_tree, int(timing['pacing']))
+
+        self._add_sampler(builder, thread_group_hash_tree, endpoint, url_parts, timing.get('think_time'))
 
+    def _add_scenario(self, builder: JmxBuilder, scenario: Dict[str, Any],
+                      endpoints: List[Dict[str, Any]], url_parts: Dict[str, Any],
+                      num_threads: int, ramp_time: int, loops: int,
+                      timing: Optional[Dict[str, Any]] = None) -> None:
+        """
+        为场景创建线程组：登录请求放在仅一次控制器中（每个线程只登录一次），
+        其后按顺序添加各步骤；场景 headers 合并到每个步骤（不作用于登录请求）。
+        """
+        timing = timing or {}
+        thread_group, thread_group_hash_tree = builder.add_thread_group(
+            scenario.get('name') or 'Scenario', num_threads, ramp_time, loops
+        )
+        if timing.get('pacing'):
+            builder.add_pacing(thread_group_hash_tree, int(timing['pacing']))
+
+        if scenario.get('login'):
+            login = self._resolve_step(endpoints, scenario['login'])
+            _, once_only_hash_tree = builder.add_once_only_controller(thread_group_hash_tree, "Login")
+            self._add_sampler(builder, once_only_hash_tree, login, url_parts, login.get('think_time'))
+
+        scenario_headers = scenario.get('headers') or {}
+        for step in scenario.get('steps', []):
+            step = self._resolve_step(endpoints, step)
+            self._add_sampler(builder, thread_group_hash_tree, step, url_parts,
+                              step.get('think_time', timing.get('think_time')), scenario_headers)
+
+    @staticmethod
+    def _resolve_step(endpoints: List[Dict[str, Any]], step: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        解析场景步骤：带 ref 时引用 endpoints 中的接口（"METHOD /path" 或接口 name），
+        步骤中的其余字段覆盖被引用接口的同名字段。
+        """
+        ref = step.get('ref')
+        if ref:
+            base = next((e for e in endpoints
+                         if ref in (f"{e.get('method', '').upper()} {e.get('path')}", e.get('name'))), None)
+            if base is None:
+                raise ValueError(f"场景步骤引用的接口不存在: {ref}")
+            step = {**base, **{k: v for k, v in step.items() if k != 'ref'}}
+        if not step.get('path') or not step.get('method'):
+            raise ValueError(f"场景步骤缺少 path 或 method: {step}")
+        return step
+
+    def _add_sampler(self, builder: JmxBuilder, parent_hash_tree: ET.Element, endpoint: Dict[str, Any],
+                     url_parts: Dict[str, Any], think_time: Optional[Dict[str, Any]] = None,
+                     extra_headers: Optional[Dict[str, str]] = None) -> None:
+        """添加单个 HTTP 请求及其断言、提取器和思考时间定时器。"""
         # 添加 HTTP 请求
         path = url_parts.get('base_path', '') + endpoint['path']
         method = endpoint['method']
@@ -145,25 +389,31 @@ class JmxGenerator:
             param_name = param.get('name', '')
             path = path.replace(f"{{{param_name}}}", str(param.get('default', param_name)))
 
-        # 准备请求体
+        # 准备请求体（multipart/form-data 交由 JMeter 按字段与文件组装）
         request_body = None
+        multipart = None
         if endpoint.get('requestBody'):
-            request_body = self._extract_request_body(endpoint['requestBody'])
+            multipart = self._extract_multipart(endpoint['requestBody'])
+            if multipart is None:
+                request_body = self._extract_request_body(endpoint['requestBody'])
 
-        # 构建请求头
-        headers: Dict[str, str] = {}
+        # 构建请求头（接口自身的 header 参数优先于场景 headers）
+        headers: Dict[str, str] = dict(extra_headers or {})
         for param in header_params:
             param_name = param.get('name', '')
             param_value = param.get('default', '')
             if param_name and param_value:
                 headers[param_name] = param_value
         if request_body and method.upper() in ['POST', 'PUT', 'PATCH']:
-            if 'Content-Type' not in headers:
-                headers['Content-Type'] = 'application/json'
+            if 'content-type' not in {k.lower() for k in headers}:
+                headers['Content-Type'] = self._request_content_type(endpoint['requestBody'])
+        if multipart:
+            # Content-Type 由 JMeter 生成（含 boundary），显式指定的值缺少 boundary
+            headers = {k: v for k, v in headers.items() if k.lower() != 'content-type'}
 
         # 添加 HTTP 请求（返回 http_sampler 和它的 hashTree）
-        http_sampler, http_sampler_hash_tree = self.builder.add_http_request(
-            thread_group_hash_tree,
+        http_sampler, http_sampler_hash_tree = builder.add_http_request(
+            parent_hash_tree,
             name=f"{method} {path}",
             domain=url_parts.get('domain', 'localhost'),
             path=path,
@@ -172,11 +422,48 @@ class JmxGenerator:
             protocol=url_parts.get('protocol', 'http'),
             parameters=query_params,
             headers=headers or None,
-            body=request_body
+            body=request_body,
+            form_fields=multipart[0] if multipart else None,
+            files=multipart[1] if multipart else None
         )
 
         # 添加断言（放在 http_sampler 的 hashTree 中）
-        self._add_assertions(http_sampler_hash_tree, endpoint)
+        self._add_assertions(builder, http_sampler_hash_tree, endpoint)
+        self._add_extractors(builder, http_sampler_hash_tree, endpoint.get('extractors', []))
+
+        # 思考时间定时器只作用于当前取样器
+        self._add_think_time(builder, http_sampler_hash_tree, think_time)
+
+    def _add_extractors(self, builder: JmxBuilder, parent_hash_tree: ET.Element,
+                        extractors: List[Dict[str, Any]]) -> None:
+        """按 extractors 定义添加 JSON / 正则提取器，供后续请求以 ${name} 引用。"""
+        for extractor in extractors:
+            extractor_type = extractor.get('type', 'json_path')
+            ref_name = extractor.get('name')
+            if extractor_type not in ('json_path', 'regex'):
+                raise ValueError(f"不支持的提取器类型: {extractor_type}（可选 json_path/regex）")
+            expression = extractor.get(extractor_type)
+            if not ref_name or not expression:
+                raise ValueError(f"提取器缺少 name 或 {extractor_type}: {extractor}")
+            default_value = str(extractor.get('default', ''))
+            match_no = int(extractor.get('match_no', 1))
+            if extractor_type == 'json_path':
+                builder.add_json_extractor(
+                    parent_hash_tree, f"Extract {ref_name}", ref_name,
+                    expression, default_value, match_no)
+            else:
+                builder.add_regex_extractor(
+                    parent_hash_tree, f"Extract {ref_name}", ref_name,
+                    expression, extractor.get('template', '$1$'), default_value,
+                    match_no, bool(extractor.get('use_headers', False)))
+
+    def _add_think_time(self, builder: JmxBuilder, parent_hash_tree: ET.Element,
+                        spec: Optional[Dict[str, Any]]) -> None:
+        """按思考时间配置添加对应的 JMeter 定时器。"""
+        think_time = normalize_think_time(spec)
+        if think_time:
+            builder.add_timer(parent_hash_tree, think_time['type'],
+                              think_time['delay'], think_time['range'])
 
     def _parse_url(self, url: str) -> Dict[str, Any]:
         """解析 URL"""
@@ -234,8 +521,54 @@ class JmxGenerator:
                     return json.dumps(example, ensure_ascii=False)
                 # 如果没有 example，尝试从 schema 生成
                 return json.dumps(self._generate_example_from_schema(schema), ensure_ascii=False)
-        
+
+            # 非 JSON 请求体（表单、XML、纯文本）：直接使用 example
+            for media_type, media in content.items():
+                example = (media or {}).get('example')
+                if example is None:
+                    continue
+                if isinstance(example, dict) and 'x-www-form-urlencoded' in media_type:
+                    return urlencode(example)
+                return example if isinstance(example, str) else json.dumps(example, ensure_ascii=False)
+
         return None
+
+    @staticmethod
+    def _extract_multipart(request_body: Dict[str, Any]) -> Optional[Tuple[List[Tuple[str, str]],
+                                                                         List[Dict[str, str]]]]:
+        """
+        提取 multipart/form-data 请求体的 (文本字段, 文件字段)；不是带 example 的 multipart 请求体时返回 None。
+
+        schema 中 format 为 binary 的字段视为文件，example 中的值为文件路径，encoding.contentType 为文件类型；
+        值为列表时逐个添加同名字段。
+        """
+        media = ((request_body or {}).get('content') or {}).get('multipart/form-data')
+        example = (media or {}).get('example')
+        if not isinstance(example, dict) or not example:
+            return None
+        properties = (media.get('schema') or {}).get('properties') or {}
+        encoding = media.get('encoding') or {}
+        fields: List[Tuple[str, str]] = []
+        files: List[Dict[str, str]] = []
+        for name, value in example.items():
+            schema = properties.get(name) or {}
+            if schema.get('type') == 'array':
+                schema = schema.get('items') or {}
+            for item in value if isinstance(value, list) else [value]:
+                if schema.get('format') == 'binary':
+                    files.append({'path': str(item), 'name': name,
+                                  'mimetype': (encoding.get(name) or {}).get('contentType', '')})
+                else:
+                    fields.append((name, item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)))
+        return fields, files
+
+    @staticmethod
+    def _request_content_type(request_body: Dict[str, Any]) -> str:
+        """请求体对应的 Content-Type（优先 application/json）。"""
+        content = (request_body or {}).get('content') or {}
+        if 'application/json' in content or not content:
+            return 'application/json'
+        return next(iter(content))
     
     def _generate_example_from_schema(self, schema: Dict[str, Any]) -> Any:
         """从 schema 生成示例数据"""
@@ -261,7 +594,7 @@ class JmxGenerator:
         else:
             return None
     
-    def _add_assertions(self, parent_hash_tree: ET.Element, endpoint: Dict[str, Any]) -> None:
+    def _add_assertions(self, builder: JmxBuilder, parent_hash_tree: ET.Element, endpoint: Dict[str, Any]) -> None:
         """添加断言
 
         - 优先使用显式 assertions 数组（支持 status_code / json_path / response_contains）
@@ -270,17 +603,17 @@ class JmxGenerator:
         explicit_assertions: Optional[List[Dict[str, Any]]] = endpoint.get('assertions')
 
         if explicit_assertions is not None:
-            self._add_explicit_assertions(parent_hash_tree, explicit_assertions)
+            self._add_explicit_assertions(builder, parent_hash_tree, explicit_assertions)
         else:
-            self._add_auto_assertions(parent_hash_tree, endpoint)
+            self._add_auto_assertions(builder, parent_hash_tree, endpoint)
 
-    def _add_explicit_assertions(self, parent_hash_tree: ET.Element,
+    def _add_explicit_assertions(self, builder: JmxBuilder, parent_hash_tree: ET.Element,
                                  assertions: List[Dict[str, Any]]) -> None:
         """根据显式 assertions 数组生成断言。"""
         for assertion in assertions:
             a_type = assertion.get('type', '')
             if a_type == 'status_code':
-                self.builder.add_response_assertion(
+                builder.add_response_assertion(
                     parent_hash_tree,
                     name="Response Code Assertion",
                     field_to_test="Assertion.response_code",
@@ -290,7 +623,7 @@ class JmxGenerator:
             elif a_type == 'json_path':
                 json_path = assertion.get('json_path', '$')
                 expected = assertion.get('expected_value')
-                self.builder.add_json_path_assertion(
+                builder.add_json_path_assertion(
                     parent_hash_tree,
                     name=f"JSONPath Assertion - {json_path}",
                     json_path=json_path,
@@ -298,7 +631,7 @@ class JmxGenerator:
                 )
             elif a_type == 'response_contains':
                 contains = assertion.get('contains', '')
-                self.builder.add_response_assertion(
+                builder.add_response_assertion(
                     parent_hash_tree,
                     name=f"Response Contains - {contains}",
                     field_to_test="Assertion.response_data",
@@ -306,11 +639,11 @@ class JmxGenerator:
                     pattern=contains
                 )
 
-    def _add_auto_assertions(self, parent_hash_tree,
+    def _add_auto_assertions(self, builder: JmxBuilder, parent_hash_tree,
                              endpoint: Dict[str, Any]) -> None:
         """自动生成断言（向后兼容模式）。"""
         # 状态码 200 断言
-        self.builder.add_response_assertion(
+        builder.add_response_assertion(
             parent_hash_tree,
             name="Response Code Assertion",
             field_to_test="Assertion.response_code",
@@ -328,22 +661,23 @@ class JmxGenerator:
             for i, key in enumerate(example):
                 if i >= 10:
                     break
-                self.builder.add_json_path_assertion(
+                builder.add_json_path_assertion(
                     parent_hash_tree,
                     name=f"JSONPath Assertion - $.{key}",
                     json_path=f"$.{key}",
                     expected_value=None
                 )
     
-    def save_jmx(self, file_path: str, pretty: bool = True) -> None:
+    def save_jmx(self, xml: str, file_path: str) -> None:
         """
         保存 JMX 文件
         
         Args:
+            xml: generate_* 返回的 JMX XML 字符串
             file_path: 文件路径
-            pretty: 是否格式化输出
         """
-        self.builder.save(file_path, pretty)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(xml)
         logger.info("JMX 文件已保存: %s", file_path)
 
 
@@ -352,8 +686,8 @@ if __name__ == "__main__":
     generator = JmxGenerator()
     # 示例：从 OpenAPI 文档生成
     # xml = generator.generate_from_openapi("openapi.yaml")
-    # generator.save_jmx("test_plan.jmx")
+    # generator.save_jmx(xml, "test_plan.jmx")
     
     # 示例：从 Markdown 文档生成
     # xml = generator.generate_from_markdown("api_doc.md")
-    # generator.save_jmx("test_plan.jmx")
+    # generator.save_jmx(xml, "test_plan.jmx")
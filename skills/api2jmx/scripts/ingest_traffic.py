@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+从生产流量（HAR / nginx combined 日志）推导 endpoints.json 工作负载模型
+
+流式读取 HAR 文件或 nginx combined 格式访问日志（支持 .gz），不把整个文件载入内存：
+- 用路径前缀树把具体 URL 聚类为模板（/users/123 → /users/{id}）
+- 统计每个模板的到达率、权重、请求/响应大小、状态码分布
+- 按客户端统计相邻请求间隔，得到思考时间分布
+- 输出带 weight 和 load_profile 的 endpoints.json，供 generate_jmx.py 使用
+
+用法:
+    python ingest_traffic.py --input access.log --output endpoints.json
+    python ingest_traffic.py --input session.har --output endpoints.json --base-url https://api.example.com
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import math
+import random
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = '{id}'
+
+# 每个统计对象保留的思考时间样本上限（蓄水池抽样）
+THINK_TIME_SAMPLES = 1000
+
+# 每个路径只从前若干个请求中采样查询参数
+QUERY_SAMPLES = 10
+
+# 默认忽略的静态资源后缀
+STATIC_SUFFIXES = ('.js', '.css', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico',
+                   '.woff', '.woff2', '.ttf', '.map', '.webp')
+
+# 明显是标识符的路径段：纯数字、UUID、长十六进制串、含数字的长随机串
+_ID_SEGMENT = re.compile(
+    r'^(?:\d+'
+    r'|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+    r'|[0-9a-fA-F]{16,}'
+    r'|(?=[A-Za-z0-9_-]*\d)[A-Za-z0-9_-]{20,})$'
+)
+
+# nginx combined 格式，末尾可选 $request_time（秒）
+_NGINX_LINE = re.compile(
+    r'(?P<ip>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<target>\S+)[^"]*" (?P<status>\d{3}) (?P<bytes>\d+|-)'
+    r'(?: "[^"]*" "(?P<agent>[^"]*)")?(?: (?P<request_time>\d+(?:\.\d+)?))?'
+)
+
+_MONTHS = {m: i for i, m in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+_HAR_ENTRIES = re.compile(r'(?<!\\)"entries"\s*:\s*\[')
+
+
+# ---------------------------------------------------------------------------
+# 输入读取
+# ---------------------------------------------------------------------------
+
+def _open_text(file_path: str) -> IO[str]:
+    """打开文本文件，.gz 后缀自动解压。"""
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, 'rt', encoding='utf-8', errors='replace')
+    return open(file_path, 'r', encoding='utf-8', errors='replace')
+
+
+def _detect_format(file_path: str) -> str:
+    """根据后缀或首个非空字符判断输入格式。"""
+    name = file_path[:-3] if file_path.endswith('.gz') else file_path
+    if name.endswith('.har'):
+        return 'har'
+    with _open_text(file_path) as f:
+        head = f.read(64).lstrip()
+    return 'har' if head.startswith('{') else 'nginx'
+
+
+def _iter_json_array(f: IO[str], pattern: 're.Pattern[str]', chunk_size: int = 1 << 20) -> Iterator[Any]:
+    """
+    流式迭代 JSON 文件中某个数组的元素
+
+    先定位数组起始（pattern 需匹配到 `[`），之后用 raw_decode 逐个解码元素，
+    缓冲区只保留尚未解码的部分；元素跨越缓冲区边界时继续读入下一块。
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    while True:
+        match = pattern.search(buf)
+        if match:
+            buf = buf[match.end():]
+            break
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        # 保留末尾一小段，避免键名被块边界截断
+        buf = buf[-64:] + chunk
+
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buf) and buf[pos] == ']':
+            return
+        try:
+            if pos >= len(buf):
+                raise ValueError
+            item, end = decoder.raw_decode(buf, pos)
+        except ValueError as e:
+            if eof:
+                raise ValueError(f"JSON 数组不完整或格式无效: {e}") from None
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            chunk_size *= 2 if len(buf) > chunk_size else 1
+            continue
+        yield item
+        pos = end
+
+
+def _parse_iso_time(value: str) -> Optional[float]:
+    """解析 HAR 的 ISO 8601 时间为 epoch 秒。"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def iter_har_requests(file_path: str) -> Iterator[Dict[str, Any]]:
+    """流式读取 HAR 的 log.entries，产出统一的请求记录。"""
+    with _open_text(file_path) as f:
+        for entry in _iter_json_array(f, _HAR_ENTRIES):
+            request = entry.get('request') or {}
+            response = entry.get('response') or {}
+            url = request.get('url')
+            if not url:
+                continue
+            post_text = (request.get('postData') or {}).get('text')
+            request_bytes = request.get('bodySize', -1)
+            if (request_bytes is None or request_bytes < 0) and post_text is not None:
+                request_bytes = len(post_text.encode('utf-8'))
+            response_bytes = response.get('bodySize', -1)
+            if response_bytes is None or response_bytes < 0:
+                response_bytes = (response.get('content') or {}).get('size', -1)
+            yield {
+                'time': _parse_iso_time(entry.get('startedDateTime', '')),
+                'client': entry.get('pageref') or '',
+                'method': request.get('method', 'GET').upper(),
+                'url': url,
+                'status': response.get('status'),
+                'request_bytes': request_bytes if request_bytes is not None and request_bytes >= 0 else None,
+                'response_bytes': response_bytes if response_bytes is not None and response_bytes >= 0 else None,
+                'elapsed_ms': entry.get('time'),
+                'body': post_text,
+            }
+
+
+def _parse_clf_time(value: str) -> Optional[float]:
+    """解析 `10/Oct/2000:13:55:36 -0700` 为 epoch 秒（手写解析，比 strptime 快一个数量级）。"""
+    try:
+        day, month, year = int(value[0:2]), _MONTHS[value[3:6]], int(value[7:11])
+        hour, minute, second = int(value[12:14]), int(value[15:17]), int(value[18:20])
+        sign = -1 if value[21] == '-' else 1
+        offset = sign * (int(value[22:24]) * 60 + int(value[24:26]))
+    except (IndexError, KeyError, ValueError):
+        return None
+    tz = timezone(timedelta(minutes=offset))
+    return datetime(year, month, day, hour, minute, second, tzinfo=tz).timestamp()
+
+
+def iter_nginx_requests(file_path: str) -> Iterator[Dict[str, Any]]:
+    """逐行读取 nginx combined 日志，产出统一的请求记录。"""
+    last_time_str, last_time = None, None
+    skipped = 0
+    with _open_text(file_path) as f:
+        for line in f:
+            match = _NGINX_LINE.match(line)
+            if not match:
+                skipped += 1
+                continue
+            # 同一秒内的日志行时间字符串相同，缓存上一次的解析结果
+            time_str = match.group('time')
+            if time_str != last_time_str:
+                last_time_str, last_time = time_str, _parse_clf_time(time_str)
+            size = match.group('bytes')
+            request_time = match.group('request_time')
+            yield {
+                'time': last_time,
+                'client': f"{match.group('ip')} {match.group('agent') or ''}",
+                'method': match.group('method'),
+                'url': match.group('target'),
+                'status': int(match.group('status')),
+                'request_bytes': None,
+                'response_bytes': int(size) if size != '-' else None,
+                'elapsed_ms': float(request_time) * 1000 if request_time else None,
+                'body': None,
+            }
+    if skipped:
+        logger.warning("%s 中有 %d 行无法解析为 combined 格式，已跳过", file_path, skipped)
+
+
+# ---------------------------------------------------------------------------
+# 统计
+# ---------------------------------------------------------------------------
+
+class _Stats:
+    """单个（方法, 路径）的流式统计量。"""
+
+    __slots__ = ('count', 'request_bytes', 'request_n', 'response_bytes', 'response_n',
+                 'elapsed', 'elapsed_n', 'statuses', 'think', 'think_seen', 'query', 'body', 'sample_path')
+
+    def __init__(self, sample_path: str):
+        self.count = 0
+        self.request_bytes = 0
+        self.request_n = 0
+        self.response_bytes = 0
+        self.response_n = 0
+        self.elapsed = 0.0
+        self.elapsed_n = 0
+        self.statuses: Counter = Counter()
+        self.think: List[float] = []
+        self.think_seen = 0
+        self.query: Dict[str, str] = {}
+        self.body: Optional[str] = None
+        self.sample_path = sample_path
+
+    def add_think(self, gap_ms: float, rng: random.Random) -> None:
+        """蓄水池抽样记录思考时间，内存占用与请求量无关。"""
+        self.think_seen += 1
+        if len(self.think) < THINK_TIME_SAMPLES:
+            self.think.append(gap_ms)
+        else:
+            slot = int(rng.random() * self.think_seen)
+            if slot < THINK_TIME_SAMPLES:
+                self.think[slot] = gap_ms
+
+    def merge(self, other: '_Stats', rng: random.Random) -> None:
+        self.count += other.count
+        self.request_bytes += other.request_bytes
+        self.request_n += other.request_n
+        self.response_bytes += other.response_bytes
+        self.response_n += other.response_n
+        self.elapsed += other.elapsed
+        self.elapsed_n += other.elapsed_n
+        self.statuses.update(other.statuses)
+        for key, value in other.query.items():
+            self.query.setdefault(key, value)
+        if self.body is None:
+            self.body = other.body
+        self.think_seen += other.think_seen
+        self.think.extend(other.think)
+        if len(self.think) > THINK_TIME_SAMPLES:
+            self.think = rng.sample(self.think, THINK_TIME_SAMPLES)
+
+
+def _normalize_segments(path: str) -> Tuple[str, ...]:
+    """拆分路径段，明显的标识符段直接替换为占位符以限制基数。"""
+    return tuple([PLACEHOLDER if seg.isdigit() or _ID_SEGMENT.match(seg) else seg
+                  for seg in path.split('/') if seg])
+
+
+class PathTrie:
+    """
+    路径前缀树：把同一位置上取值过多的路径段折叠为占位符
+
+    同一父节点下的不同子段数超过 max_variants 时，认为该位置是参数，
+    把所有子树合并到占位符节点下。
+    """
+
+    def __init__(self, max_variants: int = 20):
+        self.max_variants = max_variants
+        self.root: Dict[str, dict] = {}
+
+    def insert(self, segments: Tuple[str, ...]) -> None:
+        node = self.root
+        for seg in segments:
+            node = node.setdefault(seg, {})
+
+    @staticmethod
+    def _merge(dst: Dict[str, dict], src: Dict[str, dict]) -> None:
+        stack = [(dst, src)]
+        while stack:
+            d, s = stack.pop()
+            for seg, child in s.items():
+                if seg in d:
+                    stack.append((d[seg], child))
+                else:
+                    d[seg] = child
+
+    def collapse(self) -> None:
+        """自顶向下折叠高基数位置。"""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            literals = [seg for seg in node if seg != PLACEHOLDER]
+            if len(literals) > self.max_variants:
+                merged = node.setdefault(PLACEHOLDER, {})
+                for seg in literals:
+                    self._merge(merged, node.pop(seg))
+            stack.extend(node.values())
+
+    def template(self, segments: Tuple[str, ...]) -> Tuple[str, ...]:
+        """返回路径在折叠后的树中对应的模板段。"""
+        node = self.root
+        result = []
+        for seg in segments:
+            if seg in node:
+                result.append(seg)
+                node = node[seg]
+            elif PLACEHOLDER in node:
+                result.append(PLACEHOLDER)
+                node = node[PLACEHOLDER]
+            else:
+                result.append(seg)
+                node = {}
+        return tuple(result)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(math.ceil(q * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def _think_time_summary(samples: List[float], seen: int) -> Optional[Dict[str, Any]]:
+    """思考时间分布摘要（毫秒）。"""
+    if not samples:
+        return None
+    values = sorted(samples)
+    mean = sum(values) / len(values)
+    variance = sum((v - mean) ** 2 for v in values) / len(values)
+    return {
+        'count': seen,
+        'mean_ms': round(mean),
+        'stdev_ms': round(math.sqrt(variance)),
+        'p50_ms': round(_percentile(values, 0.5)),
+        'p90_ms': round(_percentile(values, 0.9)),
+        'p99_ms': round(_percentile(values, 0.99)),
+    }
+
+
+class WorkloadModel:
+    """流式聚合请求记录，最终生成 endpoints.json 结构。"""
+
+    def __init__(self, max_variants: int = 20, session_gap: float = 1800.0,
+                 include_static: bool = False):
+        self.session_gap_ms = session_gap * 1000
+        self.include_static = include_static
+        self.trie = PathTrie(max_variants)
+        self.stats: Dict[Tuple[str, Tuple[str, ...]], _Stats] = {}
+        self.hosts: Counter = Counter()
+        self.last_seen: Dict[str, float] = {}
+        self.global_think = _Stats('')
+        self.first_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+        self.total = 0
+        self._rng = random.Random(0)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        url = record['url']
+        if url.startswith('/'):
+            # 访问日志中的请求目标只有路径和查询串，跳过完整的 URL 解析
+            path, _, query = url.partition('?')
+        else:
+            parts = urlsplit(url)
+            path, query = parts.path or '/', parts.query
+            if parts.netloc:
+                self.hosts[f"{parts.scheme or 'http'}://{parts.netloc}"] += 1
+        if not self.include_static and path.lower().endswith(STATIC_SUFFIXES):
+            return
+
+        segments = _normalize_segments(path)
+        key = (record['method'], segments)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = _Stats(path)
+            self.trie.insert(segments)
+
+        stats.count += 1
+        self.total += 1
+        if record['request_bytes'] is not None:
+            stats.request_bytes += record['request_bytes']
+            stats.request_n += 1
+        if record['response_bytes'] is not None:
+            stats.response_bytes += record['response_bytes']
+            stats.response_n += 1
+        if record['elapsed_ms'] is not None:
+            stats.elapsed += record['elapsed_ms']
+            stats.elapsed_n += 1
+        if record['status'] is not None:
+            stats.statuses[str(record['status'])] += 1
+        if query and stats.count <= QUERY_SAMPLES:
+            for name, value in parse_qsl(query, keep_blank_values=True):
+                stats.query.setdefault(name, value)
+        if stats.body is None and record['body']:
+            stats.body = record['body']
+
+        ts = record['time']
+        if ts is None:
+            return
+        self.first_time = ts if self.first_time is None else min(self.first_time, ts)
+        self.last_time = ts if self.last_time is None else max(self.last_time, ts)
+        previous = self.last_seen.get(record['client'])
+        self.last_seen[record['client']] = ts
+        if previous is not None:
+            gap_ms = (ts - previous) * 1000
+            if 0 <= gap_ms <= self.session_gap_ms:
+                stats.add_think(gap_ms, self._rng)
+                self.global_think.add_think(gap_ms, self._rng)
+
+    def _templates(self) -> Dict[Tuple[str, Tuple[str, ...]], _Stats]:
+        """把具体路径统计合并到新的模板统计，不修改 self.stats（可多次调用，之后仍可继续 add）。"""
+        self.trie.collapse()
+        merged: Dict[Tuple[str, Tuple[str, ...]], _Stats] = {}
+        # 思考时间抽样使用独立的随机数，多次调用结果相同
+        rng = random.Random(0)
+        # 按请求量从大到小合并，模板的示例路径取最常见的具体路径
+        for (method, segments), stats in sorted(self.stats.items(), key=lambda kv: -kv[1].count):
+            key = (method, self.trie.template(segments))
+            if key not in merged:
+                merged[key] = _Stats(stats.sample_path)
+            merged[key].merge(stats, rng)
+        return merged
+
+    def to_endpoints(self, base_url: Optional[str] = None, min_count: int = 1) -> Dict[str, Any]:
+        """生成 endpoints.json 数据。"""
+        templates = self._templates()
+        duration = (self.last_time - self.first_time) if self.first_time is not None else 0.0
+        total = sum(s.count for s in templates.values() if s.count >= min_count)
+
+        endpoints = []
+        for (method, segments), stats in sorted(templates.items(), key=lambda kv: -kv[1].count):
+            if stats.count < min_count:
+                continue
+            endpoints.append(self._endpoint(method, segments, stats, total, duration))
+
+        think_time = _think_time_summary(self.global_think.think, self.global_think.think_seen)
+        load_profile: Dict[str, Any] = {
+            'requests': total,
+            'duration_seconds': round(duration, 3),
+            'requests_per_second': round(total / duration, 3) if duration > 0 else None,
+            'clients': len(self.last_seen),
+            'think_time': think_time,
+        }
+        if base_url is None:
+            base_url = self.hosts.most_common(1)[0][0] if self.hosts else 'http://localhost:8080'
+
+        data: Dict[str, Any] = {
+            'base_url': base_url,
+            'test_plan_name': 'Production Workload',
+            'load_profile': load_profile,
+        }
+        if think_time:
+            # 以高斯定时器近似观测到的思考时间分布，作为默认 think_time
+            data['think_time'] = {'type': 'gaussian', 'delay': think_time['mean_ms'],
+                                  'deviation': think_time['stdev_ms']}
+        data['endpoints'] = endpoints
+        return data
+
+    @staticmethod
+    def _endpoint(method: str, segments: Tuple[str, ...], stats: _Stats,
+                  total: int, duration: float) -> Dict[str, Any]:
+        """生成单个模板的 endpoint 条目。"""
+        sample_segments = [seg for seg in stats.sample_path.split('/') if seg]
+        path_parts, parameters = [], []
+        for idx, seg in enumerate(segments):
+            if seg != PLACEHOLDER:
+                path_parts.append(seg)
+                continue
+            name = 'id' if not parameters else f'id{len(parameters) + 1}'
+            path_parts.append(f'{{{name}}}')
+            sample = sample_segments[idx] if idx < len(sample_segments) else '1'
+            parameters.append({'name': name, 'in': 'path', 'default': sample})
+        path = '/' + '/'.join(path_parts)
+
+        for name, value in stats.query.items():
+            parameters.append({'name': name, 'in': 'query', 'default': value})
+
+        endpoint: Dict[str, Any] = {
+            'path': path,
+            'method': method,
+            'summary': f"{method} {path}",
+            'weight': round(stats.count / total, 6) if total else 0,
+            'arrival_rate': round(stats.count / duration, 6) if duration > 0 else None,
+            'requests': stats.count,
+        }
+        if parameters:
+            endpoint['parameters'] = parameters
+        if stats.body:
+            try:
+                example = json.loads(stats.body)
+            except ValueError:
+                example = None
+            if example is not None:
+                endpoint['requestBody'] = {'content': {'application/json': {'example': example}}}
+        endpoint['payload'] = {
+            'request_bytes_mean': round(stats.request_bytes / stats.request_n) if stats.request_n else None,
+            'response_bytes_mean': round(stats.response_bytes / stats.response_n) if stats.response_n else None,
+        }
+        if stats.elapsed_n:
+            endpoint['response_time_mean_ms'] = round(stats.elapsed / stats.elapsed_n, 3)
+        endpoint['status_codes'] = dict(stats.statuses.most_common())
+        think_time = _think_time_summary(stats.think, stats.think_seen)
+        if think_time:
+            endpoint['think_time_stats'] = think_time
+        return endpoint
+
+
+def ingest(input_paths: List[str], input_format: str = 'auto', **model_kwargs: Any) -> WorkloadModel:
+    """读取所有输入文件并返回聚合后的工作负载模型。"""
+    model = WorkloadModel(**model_kwargs)
+    for file_path in input_paths:
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+        fmt = _detect_format(file_path) if input_format == 'auto' else input_format
+        records = iter_har_requests(file_path) if fmt == 'har' else iter_nginx_requests(file_path)
+        for record in records:
+            model.add(record)
+    return model
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s', stream=sys.stderr)
+
+    parser = argparse.ArgumentParser(description="从 HAR / nginx 访问日志推导 endpoints.json 工作负载模型")
+    parser.add_argument("--input", required=True, nargs='+', help="HAR 或 nginx combined 日志文件（支持 .gz）")
+    parser.add_argument("--output", required=True, help="输出 endpoints.json 路径")
+    parser.add_argument("--format", choices=['auto', 'har', 'nginx'], default='auto', help="输入格式")
+    parser.add_argument("--base-url", default=None, help="覆盖 base_url（缺省取流量中最常见的主机）")
+    parser.add_argument("--max-variants", type=int, default=20,
+                        help="同一路径位置超过该数量的不同取值即折叠为 {id}")
+    parser.add_argument("--min-count", type=int, default=1, help="请求数少于该值的模板不输出")
+    parser.add_argument("--session-gap", type=float, default=1800.0,
+                        help="同一客户端相邻请求间隔超过该秒数视为新会话，不计入思考时间")
+    parser.add_argument("--include-static", action="store_true", help="保留静态资源请求")
+    args = parser.parse_args()
+
+    try:
+        model = ingest(args.input, args.format, max_variants=args.max_variants,
+                       session_gap=args.session_gap, include_static=args.include_static)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    data = model.to_endpoints(args.base_url, args.min_count)
+    if not data['endpoints']:
+        logger.error("未从输入中解析到任何请求")
+        sys.exit(1)
+
+    Path(args.output).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+    logger.info("共 %d 个请求，聚类为 %d 个接口模板，已保存: %s",
+                data['load_profile']['requests'], len(data['endpoints']), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,26 @@
 # -*- coding: utf-8 -*-
 """
 API 文档解析器
-支持 OpenAPI/Swagger（YAML/JSON）和 Markdown 格式
+支持 OpenAPI/Swagger（YAML/JSON）、Markdown、Postman Collection v2.1 和 curl 命令
 """
 
+import base64
 import json
 import re
+import shlex
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit
 
-try:
-    import yaml
-except ImportError:
-    yaml = None
+
+def _load_yaml() -> Any:
+    """按需导入 pyyaml：只有 YAML 输入需要，JSON/Markdown/Postman/curl 输入不承担其导入耗时。"""
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("解析 YAML 格式需要安装 pyyaml: pip install pyyaml") from None
+    return yaml
 
 
 # ---------------------------------------------------------------------------
@@ -35,9 +43,7 @@ class OpenApiParser:
 
         with open(path, 'r', encoding='utf-8') as f:
             if path.suffix in ['.yaml', '.yml']:
-                if yaml is None:
-                    raise ImportError("解析 YAML 格式需要安装 pyyaml: pip install pyyaml")
-                self.spec = yaml.safe_load(f)
+                self.spec = _load_yaml().safe_load(f)
             else:
                 self.spec = json.load(f)
 
@@ -54,9 +60,7 @@ class OpenApiParser:
     def parse_from_string(self, content: str, input_format: str = 'yaml') -> Dict[str, Any]:
         """从字符串解析 OpenAPI/Swagger 文档"""
         if input_format.lower() == 'yaml':
-            if yaml is None:
-                raise ImportError("解析 YAML 格式需要安装 pyyaml: pip install pyyaml")
-            self.spec = yaml.safe_load(content)
+            self.spec = _load_yaml().safe_load(content)
         else:
             self.spec = json.loads(content)
 
@@ -441,3 +445,579 @@ class MarkdownParser:
         if match:
             return match.group(1).strip()
         return 'http://localhost:8080'
+
+
+# ---------------------------------------------------------------------------
+# 公共工具（Postman / curl）
+# ---------------------------------------------------------------------------
+
+def _split_url(url: str) -> Tuple[str, str, List[Tuple[str, str]]]:
+    """拆分 URL 为 (origin, path, query 列表)，origin 缺失时返回空字符串。"""
+    if '://' not in url and not url.startswith('/'):
+        url = 'http://' + url
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}" if parts.netloc else ''
+    return origin, parts.path or '/', parse_qsl(parts.query, keep_blank_values=True)
+
+
+def _request_body_model(raw: Optional[str], content_type: str = '') -> Optional[Dict[str, Any]]:
+    """把原始请求体转换为 endpoint 的 requestBody 结构。"""
+    if not raw:
+        return None
+    if 'x-www-form-urlencoded' in content_type:
+        return {'content': {'application/x-www-form-urlencoded': {'example': raw}}}
+    try:
+        example = json.loads(raw)
+    except ValueError:
+        return {'content': {content_type or 'text/plain': {'example': raw}}}
+    return {'content': {'application/json': {'example': example}}}
+
+
+def _build_endpoint(name: str, method: str, path: str,
+                    parameters: List[Dict[str, Any]],
+                    request_body: Optional[Dict[str, Any]] = None,
+                    responses: Optional[Dict[str, Any]] = None,
+                    tags: Optional[List[str]] = None,
+                    description: str = '') -> Dict[str, Any]:
+    """构建与 OpenApiParser/MarkdownParser 一致的 endpoint 结构。"""
+    return {
+        'name': name,
+        'path': path,
+        'method': method,
+        'summary': name,
+        'description': description,
+        'parameters': parameters,
+        'requestBody': request_body,
+        'responses': responses or {'200': {'description': 'Success'}},
+        'tags': tags or [],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Postman Collection v2.1
+# ---------------------------------------------------------------------------
+
+class PostmanParser:
+    """解析 Postman Collection v2.1（兼容 v2.0 的对象式 auth 写法）
+
+    - 递归展开嵌套文件夹，文件夹名称作为 tags
+    - 集合变量 `{{var}}` 按 collection.variable 与调用方传入的变量替换，
+      未定义的变量转换为 JMeter 变量 `${var}`
+    - auth 按 请求 → 文件夹 → 集合 的顺序继承，`noauth` 中断继承
+    """
+
+    _VARIABLE = re.compile(r'\{\{\s*([^{}\s]+)\s*\}\}')
+
+    def __init__(self):
+        self.collection: Optional[Dict[str, Any]] = None
+        self.variables: Dict[str, str] = {}
+        self.endpoints: List[Dict[str, Any]] = []
+        self._origins: Counter = Counter()
+
+    def parse(self, file_path: str, variables: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """解析 Postman Collection 文件"""
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return self._load(json.load(f), variables)
+
+    def parse_from_string(self, content: str, variables: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """从字符串解析 Postman Collection"""
+        return self._load(json.loads(content), variables)
+
+    def _load(self, collection: Any, variables: Optional[Dict[str, str]]) -> List[Dict[str, Any]]:
+        if not isinstance(collection, dict) or 'item' not in collection:
+            raise ValueError("无法识别 Postman Collection：缺少 item 字段")
+        self.collection = collection
+        self.variables = {
+            str(v.get('key')): str(v.get('value', ''))
+            for v in collection.get('variable') or []
+            if isinstance(v, dict) and v.get('key') and not v.get('disabled')
+        }
+        if variables:
+            self.variables.update({k: str(v) for k, v in variables.items()})
+        self._origins = Counter()
+        self.endpoints = self._extract_endpoints()
+        return self.endpoints
+
+    def _resolve(self, value: Any) -> str:
+        """替换 {{var}}；变量值本身引用其他变量时最多展开 5 层。"""
+        text = '' if value is None else str(value)
+        for _ in range(5):
+            if '{{' not in text:
+                break
+            text = self._VARIABLE.sub(lambda m: self.variables.get(m.group(1), f"${{{m.group(1)}}}"), text)
+        return self._VARIABLE.sub(lambda m: f"${{{m.group(1)}}}", text)
+
+    def _extract_endpoints(self) -> List[Dict[str, Any]]:
+        """用显式栈深度优先展开文件夹，保持集合中的原始顺序。"""
+        endpoints: List[Dict[str, Any]] = []
+        root_auth = self.collection.get('auth')
+        stack = [(item, [], root_auth) for item in reversed(self.collection.get('item') or [])]
+        while stack:
+            item, folders, inherited_auth = stack.pop()
+            if not isinstance(item, dict):
+                continue
+            auth = item['auth'] if item.get('auth') is not None else inherited_auth
+            if 'item' in item:
+                sub_folders = folders + [item.get('name', '')]
+                stack.extend((child, sub_folders, auth) for child in reversed(item.get('item') or []))
+                continue
+            if 'request' in item:
+                # v2.1 中请求自身的 auth 位于 request.auth，优先于条目与上级继承的 auth
+                request = item['request']
+                if isinstance(request, dict) and request.get('auth') is not None:
+                    auth = request['auth']
+                endpoints.append(self._parse_item(item, folders, auth))
+        return endpoints
+
+    def _parse_item(self, item: Dict[str, Any], folders: List[str],
+                    auth: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """解析单个请求条目"""
+        request = item['request']
+        if isinstance(request, str):
+            request = {'method': 'GET', 'url': request}
+        method = self._resolve(request.get('method') or 'GET').upper()
+        path, parameters = self._parse_url(request.get('url') or '')
+
+        content_type = ''
+        for header in request.get('header') or []:
+            if not isinstance(header, dict) or header.get('disabled') or not header.get('key'):
+                continue
+            key = self._resolve(header['key'])
+            value = self._resolve(header.get('value', ''))
+            if key.lower() == 'content-type':
+                content_type = value
+            parameters.append({'name': key, 'in': 'header', 'default': value, 'required': False})
+
+        header_names = {p['name'].lower() for p in parameters if p['in'] == 'header'}
+        for param in self._auth_parameters(auth):
+            if param['in'] != 'header' or param['name'].lower() not in header_names:
+                parameters.append(param)
+
+        request_body = self._parse_body(request.get('body'), content_type)
+        name = item.get('name') or f"{method} {path}"
+        description = request.get('description') or ''
+        if isinstance(description, dict):
+            description = description.get('content', '')
+        return _build_endpoint(name, method, path, parameters, request_body,
+                               self._parse_responses(item.get('response') or []),
+                               [f for f in folders if f], description)
+
+    def _parse_url(self, url: Any) -> Tuple[str, List[Dict[str, Any]]]:
+        """解析 url（字符串或对象），返回 (路径, query/path 参数)。"""
+        if isinstance(url, str):
+            url = {'raw': url}
+        parameters: List[Dict[str, Any]] = []
+
+        if url.get('host') is not None or url.get('path') is not None:
+            host = url.get('host') or []
+            host = '.'.join(host) if isinstance(host, list) else str(host)
+            segments = url.get('path') or []
+            segments = segments if isinstance(segments, list) else str(segments).split('/')
+            host = self._resolve(host)
+            if '://' in host:
+                origin = host.rstrip('/')
+            else:
+                protocol = url.get('protocol') or 'http'
+                port = f":{url['port']}" if url.get('port') else ''
+                origin = f"{protocol}://{host}{port}" if host else ''
+            # host 变量（如 {{baseUrl}}）可能自带路径前缀
+            origin, prefix, _ = _split_url(origin) if origin else ('', '', [])
+            raw_path = '/'.join(self._resolve(seg if isinstance(seg, str) else seg.get('value', ''))
+                                for seg in segments)
+            path = prefix.rstrip('/') + '/' + raw_path.lstrip('/')
+            query = [(q.get('key', ''), q.get('value') or '')
+                     for q in url.get('query') or [] if isinstance(q, dict) and not q.get('disabled')]
+        else:
+            origin, path, query = _split_url(self._resolve(url.get('raw', '')))
+
+        if origin:
+            self._origins[origin] += 1
+
+        # Postman 路径变量 :id → {id}
+        path_defaults = {v.get('key'): v.get('value', '') for v in url.get('variable') or [] if isinstance(v, dict)}
+        segments = []
+        for seg in path.split('/'):
+            if seg.startswith(':') and len(seg) > 1:
+                name = seg[1:]
+                segments.append(f"{{{name}}}")
+                parameters.append({'name': name, 'in': 'path', 'required': True,
+                                   'default': self._resolve(path_defaults.get(name, ''))})
+            else:
+                segments.append(seg)
+        path = '/'.join(segments) or '/'
+
+        for key, value in query:
+            if key:
+                parameters.append({'name': self._resolve(key), 'in': 'query',
+                                   'default': self._resolve(value), 'required': False})
+        return path, parameters
+
+    def _auth_parameters(self, auth: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """把 bearer/basic/apikey 认证转换为 header 或 query 参数。"""
+        if not auth or auth.get('type') in (None, 'noauth'):
+            return []
+        auth_type = auth['type']
+        attrs = auth.get(auth_type) or {}
+        if isinstance(attrs, list):
+            attrs = {a.get('key'): a.get('value', '') for a in attrs if isinstance(a, dict)}
+        attrs = {k: self._resolve(v) for k, v in attrs.items()}
+
+        if auth_type == 'bearer':
+            return [{'name': 'Authorization', 'in': 'header', 'required': True,
+                     'default': f"Bearer {attrs.get('token', '')}"}]
+        if auth_type == 'basic':
+            credentials = f"{attrs.get('username', '')}:{attrs.get('password', '')}"
+            token = base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+            return [{'name': 'Authorization', 'in': 'header', 'required': True, 'default': f"Basic {token}"}]
+        if auth_type == 'apikey':
+            location = 'query' if attrs.get('in') == 'query' else 'header'
+            return [{'name': attrs.get('key') or 'X-API-Key', 'in': location, 'required': True,
+                     'default': attrs.get('value', '')}]
+        return []
+
+    def _parse_body(self, body: Optional[Dict[str, Any]], content_type: str) -> Optional[Dict[str, Any]]:
+        """解析 raw / urlencoded 请求体"""
+        if not body or body.get('disabled'):
+            return None
+        mode = body.get('mode')
+        if mode == 'raw':
+            language = ((body.get('options') or {}).get('raw') or {}).get('language')
+            if not content_type and language == 'json':
+                content_type = 'application/json'
+            return _request_body_model(self._resolve(body.get('raw', '')), content_type)
+        if mode == 'urlencoded':
+            pairs = [(self._resolve(p.get('key', '')), self._resolve(p.get('value', '')))
+                     for p in body.get('urlencoded') or [] if isinstance(p, dict) and not p.get('disabled')]
+            return _request_body_model(urlencode(pairs, safe='${}'), 'application/x-www-form-urlencoded')
+        return None
+
+    @staticmethod
+    def _parse_responses(examples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """取第一个成功的响应示例作为 responses。"""
+        for example in examples:
+            if not isinstance(example, dict):
+                continue
+            code = example.get('code') or 200
+            if not 200 <= int(code) < 300:
+                continue
+            response: Dict[str, Any] = {'description': example.get('status') or example.get('name', '')}
+            try:
+                response['content'] = {'application/json': {'example': json.loads(example.get('body') or '')}}
+            except ValueError:
+                pass
+            return {str(code): response}
+        return {'200': {'description': 'Success'}}
+
+    def get_base_url(self) -> str:
+        """获取基础 URL（集合中出现次数最多的 origin）"""
+        if self._origins:
+            return self._origins.most_common(1)[0][0]
+        return self.variables.get('baseUrl') or self.variables.get('base_url') or 'http://localhost:8080'
+
+
+# ---------------------------------------------------------------------------
+# curl
+# ---------------------------------------------------------------------------
+
+# bash $'...'（ANSI-C 引号）中的单字符转义
+_ANSI_C_ESCAPES = {'a': '\a', 'b': '\b', 'e': '\x1b', 'E': '\x1b', 'f': '\f', 'n': '\n', 'r': '\r',
+                   't': '\t', 'v': '\v', '\\': '\\', "'": "'", '"': '"', '?': '?'}
+
+
+def _decode_ansi_c(command: str, start: int) -> Tuple[str, int]:
+    """解码从 start 开始（$' 之后）的 ANSI-C 引号内容，返回 (文本, 结束引号之后的位置)。"""
+    # \xHH 与八进制转义是字节，多个字节可能组成一个 UTF-8 字符，因此先按字节累积
+    data = bytearray()
+    i = start
+    while i < len(command):
+        char = command[i]
+        i += 1
+        if char == "'":
+            return data.decode('utf-8', errors='replace'), i
+        if char != '\\' or i >= len(command):
+            data += char.encode('utf-8')
+            continue
+        escape = command[i]
+        i += 1
+        if escape in _ANSI_C_ESCAPES:
+            data += _ANSI_C_ESCAPES[escape].encode('utf-8')
+        elif escape in 'xuU':
+            digits = re.match(r'[0-9a-fA-F]{1,%d}' % {'x': 2, 'u': 4, 'U': 8}[escape], command[i:])
+            value = int(digits.group(), 16) if digits else -1
+            if digits and escape == 'x':
+                data.append(value)
+            elif digits and value <= 0x10FFFF:
+                data += chr(value).encode('utf-8', errors='replace')
+            else:
+                data += ('\\' + escape).encode('utf-8')
+                continue
+            i += len(digits.group())
+        elif escape in '01234567':
+            digits = re.match('[0-7]{1,3}', command[i - 1:])
+            data.append(int(digits.group(), 8) & 0xFF)
+            i += len(digits.group()) - 1
+        elif escape == 'c' and i < len(command):
+            data.append(ord(command[i]) & 0x1F)
+            i += 1
+        else:
+            data += ('\\' + escape).encode('utf-8')
+    raise ValueError("No closing quotation")
+
+
+def _expand_ansi_c_quotes(command: str) -> str:
+    """把 bash 的 $'...' 解码后改写为 shlex 能识别的普通引号（浏览器「Copy as cURL (bash)」会使用这种写法）。"""
+    out: List[str] = []
+    quote_char = ''
+    i = 0
+    while i < len(command):
+        char = command[i]
+        if quote_char:
+            # 单引号内没有转义；双引号内反斜杠转义下一个字符
+            step = 2 if char == '\\' and quote_char == '"' else 1
+            if char == quote_char:
+                quote_char = ''
+        elif char == '\\':
+            step = 2
+        elif char in '\'"':
+            quote_char, step = char, 1
+        elif command.startswith("$'", i):
+            text, i = _decode_ansi_c(command, i + 2)
+            out.append(shlex.quote(text))
+            continue
+        else:
+            step = 1
+        out.append(command[i:i + step])
+        i += step
+    return ''.join(out)
+
+
+def _jmeter_file_content(path: str) -> str:
+    """读取文件内容的 JMeter 函数调用（函数参数中的 \\ 与 , 需要转义）。"""
+    return '${__FileToString(' + path.replace('\\', '\\\\').replace(',', '\\,') + ',,)}'
+
+
+def _data_value(option: str, value: str) -> str:
+    """curl 数据选项的实际内容：@path 表示读取文件（--data-raw 除外，@- 为标准输入，保持原样）。"""
+    if option == '--data-urlencode':
+        return _urlencode_data(value)
+    if option != '--data-raw' and value.startswith('@') and value != '@-':
+        return _jmeter_file_content(value[1:])
+    return value
+
+
+def _urlencode_data(value: str) -> str:
+    """按 curl --data-urlencode 的规则编码：content、=content、name=content、@file、name@file。"""
+    # 先出现的 = 或 @ 决定写法，name 部分原样保留
+    match = re.search(r'[=@]', value)
+    if match is None:
+        return quote(value, safe='')
+    name, content = value[:match.start()], value[match.end():]
+    if match.group() == '@':
+        content = '${__urlencode(' + _jmeter_file_content(content) + ')}'
+    else:
+        content = quote(content, safe='')
+    return f"{name}={content}" if name else content
+
+
+def _multipart_body_model(fields: List[Tuple[bool, str]]) -> Dict[str, Any]:
+    """
+    把 curl -F / --form-string 的字段转换为 multipart/form-data 的 requestBody。
+
+    文件字段（name=@path）在 schema 中为 format: binary，example 中的值为文件路径，
+    ;type= 写入 encoding.contentType；name=<path 的文本字段以 JMeter 函数读取文件内容；
+    同名字段的 example 为列表。fields 为 (是否 --form-string, 字段) 序列。
+    """
+    properties: Dict[str, Any] = {}
+    example: Dict[str, Any] = {}
+    encoding: Dict[str, Any] = {}
+    for literal, field in fields:
+        name, _, value = field.partition('=')
+        options: Dict[str, str] = {}
+        if not literal:
+            # curl 只识别 ;type= ;filename= ;headers= ;encoder= 修饰，其余分号属于值本身
+            value, *extras = re.split(r';(?=(?:type|filename|headers|encoder)=)', value)
+            options = dict(extra.split('=', 1) for extra in extras)
+        schema: Dict[str, Any] = {'type': 'string'}
+        if not literal and value.startswith('@'):
+            value = value[1:]
+            schema['format'] = 'binary'
+            if 'type' in options:
+                encoding[name] = {'contentType': options['type']}
+        elif not literal and value.startswith('<'):
+            value = _jmeter_file_content(value[1:])
+        if name in example:
+            previous = example[name]
+            example[name] = (previous if isinstance(previous, list) else [previous]) + [value]
+            properties[name] = {'type': 'array', 'items': schema}
+        else:
+            example[name] = value
+            properties[name] = schema
+    media: Dict[str, Any] = {'schema': {'type': 'object', 'properties': properties}, 'example': example}
+    if encoding:
+        media['encoding'] = encoding
+    return {'content': {'multipart/form-data': media}}
+
+
+class CurlParser:
+    """解析一条或多条 curl 命令（支持 `\\` 与 `^` 续行）"""
+
+    _DATA_OPTIONS = {'-d', '--data', '--data-raw', '--data-binary', '--data-ascii', '--data-urlencode'}
+    _FORM_OPTIONS = {'-F', '--form', '--form-string'}
+    # 带参数的长选项（curl --help all 中带 <参数> 的选项）；不在其中的选项视为开关，
+    # 避免把未处理选项的参数误认为 URL
+    _LONG_WITH_ARG = frozenset('--' + name for name in (
+        'abstract-unix-socket alt-svc aws-sigv4 cacert capath cert cert-type ciphers config connect-timeout '
+        'connect-to continue-at cookie cookie-jar create-file-mode crlfile curves data data-ascii data-binary '
+        'data-raw data-urlencode delegation dns-interface dns-ipv4-addr dns-ipv6-addr dns-servers doh-url '
+        'dump-header egd-file engine etag-compare etag-save expect100-timeout form form-string ftp-account '
+        'ftp-alternative-to-user ftp-method ftp-port ftp-ssl-ccc-mode happy-eyeballs-timeout-ms header hostpubmd5 '
+        'hostpubsha256 hsts interface json keepalive-time key key-type krb libcurl limit-rate local-port '
+        'login-options mail-auth mail-from mail-rcpt max-filesize max-redirs max-time netrc-file noproxy '
+        'oauth2-bearer output output-dir parallel-max pass pinnedpubkey preproxy proto proto-default proto-redir '
+        'proxy proxy1.0 proxy-cacert proxy-capath proxy-cert proxy-cert-type proxy-ciphers proxy-crlfile '
+        'proxy-header proxy-key proxy-key-type proxy-pass proxy-pinnedpubkey proxy-service-name '
+        'proxy-tls13-ciphers proxy-tlsauthtype proxy-tlspassword proxy-tlsuser proxy-user pubkey quote '
+        'random-file range rate referer request request-target resolve retry retry-delay retry-max-time '
+        'sasl-authzid service-name socks4 socks4a socks5 socks5-gssapi-service socks5-hostname speed-limit '
+        'speed-time stderr telnet-option tftp-blksize time-cond tls-max tls13-ciphers tlsauthtype tlspassword '
+        'tlsuser trace trace-ascii unix-socket upload-file url url-query user user-agent variable write-out'
+    ).split())
+    _SHORT_WITH_ARG = {'-A', '-b', '-C', '-c', '-D', '-d', '-E', '-e', '-F', '-H', '-K', '-m', '-o', '-P', '-Q',
+                       '-r', '-T', '-t', '-U', '-u', '-w', '-X', '-x', '-Y', '-y', '-z'}
+
+    def __init__(self):
+        self.content: str = ''
+        self.endpoints: List[Dict[str, Any]] = []
+        self._origins: Counter = Counter()
+
+    def parse(self, file_path: str) -> List[Dict[str, Any]]:
+        """解析包含 curl 命令的文本文件"""
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.parse_from_string(f.read())
+
+    def parse_from_string(self, content: str) -> List[Dict[str, Any]]:
+        """从字符串解析 curl 命令，每条命令生成一个 endpoint"""
+        self.content = content
+        self._origins = Counter()
+        joined = re.sub(r'[\\^]\r?\n', ' ', content)
+        commands = re.split(r'(?:^|\n)\s*(?:\$\s*)?(?=curl\s)', joined)
+        self.endpoints = [self._parse_command(cmd) for cmd in commands if cmd.strip().startswith('curl')]
+        if not self.endpoints:
+            raise ValueError("未找到 curl 命令")
+        return self.endpoints
+
+    def _tokens(self, command: str) -> List[Tuple[str, Optional[str]]]:
+        """把 curl 参数切分为 (选项, 值) 序列，位置参数的选项为空字符串。"""
+        try:
+            args = shlex.split(_expand_ansi_c_quotes(command.strip()))[1:]
+        except ValueError as e:
+            raise ValueError(f"curl 命令引号不匹配: {e}") from None
+
+        tokens: List[Tuple[str, Optional[str]]] = []
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            i += 1
+            if arg.startswith('--'):
+                name, sep, value = arg.partition('=')
+                takes_value = name in self._LONG_WITH_ARG
+                if takes_value and not sep and i < len(args):
+                    value = args[i]
+                    i += 1
+                tokens.append((name, value if takes_value else None))
+            elif arg.startswith('-') and len(arg) > 1:
+                name = arg[:2]
+                if name in self._SHORT_WITH_ARG:
+                    if len(arg) > 2:
+                        tokens.append((name, arg[2:]))
+                    elif i < len(args):
+                        tokens.append((name, args[i]))
+                        i += 1
+                else:
+                    # 组合短选项（如 -sSL）中可能包含 -G/-I
+                    tokens.extend((f"-{flag}", None) for flag in arg[1:])
+            else:
+                tokens.append(('', arg))
+        return tokens
+
+    def _parse_command(self, command: str) -> Dict[str, Any]:
+        """解析单条 curl 命令"""
+        method: Optional[str] = None
+        url = ''
+        headers: List[Tuple[str, str]] = []
+        data: List[str] = []
+        form: List[Tuple[bool, str]] = []
+        as_query = False
+
+        for name, value in self._tokens(command):
+            if name in ('-X', '--request'):
+                method = value.upper()
+            elif name in ('-H', '--header'):
+                key, _, header_value = value.partition(':')
+                if key.strip():
+                    headers.append((key.strip(), header_value.strip()))
+            elif name in self._DATA_OPTIONS:
+                data.append(_data_value(name, value))
+            elif name in self._FORM_OPTIONS:
+                form.append((name == '--form-string', value))
+            elif name == '--json':
+                data.append(_data_value(name, value))
+                headers.extend([('Content-Type', 'application/json'), ('Accept', 'application/json')])
+            elif name in ('-u', '--user'):
+                token = base64.b64encode(value.encode('utf-8')).decode('ascii')
+                headers.append(('Authorization', f"Basic {token}"))
+            elif name in ('-b', '--cookie'):
+                headers.append(('Cookie', value))
+            elif name in ('-A', '--user-agent'):
+                headers.append(('User-Agent', value))
+            elif name in ('-e', '--referer'):
+                headers.append(('Referer', value))
+            elif name in ('-G', '--get'):
+                as_query = True
+            elif name in ('-I', '--head'):
+                method = 'HEAD'
+            elif name in ('', '--url') and not url:
+                url = value
+
+        if not url:
+            raise ValueError(f"curl 命令缺少 URL: {command.strip()[:80]}")
+
+        origin, path, query = _split_url(url)
+        if origin:
+            self._origins[origin] += 1
+        body = '&'.join(data) if data else None
+        if body is not None and as_query:
+            query.extend(parse_qsl(body, keep_blank_values=True))
+            body = None
+        if method is None:
+            method = 'POST' if body is not None or form else 'GET'
+
+        parameters: List[Dict[str, Any]] = [
+            {'name': key, 'in': 'query', 'default': value, 'required': False} for key, value in query
+        ]
+        content_type = ''
+        for key, value in headers:
+            if key.lower() == 'content-type':
+                content_type = value
+            parameters.append({'name': key, 'in': 'header', 'default': value, 'required': False})
+        if body is not None and not content_type and data and not body.lstrip().startswith(('{', '[')):
+            # curl -d 的默认 Content-Type
+            content_type = 'application/x-www-form-urlencoded'
+
+        # curl 不允许 -F 与 -d 同时使用，有 -F 时按 multipart 处理
+        request_body = _multipart_body_model(form) if form else _request_body_model(body, content_type)
+        return _build_endpoint(f"{method} {path}", method, path, parameters, request_body)
+
+    def get_base_url(self) -> str:
+        """获取基础 URL（命令中出现次数最多的 origin）"""
+        if self._origins:
+            return self._origins.most_common(1)[0][0]
+        return 'http://localhost:8080'
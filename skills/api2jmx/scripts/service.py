@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 JMX 生成服务：常驻进程通过 HTTP 或 Unix socket 接收 API 文档 / endpoints 数据，返回 JMX
+
+用法:
+    python service.py --port 8765
+    python service.py --unix-socket /tmp/api2jmx.sock
+
+    curl --data-binary @endpoints.json 'http://127.0.0.1:8765/jmx?threads=50&ramp=30'
+    curl --data-binary @openapi.yaml 'http://127.0.0.1:8765/jmx?format=openapi&think_time=gaussian:300:100'
+
+接口:
+    POST /jmx     请求体为输入文档（UTF-8），查询参数：
+                    format      endpoints（默认）、openapi（YAML/JSON）、markdown、postman、curl
+                    name、threads、ramp、loops、think_time、pacing
+                                与 generate_jmx.py 的 --name、--threads 等参数含义相同
+                  成功返回 200 与 JMX（application/xml），输入无效返回 400 {"error": "..."}
+    GET /health   返回 {"status": "ok", "parse_cache": {...}, "result_cache": {...}}
+
+每个连接由独立线程处理，所有请求共享同一个 JmxGenerator（生成过程无实例状态，可并发调用）。
+模块只在启动时导入一次；文档解析结果与生成结果按内容摘要分别缓存在 LRU 中（按估算字节数限制大小）：
+同一份文档换线程数等选项重新生成时跳过解析，完全相同的请求直接返回缓存的 JMX。
+服务器与缓存等传输层实现见 local_service.py。
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import socketserver
+import sys
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+try:
+    from . import local_service
+    from .generate_jmx import parse_think_time
+    from .generator import JmxGenerator
+    from .local_service import DEFAULT_HOST, LruCache, ServiceHandler, serve
+    from .parsers import CurlParser, MarkdownParser, OpenApiParser, PostmanParser
+except ImportError:
+    import local_service
+    from generate_jmx import parse_think_time
+    from generator import JmxGenerator
+    from local_service import DEFAULT_HOST, LruCache, ServiceHandler, serve
+    from parsers import CurlParser, MarkdownParser, OpenApiParser, PostmanParser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+# 解析结果与生成结果各自的缓存上限（MB）
+DEFAULT_CACHE_MB = 128
+# 解析后的 endpoints 数据按请求体大小的倍数估算内存占用（Python 对象约为 JSON 文本的 4 倍）
+PARSED_SIZE_FACTOR = 4
+
+# 查询参数 → (generate_from_endpoints 参数名, 转换函数)
+OPTIONS = {
+    "name": ("test_plan_name", str),
+    "threads": ("num_threads", int),
+    "ramp": ("ramp_time", int),
+    "loops": ("loops", int),
+    "think_time": ("think_time", parse_think_time),
+    "pacing": ("pacing", int),
+}
+
+
+def _parse_openapi(text: str) -> dict:
+    parser = OpenApiParser()
+    # YAML 是 JSON 的超集，但 JSON 文档直接用 json 解析，未安装 pyyaml 时也可用
+    parser.parse_from_string(text, "json" if text.lstrip().startswith("{") else "yaml")
+    return {"base_url": parser.get_base_url(), "endpoints": parser.get_endpoints()}
+
+
+def _parse_with(parser_class: Any) -> Any:
+    def parse(text: str) -> dict:
+        parser = parser_class()
+        endpoints = parser.parse_from_string(text)
+        return {"base_url": parser.get_base_url(), "endpoints": endpoints}
+    return parse
+
+
+# 输入格式 → 解析函数（文档文本 → endpoints.json 结构）
+PARSERS = {
+    "endpoints": json.loads,
+    "openapi": _parse_openapi,
+    "markdown": _parse_with(MarkdownParser),
+    "postman": _parse_with(PostmanParser),
+    "curl": _parse_with(CurlParser),
+}
+
+
+def _is_list_of_dicts(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, dict) for item in value)
+
+
+class GenerationService:
+    """请求处理逻辑（与传输层无关）：解析 → 生成，两级缓存。"""
+
+    def __init__(self, cache_mb: int = DEFAULT_CACHE_MB):
+        self.generator = JmxGenerator()
+        self.parse_cache = LruCache(cache_mb * 1024 * 1024)
+        self.result_cache = LruCache(cache_mb * 1024 * 1024)
+
+    def generate(self, body: bytes, params: Dict[str, str]) -> bytes:
+        """
+        按查询参数生成 JMX
+
+        Raises:
+            ValueError: 格式或选项不支持、文档无法解析、endpoints 为空
+        """
+        params = dict(params)
+        input_format = params.pop("format", "endpoints")
+        if input_format not in PARSERS:
+            raise ValueError(f"不支持的输入格式: {input_format}（可选 {'/'.join(PARSERS)}）")
+        unknown = sorted(set(params) - set(OPTIONS))
+        if unknown:
+            raise ValueError(f"不支持的参数: {', '.join(unknown)}")
+
+        digest = hashlib.sha256(input_format.encode() + b"\0" + body).hexdigest()
+        result_key = digest + json.dumps(params, sort_keys=True)
+        xml = self.result_cache.get(result_key)
+        if xml is not None:
+            return xml
+
+        kwargs = self._options(params)
+        endpoints_data = self.parse_cache.get(digest)
+        if endpoints_data is None:
+            endpoints_data = self._parse(input_format, body)
+            self.parse_cache.put(digest, endpoints_data, len(body) * PARSED_SIZE_FACTOR)
+
+        xml = self.generator.generate_from_endpoints(endpoints_data, **kwargs).encode("utf-8")
+        self.result_cache.put(result_key, xml, len(xml))
+        return xml
+
+    @staticmethod
+    def _options(params: Dict[str, str]) -> Dict[str, Any]:
+        kwargs = {}
+        for key, value in params.items():
+            name, convert = OPTIONS[key]
+            try:
+                kwargs[name] = convert(value)
+            except (TypeError, ValueError, argparse.ArgumentTypeError) as e:
+                raise ValueError(f"参数 {key} 无效: {e}") from None
+        return kwargs
+
+    @staticmethod
+    def _parse(input_format: str, body: bytes) -> dict:
+        try:
+            endpoints_data = PARSERS[input_format](body.decode("utf-8-sig"))
+        except ImportError:
+            raise
+        except Exception as e:
+            # 各解析器（json、yaml、Markdown/curl 解析）抛出的异常类型不一，统一视为输入无效
+            raise ValueError(f"{input_format} 文档无法解析: {type(e).__name__}: {e}") from None
+        if not isinstance(endpoints_data, dict):
+            raise ValueError("endpoints 输入应为 JSON 对象")
+        for key in ("endpoints", "scenarios"):
+            items = endpoints_data.get(key)
+            if items is not None and not _is_list_of_dicts(items):
+                raise ValueError(f"{key} 应为对象数组")
+        for endpoint in endpoints_data.get("endpoints") or []:
+            if not isinstance(endpoint.get("path"), str) or not isinstance(endpoint.get("method"), str):
+                raise ValueError(f"端点缺少 path 或 method: {json.dumps(endpoint, ensure_ascii=False)[:200]}")
+        if not endpoints_data.get("endpoints") and not endpoints_data.get("scenarios"):
+            raise ValueError("endpoints 为空")
+        return endpoints_data
+
+    def health(self) -> Dict[str, Any]:
+        return {"status": "ok", "parse_cache": self.parse_cache.stats(), "result_cache": self.result_cache.stats()}
+
+
+class _Handler(ServiceHandler):
+    server_version = "api2jmx"
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == "/health":
+            self.send_json(200, self.server.service.health())
+        else:
+            self.send_json(404, {"error": f"未知路径: {self.path}"})
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/jmx":
+            self.send_json(404, {"error": f"未知路径: {url.path}"})
+            return
+        body = self.read_body()
+        if body is None:
+            return
+        try:
+            xml = self.server.service.generate(body, dict(parse_qsl(url.query)))
+        except (ValueError, ImportError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:  # 单个请求出错不影响服务
+            logger.exception("生成失败")
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self.send_bytes(200, xml, "application/xml; charset=utf-8")
+
+
+def make_server(service: GenerationService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                unix_socket: Optional[str] = None) -> socketserver.BaseServer:
+    """创建（尚未开始服务的）服务器，参数见 local_service.make_server。"""
+    return local_service.make_server(service, _Handler, host, port, unix_socket)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s', stream=sys.stderr)
+
+    parser = argparse.ArgumentParser(description="本地 JMX 生成服务（HTTP / Unix socket）")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"监听地址（默认 {DEFAULT_HOST}）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口（默认 {DEFAULT_PORT}，0 为自动分配）")
+    parser.add_argument("--unix-socket", help="改为监听 Unix socket 路径")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_MB,
+                        help=f"解析结果与生成结果各自缓存的上限（MB，默认 {DEFAULT_CACHE_MB}，0 为不缓存）")
+    args = parser.parse_args()
+
+    try:
+        server = make_server(GenerationService(args.cache_mb), args.host, args.port, args.unix_socket)
+    except OSError as e:
+        logger.error("无法监听: %s", e)
+        sys.exit(1)
+    serve(server)
+
+
+if __name__ == "__main__":
+    main()
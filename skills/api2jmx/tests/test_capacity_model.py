@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+JTL_HEADER = "timeStamp,elapsed,label,responseCode,success,grpThreads,allThreads\n"
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _capacity_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "capacity_model.py")
+
+
+def _usl_throughput(n: int, lam: float, sigma: float, kappa: float) -> float:
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def _write_jtl(path: Path, label: str, threads: int, throughput: float, seconds: int = 10) -> None:
+    """按给定吞吐量均匀写入 seconds 秒的成功样本。"""
+    count = int(round(throughput * seconds))
+    interval = seconds * 1000 / count
+    lines = [JTL_HEADER]
+    for i in range(count):
+        lines.append(f"{int(i * interval)},0,{label},200,true,{threads},{threads}\n")
+    lines.append(f"{seconds * 1000},0,{label},200,true,{threads},{threads}\n")
+    lines.append(f"0,5,{label},500,false,{threads},{threads}\n")
+    path.write_text("".join(lines), encoding="utf-8")
+
+
+class TestCapacityModel(unittest.TestCase):
+
+    def test_usl_fit_recovers_coefficients(self):
+        """由已知 USL 曲线生成的结果应拟合回相近的 σ、κ 和峰值并发。"""
+        lam, sigma, kappa = 100.0, 0.05, 0.002
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            inputs = []
+            for n in (1, 5, 10, 20, 40):
+                jtl = td_path / f"run_{n}.jtl"
+                _write_jtl(jtl, "GET /api/users", n, _usl_throughput(n, lam, sigma, kappa))
+                inputs.append(str(jtl))
+            output_path = td_path / "capacity.json"
+
+            subprocess.check_call(
+                [_venv_python(), _capacity_script(), "--input", *inputs, "--output", str(output_path)],
+                timeout=60,
+            )
+
+            report = json.loads(output_path.read_text(encoding="utf-8"))
+            result = report["labels"]["GET /api/users"]
+            self.assertAlmostEqual(result["sigma"], sigma, delta=0.01)
+            self.assertAlmostEqual(result["kappa"], kappa, delta=0.0005)
+            self.assertAlmostEqual(result["peak_concurrency"], 21.8, delta=2)
+            self.assertEqual(report["num_threads"], result["recommended_threads"])
+
+    def test_explicit_concurrency_and_amdahl(self):
+        """path:并发数 覆盖 JTL 中的线程数，Amdahl 模型 κ 恒为 0。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            inputs = []
+            for n in (2, 8, 32):
+                jtl = td_path / f"run_{n}.jtl"
+                _write_jtl(jtl, "POST /api/orders", 1, _usl_throughput(n, 50.0, 0.1, 0.0))
+                inputs.append(f"{jtl}:{n}")
+
+            result = subprocess.run(
+                [_venv_python(), _capacity_script(), "--input", *inputs, "--model", "amdahl"],
+                capture_output=True, text=True, timeout=60,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            report = json.loads(result.stdout)
+            fitted = report["labels"]["POST /api/orders"]
+            self.assertEqual(fitted["kappa"], 0)
+            self.assertAlmostEqual(fitted["sigma"], 0.1, delta=0.02)
+            self.assertIsNone(fitted["peak_concurrency"])
+            self.assertGreater(report["num_threads"], 1)
+
+    def test_insufficient_points_exits_with_error(self):
+        """单个并发点无法拟合时报错退出。"""
+        with tempfile.TemporaryDirectory() as td:
+            jtl = Path(td) / "run.jtl"
+            _write_jtl(jtl, "GET /api/health", 10, 200.0)
+
+            result = subprocess.run(
+                [_venv_python(), _capacity_script(), "--input", str(jtl)],
+                capture_output=True, text=True, timeout=60,
+            )
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("没有可拟合的 label", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
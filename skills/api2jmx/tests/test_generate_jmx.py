@@ -2,10 +2,14 @@ import json
 import subprocess
 import sys
 import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+from scripts.generator import JmxGenerator
+
 
 def _venv_python() -> str:
     return sys.executable
@@ -247,6 +251,153 @@ class TestGenerateJmx(unittest.TestCase):
             samplers = root.findall(".//HTTPSamplerProxy")
             self.assertEqual(len(samplers), 3)
 
+    def test_think_time_and_pacing_timers(self):
+        """端点级 think_time 优先于 CLI 默认值，pacing 生成 Flow Control Action + 吞吐定时器。"""
+        data = {
+            "base_url": "https://api.example.com",
+            "pacing": 5000,
+            "endpoints": [
+                {"path": "/api/users", "method": "GET", "summary": "List users",
+                 "think_time": {"type": "gaussian", "delay": 300, "deviation": 100}},
+                {"path": "/api/orders", "method": "GET", "summary": "List orders"},
+                {"path": "/api/health", "method": "GET", "summary": "Health",
+                 "think_time": {"type": "none"}, "pacing": 0},
+            ],
+        }
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = _write_endpoints(td_path, data)
+            output_path = td_path / "out.jmx"
+
+            subprocess.check_call(
+                [_venv_python(), _jmx_script(), "--input", str(input_path), "--output", str(output_path),
+                 "--think-time", "uniform:1000:500"],
+                timeout=30,
+            )
+
+            root = _parse_jmx(output_path)
+            gaussian = root.findall(".//GaussianRandomTimer")
+            self.assertEqual(len(gaussian), 1)
+            self.assertEqual(gaussian[0].find("stringProp[@name='ConstantTimer.delay']").text, "300")
+            self.assertEqual(gaussian[0].find("stringProp[@name='RandomTimer.range']").text, "100.0")
+            uniform = root.findall(".//UniformRandomTimer")
+            self.assertEqual(len(uniform), 1)
+            self.assertEqual(uniform[0].find("stringProp[@name='RandomTimer.range']").text, "500.0")
+
+            # 前两个线程组继承顶层 pacing，第三个显式关闭
+            pacing = root.findall(".//TestAction")
+            self.assertEqual(len(pacing), 2)
+            throughput = root.find(".//ConstantThroughputTimer/doubleProp[name='throughput']/value")
+            self.assertEqual(float(throughput.text), 12.0)
+            calc_mode = root.find(".//ConstantThroughputTimer/intProp[@name='calcMode']")
+            self.assertEqual(calc_mode.text, "0")
+
+    def test_invalid_think_time_exits_with_error(self):
+        """不支持的思考时间类型报错退出。"""
+        data = {
+            "base_url": "https://api.example.com",
+            "endpoints": [{"path": "/api/users", "method": "GET", "think_time": {"type": "zipf"}}],
+        }
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = _write_endpoints(td_path, data)
+            output_path = td_path / "out.jmx"
+
+            result = subprocess.run(
+                [_venv_python(), _jmx_script(), "--input", str(input_path), "--output", str(output_path)],
+                capture_output=True, text=True, timeout=30,
+            )
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("不支持的思考时间类型", result.stderr)
+
+    def test_scenario_login_once_and_extractors(self):
+        """场景：登录放在仅一次控制器中，提取的 token/ID 关联到后续步骤。"""
+        data = {
+            "base_url": "https://api.example.com",
+            "num_threads": 20,
+            "endpoints": [
+                {"path": "/api/orders/{id}", "method": "GET", "name": "查询订单",
+                 "parameters": [{"name": "id", "in": "path", "default": "${orderId}"}]},
+            ],
+            "scenarios": [
+                {
+                    "name": "下单流程",
+                    "weight": 3,
+                    "headers": {"Authorization": "Bearer ${token}"},
+                    "login": {
+                        "path": "/api/login", "method": "POST",
+                        "requestBody": {"content": {"application/json": {
+                            "example": {"username": "demo", "password": "secret"}}}},
+                        "extractors": [{"type": "json_path", "name": "token", "json_path": "$.data.token",
+                                        "default": "NOT_FOUND"}],
+                    },
+                    "steps": [
+                        {"path": "/api/orders", "method": "POST",
+                         "requestBody": {"content": {"application/json": {"example": {"sku": "A1"}}}},
+                         "extractors": [{"type": "regex", "name": "orderId", "regex": "\"id\":(\\d+)"}]},
+                        {"ref": "查询订单", "think_time": {"type": "constant", "delay": 200}},
+                    ],
+                },
+                {"name": "浏览", "weight": 1, "steps": [{"ref": "GET /api/orders/{id}"}]},
+            ],
+        }
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = _write_endpoints(td_path, data)
+            output_path = td_path / "out.jmx"
+
+            subprocess.check_call(
+                [_venv_python(), _jmx_script(), "--input", str(input_path), "--output", str(output_path)],
+                timeout=30,
+            )
+
+            root = _parse_jmx(output_path)
+            thread_groups = root.findall(".//ThreadGroup")
+            self.assertEqual([tg.get("testname") for tg in thread_groups], ["下单流程", "浏览"])
+            threads = [tg.find("stringProp[@name='ThreadGroup.num_threads']").text for tg in thread_groups]
+            self.assertEqual(threads, ["15", "5"])
+
+            # 登录请求位于仅一次控制器的 hashTree 中，且不带场景 headers
+            scenario_tree = root.find(".//hashTree/hashTree/hashTree")
+            children = list(scenario_tree)
+            self.assertEqual(children[0].tag, "OnceOnlyController")
+            login_sampler = children[1].find("HTTPSamplerProxy")
+            self.assertEqual(login_sampler.find("stringProp[@name='HTTPSampler.path']").text, "/api/login")
+            self.assertEqual(children[1].find(".//JSONPostProcessor/stringProp"
+                                              "[@name='JSONPostProcessor.jsonPathExprs']").text, "$.data.token")
+            self.assertNotIn("Bearer ${token}",
+                             [h.text for h in children[1].findall(".//stringProp[@name='Header.value']")])
+
+            samplers = [s for s in children if s.tag == "HTTPSamplerProxy"]
+            self.assertEqual([s.find("stringProp[@name='HTTPSampler.path']").text for s in samplers],
+                             ["/api/orders", "/api/orders/${orderId}"])
+            regex = scenario_tree.find(".//RegexExtractor")
+            self.assertEqual(regex.find("stringProp[@name='RegexExtractor.refname']").text, "orderId")
+            self.assertEqual(regex.find("stringProp[@name='RegexExtractor.template']").text, "$1$")
+            header_values = [h.text for h in scenario_tree.findall("hashTree/HeaderManager//"
+                                                                   "stringProp[@name='Header.value']")]
+            self.assertEqual(header_values.count("Bearer ${token}"), 2)
+            self.assertEqual(len(scenario_tree.findall(".//ConstantTimer")), 1)
+
+    def test_scenario_unknown_ref_exits_with_error(self):
+        """场景步骤引用不存在的接口时报错退出。"""
+        data = {
+            "base_url": "https://api.example.com",
+            "endpoints": [],
+            "scenarios": [{"name": "s", "steps": [{"ref": "GET /api/missing"}]}],
+        }
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = _write_endpoints(td_path, data)
+            output_path = td_path / "out.jmx"
+
+            result = subprocess.run(
+                [_venv_python(), _jmx_script(), "--input", str(input_path), "--output", str(output_path)],
+                capture_output=True, text=True, timeout=30,
+            )
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("场景步骤引用的接口不存在", result.stderr)
+
     def test_invalid_json_exits_with_error(self):
         """非法 JSON 报错退出。"""
         with tempfile.TemporaryDirectory() as td:
@@ -289,6 +440,162 @@ class TestGenerateJmx(unittest.TestCase):
             self.assertNotEqual(result.returncode, 0)
             self.assertIn("文件不存在", result.stderr)
 
+    def test_help_does_not_import_optional_modules(self):
+        """启动时不导入 pyyaml、minidom，只在解析 YAML / 格式化输出时按需导入。"""
+        result = subprocess.run(
+            [_venv_python(), "-X", "importtime", _jmx_script(), "--help"],
+            capture_output=True, text=True, timeout=30, check=True,
+        )
+        modules = {line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines()
+                   if line.startswith("import time:")}
+        self.assertIn("generator", modules)
+        self.assertNotIn("yaml", modules)
+        self.assertNotIn("xml.dom.minidom", modules)
+
+    def test_unchanged_input_skips_regeneration(self):
+        """输入与选项未变化时跳过生成；修改输入、修改选项或 --force 时重新生成。"""
+        data = {
+            "base_url": "https://api.example.com",
+            "endpoints": [{"path": "/api/users", "method": "GET"}],
+        }
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = _write_endpoints(td_path, data)
+            output_path = td_path / "out.jmx"
+
+            def run(*extra: str) -> str:
+                result = subprocess.run(
+                    [_venv_python(), _jmx_script(), "--input", str(input_path), "--output", str(output_path),
+                     *extra],
+                    capture_output=True, text=True, timeout=30,
+                )
+                self.assertEqual(result.returncode, 0, result.stderr)
+                return result.stdout
+
+            self.assertNotIn("跳过", run("--threads", "5"))
+            self.assertTrue((td_path / ".build-manifest.json").exists())
+            self.assertIn("未变化，跳过", run("--threads", "5"))
+            self.assertNotIn("跳过", run("--threads", "6"))
+            self.assertNotIn("跳过", run("--threads", "6", "--force"))
+
+            data["endpoints"].append({"path": "/api/orders", "method": "POST"})
+            _write_endpoints(td_path, data)
+            self.assertNotIn("跳过", run("--threads", "6"))
+            names = {s.get("testname") for s in _parse_jmx(output_path).iter("HTTPSamplerProxy")}
+            self.assertIn("POST /api/orders", names)
+
+            output_path.write_text("edited", encoding="utf-8")
+            self.assertNotIn("跳过", run("--threads", "6"))
+
+    def test_weighted_threads_sum_to_num_threads(self):
+        """按 weight 分配的线程数合计等于 num_threads；线程组多于 num_threads 时每组 1 个并记录警告。"""
+        def threads(weights, num_threads):
+            data = {"base_url": "https://api.example.com", "endpoints": [
+                {"path": f"/api/e{i}", "method": "GET", "weight": weight} for i, weight in enumerate(weights)]}
+            root = ET.fromstring(JmxGenerator().generate_from_endpoints(data, num_threads=num_threads))
+            return [int(tg.find("stringProp[@name='ThreadGroup.num_threads']").text)
+                    for tg in root.findall(".//ThreadGroup")]
+
+        self.assertEqual(threads([1, 99], 10), [1, 9])
+        self.assertEqual(threads([0.2, 0.3, 0.5], 7), [1, 2, 4])
+        # 份额 6.25 与 11 个 1.25：余下 3 个线程按原顺序分给余数相同的前 3 组
+        allocated = threads([5] + [1] * 11, 20)
+        self.assertEqual(sum(allocated), 20)
+        self.assertEqual(allocated, [7, 2, 2] + [1] * 9)
+        with self.assertLogs("scripts.generator", level="WARNING"):
+            self.assertEqual(threads([1] * 10, 5), [1] * 10)
+
+    def test_thread_group_cache_reuses_unchanged_groups(self):
+        """启用线程组缓存后输出与不缓存时一致，只重建输入变化的线程组。"""
+        data = {
+            "base_url": "https://api.example.com",
+            "think_time": {"type": "constant", "delay": 500},
+            "endpoints": [
+                {"path": "/api/users", "method": "GET"},
+                {"path": "/api/orders", "method": "POST", "body": {"id": 1}},
+                {"path": "/api/items", "method": "GET", "weight": 2},
+            ],
+        }
+        generator = JmxGenerator()
+        generator.thread_group_cache = {}
+        built = []
+        original = generator._add_endpoint
+        generator._add_endpoint = lambda builder, endpoint, *args: (built.append(endpoint["path"]),
+                                                                    original(builder, endpoint, *args))
+        self.assertEqual(generator.generate_from_endpoints(data),
+                         JmxGenerator().generate_from_endpoints(data))
+        self.assertEqual(len(built), 3)
+
+        built.clear()
+        data["endpoints"][1]["body"] = {"id": 2}
+        self.assertEqual(generator.generate_from_endpoints(data),
+                         JmxGenerator().generate_from_endpoints(data))
+        self.assertEqual(built, ["/api/orders"])
+        self.assertEqual(len(generator.thread_group_cache), 3)
+
+        # 线程数变化影响全部线程组
+        built.clear()
+        generator.generate_from_endpoints(data, num_threads=4)
+        self.assertEqual(len(built), 3)
+
+    def test_shared_generator_is_reentrant(self):
+        """同一个生成器被多个线程并发调用时，各自的结果与独立生成一致。"""
+        def data(i: int) -> dict:
+            return {
+                "base_url": f"https://api{i}.example.com",
+                "scenarios": [{"name": f"Flow {i}", "steps": [{"ref": "GET /api/users"}, {"ref": "orders"}]}],
+                "endpoints": [
+                    {"path": "/api/users", "method": "GET"},
+                    {"name": "orders", "path": f"/api/orders/{i}", "method": "POST", "body": {"id": i}},
+                ],
+            }
+
+        generator = JmxGenerator()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: generator.generate_from_endpoints(data(i), num_threads=i + 1),
+                                    range(32)))
+        for i, xml in enumerate(results):
+            self.assertEqual(xml, JmxGenerator().generate_from_endpoints(data(i), num_threads=i + 1))
+
+    def test_watch_regenerates_on_save(self):
+        """--watch 生成后常驻，输入保存后重新生成。"""
+        data = {
+            "base_url": "https://api.example.com",
+            "endpoints": [{"path": "/api/users", "method": "GET"}],
+        }
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = _write_endpoints(td_path, data)
+            output_path = td_path / "out.jmx"
+
+            def wait_for(predicate) -> None:
+                deadline = time.monotonic() + 30
+                while time.monotonic() < deadline:
+                    if predicate():
+                        return
+                    time.sleep(0.05)
+                self.fail("watch did not regenerate in time")
+
+            def samplers() -> set:
+                try:
+                    return {s.get("testname") for s in _parse_jmx(output_path).iter("HTTPSamplerProxy")}
+                except (OSError, ET.ParseError):
+                    return set()
+
+            proc = subprocess.Popen(
+                [_venv_python(), _jmx_script(), "--input", str(input_path), "--output", str(output_path),
+                 "--watch", "--interval", "0.05"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_for(lambda: "GET /api/users" in samplers())
+                data["endpoints"].append({"path": "/api/orders", "method": "POST"})
+                input_path.write_text(json.dumps(data, ensure_ascii=False) + "\n", encoding="utf-8")
+                wait_for(lambda: "POST /api/orders" in samplers())
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,145 @@
+import gzip
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from scripts.ingest_traffic import ingest
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _scripts_dir() -> Path:
+    return Path(__file__).resolve().parents[1] / "scripts"
+
+
+def _nginx_line(ip: str, second: int, method: str, target: str, status: int = 200, size: int = 512) -> str:
+    return (f'{ip} - - [10/Oct/2025:13:{second // 60:02d}:{second % 60:02d} +0800] '
+            f'"{method} {target} HTTP/1.1" {status} {size} "-" "Mozilla/5.0"\n')
+
+
+class TestIngestTraffic(unittest.TestCase):
+
+    def test_nginx_log_clusters_templates_and_weights(self):
+        """nginx 日志中的具体 URL 聚类为模板，并输出权重、到达率和思考时间。"""
+        lines = []
+        for i in range(30):
+            # 每个客户端先查列表再看详情，间隔 2 秒
+            ip = f"10.0.0.{i}"
+            lines.append(_nginx_line(ip, i * 4, "GET", "/api/users?page=1"))
+            lines.append(_nginx_line(ip, i * 4 + 2, "GET", f"/api/users/{1000 + i}"))
+        lines.append(_nginx_line("10.0.0.99", 200, "GET", "/static/app.js"))
+        lines.append("not a log line\n")
+
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            log_path = td_path / "access.log.gz"
+            with gzip.open(log_path, "wt", encoding="utf-8") as f:
+                f.writelines(lines)
+            output_path = td_path / "endpoints.json"
+
+            subprocess.check_call(
+                [_venv_python(), str(_scripts_dir() / "ingest_traffic.py"),
+                 "--input", str(log_path), "--output", str(output_path),
+                 "--base-url", "https://api.example.com"],
+                timeout=60,
+            )
+
+            data = json.loads(output_path.read_text(encoding="utf-8"))
+            self.assertEqual(data["base_url"], "https://api.example.com")
+            self.assertEqual(data["load_profile"]["requests"], 60)
+            paths = {e["path"]: e for e in data["endpoints"]}
+            self.assertEqual(set(paths), {"/api/users", "/api/users/{id}"})
+
+            detail = paths["/api/users/{id}"]
+            self.assertAlmostEqual(detail["weight"], 0.5)
+            self.assertEqual(detail["parameters"][0], {"name": "id", "in": "path", "default": "1000"})
+            self.assertEqual(detail["think_time_stats"]["p50_ms"], 2000)
+            self.assertEqual(data["think_time"]["type"], "gaussian")
+            listing = paths["/api/users"]
+            self.assertEqual(listing["parameters"], [{"name": "page", "in": "query", "default": "1"}])
+
+    def test_to_endpoints_is_repeatable(self):
+        """多次调用 to_endpoints 结果相同（不会重复累加权重与思考时间），之后仍可继续添加记录。"""
+        lines = []
+        for i in range(25):
+            # 非数字的路径段要到 to_endpoints 时才按取值数折叠并合并统计
+            lines.append(_nginx_line(f"10.0.0.{i}", i * 4, "GET", "/api/users?page=1"))
+            lines.append(_nginx_line(f"10.0.0.{i}", i * 4 + 2, "GET", f"/api/users/u-{chr(97 + i)}x"))
+        with tempfile.TemporaryDirectory() as td:
+            log_path = Path(td) / "access.log"
+            log_path.write_text("".join(lines), encoding="utf-8")
+            model = ingest([str(log_path)])
+
+        first = model.to_endpoints()
+        self.assertEqual(model.to_endpoints(), first)
+        detail = next(e for e in first["endpoints"] if e["path"] == "/api/users/{id}")
+        self.assertAlmostEqual(detail["weight"], 0.5)
+        self.assertEqual(detail["think_time_stats"]["count"], 25)
+
+        model.add({"time": None, "client": "10.0.0.99", "method": "GET", "url": "/api/users/u-zz",
+                   "status": 200, "request_bytes": None, "response_bytes": 512, "elapsed_ms": None, "body": None})
+        self.assertEqual(model.to_endpoints()["load_profile"]["requests"], 51)
+
+    def test_har_high_cardinality_segments_and_generate_jmx(self):
+        """HAR 中取值过多的路径段被折叠，生成的 endpoints.json 可直接按权重生成 JMX。"""
+        entries = []
+        for i in range(25):
+            entries.append({
+                "startedDateTime": f"2025-10-10T10:00:{i:02d}.000Z",
+                "time": 35.5,
+                "request": {"method": "GET", "url": f"https://shop.example.com/api/products/sku-{chr(97 + i)}x",
+                            "bodySize": 0},
+                "response": {"status": 200, "bodySize": 2048},
+            })
+        for i in range(5):
+            entries.append({
+                "startedDateTime": f"2025-10-10T10:01:{i:02d}.000Z",
+                "time": 80,
+                "request": {"method": "POST", "url": "https://shop.example.com/api/orders",
+                            "postData": {"mimeType": "application/json", "text": "{\"sku\": \"sku-ax\"}"}},
+                "response": {"status": 201, "bodySize": 128},
+            })
+        har = {"log": {"version": "1.2", "creator": {"name": "test"}, "entries": entries}}
+
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            har_path = td_path / "session.har"
+            har_path.write_text(json.dumps(har), encoding="utf-8")
+            endpoints_path = td_path / "endpoints.json"
+            jmx_path = td_path / "out.jmx"
+
+            subprocess.check_call(
+                [_venv_python(), str(_scripts_dir() / "ingest_traffic.py"),
+                 "--input", str(har_path), "--output", str(endpoints_path)],
+                timeout=60,
+            )
+            data = json.loads(endpoints_path.read_text(encoding="utf-8"))
+            self.assertEqual(data["base_url"], "https://shop.example.com")
+            paths = {(e["method"], e["path"]): e for e in data["endpoints"]}
+            self.assertIn(("GET", "/api/products/{id}"), paths)
+            order = paths[("POST", "/api/orders")]
+            self.assertEqual(order["requestBody"]["content"]["application/json"]["example"], {"sku": "sku-ax"})
+            self.assertEqual(order["payload"]["response_bytes_mean"], 128)
+
+            subprocess.check_call(
+                [_venv_python(), str(_scripts_dir() / "generate_jmx.py"),
+                 "--input", str(endpoints_path), "--output", str(jmx_path), "--threads", "30"],
+                timeout=60,
+            )
+            root = ET.parse(str(jmx_path)).getroot()
+            threads = {
+                tg.get("testname"): tg.find("stringProp[@name='ThreadGroup.num_threads']").text
+                for tg in root.findall(".//ThreadGroup")
+            }
+            self.assertEqual(threads["GET /api/products/{id}"], "25")
+            self.assertEqual(threads["POST /api/orders"], "5")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,266 @@
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from scripts.generator import JmxGenerator
+from scripts.parsers import CurlParser, PostmanParser
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _jmx_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "generate_jmx.py")
+
+
+def _collection() -> dict:
+    return {
+        "info": {"name": "Shop", "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"},
+        "variable": [
+            {"key": "baseUrl", "value": "https://api.example.com/v1"},
+            {"key": "token", "value": "secret-token"},
+        ],
+        "auth": {"type": "bearer", "bearer": [{"key": "token", "value": "{{token}}", "type": "string"}]},
+        "item": [
+            {
+                "name": "用户",
+                "item": [
+                    {
+                        "name": "获取用户",
+                        "request": {
+                            "method": "GET",
+                            "url": {
+                                "raw": "{{baseUrl}}/users/:id?expand=profile",
+                                "host": ["{{baseUrl}}"],
+                                "path": ["users", ":id"],
+                                "query": [{"key": "expand", "value": "profile"},
+                                          {"key": "debug", "value": "1", "disabled": True}],
+                                "variable": [{"key": "id", "value": "42"}],
+                            },
+                        },
+                        "response": [
+                            {"name": "ok", "code": 200, "status": "OK", "body": "{\"id\": 42, \"name\": \"John\"}"}
+                        ],
+                    },
+                    {
+                        "name": "公开",
+                        "auth": {"type": "noauth"},
+                        "item": [
+                            {
+                                "name": "健康检查",
+                                "request": {"method": "GET", "url": "{{baseUrl}}/health"},
+                            }
+                        ],
+                    },
+                ],
+            },
+            {
+                "name": "创建订单",
+                "request": {
+                    "method": "POST",
+                    "header": [{"key": "Content-Type", "value": "application/json"}],
+                    "url": "{{baseUrl}}/orders?source={{channel}}",
+                    "body": {"mode": "raw", "raw": "{\"sku\": \"A1\", \"qty\": 2}"},
+                },
+            },
+        ],
+    }
+
+
+class TestPostmanParser(unittest.TestCase):
+
+    def test_nested_folders_variables_and_auth_inheritance(self):
+        """嵌套文件夹、集合变量、路径变量与 auth 继承正确展开。"""
+        collection = _collection()
+        # 请求级 auth（request.auth）覆盖集合的 bearer
+        collection["item"].extend([
+            {"name": "登出", "request": {"method": "POST", "url": "{{baseUrl}}/logout", "auth": {"type": "noauth"}}},
+            {"name": "管理", "request": {"method": "GET", "url": "{{baseUrl}}/admin", "auth": {
+                "type": "basic", "basic": [{"key": "username", "value": "admin"}, {"key": "password", "value": "pwd"}]}}},
+        ])
+        parser = PostmanParser()
+        endpoints = parser.parse_from_string(json.dumps(collection))
+
+        self.assertEqual(parser.get_base_url(), "https://api.example.com")
+        self.assertEqual([e["name"] for e in endpoints], ["获取用户", "健康检查", "创建订单", "登出", "管理"])
+
+        get_user = endpoints[0]
+        self.assertEqual(get_user["path"], "/v1/users/{id}")
+        self.assertEqual(get_user["tags"], ["用户"])
+        params = {(p["in"], p["name"]): p["default"] for p in get_user["parameters"]}
+        self.assertEqual(params[("path", "id")], "42")
+        self.assertEqual(params[("query", "expand")], "profile")
+        self.assertNotIn(("query", "debug"), params)
+        self.assertEqual(params[("header", "Authorization")], "Bearer secret-token")
+        self.assertEqual(get_user["responses"]["200"]["content"]["application/json"]["example"]["id"], 42)
+
+        health = endpoints[1]
+        self.assertFalse([p for p in health["parameters"] if p["name"] == "Authorization"])
+
+        order = endpoints[2]
+        self.assertEqual(order["method"], "POST")
+        params = {(p["in"], p["name"]): p["default"] for p in order["parameters"]}
+        # 未定义的变量转换为 JMeter 变量
+        self.assertEqual(params[("query", "source")], "${channel}")
+        self.assertEqual(order["requestBody"]["content"]["application/json"]["example"], {"sku": "A1", "qty": 2})
+
+        logout, admin = endpoints[3:]
+        self.assertFalse([p for p in logout["parameters"] if p["name"] == "Authorization"])
+        self.assertEqual([p["default"] for p in admin["parameters"] if p["name"] == "Authorization"],
+                         ["Basic YWRtaW46cHdk"])
+
+    def test_large_collection_parses_quickly(self):
+        """2000 个请求的集合解析耗时远小于 1 秒。"""
+        requests = [
+            {"name": f"req {i}", "request": {"method": "GET", "url": f"{{{{baseUrl}}}}/items/{i}?page=1"}}
+            for i in range(2000)
+        ]
+        collection = {"info": {"name": "big"}, "variable": [{"key": "baseUrl", "value": "https://x.example.com"}],
+                      "item": [{"name": f"folder {n}", "item": requests[n::10]} for n in range(10)]}
+        content = json.dumps(collection)
+
+        start = time.perf_counter()
+        endpoints = PostmanParser().parse_from_string(content)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(endpoints), 2000)
+        self.assertLess(elapsed, 1.0)
+
+
+class TestCurlParser(unittest.TestCase):
+
+    def test_multiple_commands_with_continuations(self):
+        """多条 curl 命令（含续行、组合短选项、-u、-G）各生成一个 endpoint。"""
+        content = """
+curl -sS -X POST 'https://api.example.com/api/users?source=web' \\
+  -H 'Content-Type: application/json' \\
+  -H 'Authorization: Bearer token123' \\
+  --data-raw $'{"name": "John", "email": "john@test.com"}'
+
+curl -G https://api.example.com/api/search -d q=phone -d page=2 -u admin:pwd
+"""
+        parser = CurlParser()
+        endpoints = parser.parse_from_string(content)
+        self.assertEqual(parser.get_base_url(), "https://api.example.com")
+        self.assertEqual(len(endpoints), 2)
+
+        create = endpoints[0]
+        self.assertEqual((create["method"], create["path"]), ("POST", "/api/users"))
+        params = {(p["in"], p["name"]): p["default"] for p in create["parameters"]}
+        self.assertEqual(params[("query", "source")], "web")
+        self.assertEqual(params[("header", "Authorization")], "Bearer token123")
+        self.assertEqual(create["requestBody"]["content"]["application/json"]["example"]["name"], "John")
+
+        search = endpoints[1]
+        self.assertEqual((search["method"], search["path"]), ("GET", "/api/search"))
+        params = {(p["in"], p["name"]): p["default"] for p in search["parameters"]}
+        self.assertEqual(params[("query", "q")], "phone")
+        self.assertEqual(params[("query", "page")], "2")
+        self.assertEqual(params[("header", "Authorization")], "Basic YWRtaW46cHdk")
+        self.assertIsNone(search["requestBody"])
+
+    def test_data_file_reads_file_content(self):
+        """-d / --data / --data-binary / --data-ascii / --json 的 @path 读取文件内容，--data-raw 保留 @。"""
+        endpoints = CurlParser().parse_from_string(
+            "curl https://x.io/a -d @body.json\n"
+            "curl https://x.io/b --data @f.txt\n"
+            "curl https://x.io/c --data-binary @b.bin\n"
+            "curl https://x.io/d --data-ascii @d.txt\n"
+            "curl https://x.io/e --json @e.json\n"
+            "curl https://x.io/f --data-raw @raw\n")
+        bodies = [next(iter(e["requestBody"]["content"].values()))["example"] for e in endpoints]
+        self.assertEqual(bodies, [
+            "${__FileToString(body.json,,)}", "${__FileToString(f.txt,,)}", "${__FileToString(b.bin,,)}",
+            "${__FileToString(d.txt,,)}", "${__FileToString(e.json,,)}", "@raw",
+        ])
+        self.assertEqual([e["method"] for e in endpoints], ["POST"] * 6)
+
+    def test_form_generates_multipart_post(self):
+        """-F 生成 multipart POST：文本字段为参数，@文件为 HTTPFileArg，Content-Type 交给 JMeter。"""
+        parser = CurlParser()
+        upload = parser.parse_from_string(
+            "curl -F 'file=@a.png;type=image/png' -F desc=hi -H 'Content-Type: multipart/form-data' "
+            "https://x.io/up")[0]
+        self.assertEqual(upload["method"], "POST")
+        media = upload["requestBody"]["content"]["multipart/form-data"]
+        self.assertEqual(media["example"], {"file": "a.png", "desc": "hi"})
+        self.assertEqual(media["schema"]["properties"]["file"]["format"], "binary")
+
+        xml = JmxGenerator()._generate_jmx([upload], parser.get_base_url(), "Upload", 1, 1, 1)
+        sampler = ET.fromstring(xml).find(".//HTTPSamplerProxy")
+        self.assertEqual(sampler.find("boolProp[@name='HTTPSampler.DO_MULTIPART_POST']").text, "true")
+        file_arg = sampler.find(".//elementProp[@elementType='HTTPFileArg']")
+        self.assertEqual([file_arg.find(f"stringProp[@name='File.{key}']").text
+                          for key in ("path", "paramname", "mimetype")], ["a.png", "file", "image/png"])
+        args = sampler.findall(".//elementProp[@elementType='HTTPArgument']")
+        self.assertEqual([(a.find("stringProp[@name='Argument.name']").text,
+                           a.find("stringProp[@name='Argument.value']").text) for a in args], [("desc", "hi")])
+        self.assertNotIn("multipart/form-data", xml)
+
+    def test_unknown_option_value_is_not_url(self):
+        """未处理但带参数的长选项（如 --max-redirs）跳过其参数，不会被当作 URL。"""
+        parser = CurlParser()
+        endpoint = parser.parse_from_string("curl --max-redirs 5 --compressed https://x.io/a")[0]
+        self.assertEqual(parser.get_base_url(), "https://x.io")
+        self.assertEqual((endpoint["method"], endpoint["path"]), ("GET", "/a"))
+
+    def test_ansi_c_quoting_is_decoded(self):
+        """$'...' 中的 \\'、\\\\、\\uXXXX 与 UTF-8 字节序列 \\xHH 按 bash 规则解码。"""
+        endpoint = CurlParser().parse_from_string(
+            "curl https://x.io/q -H $'X-Note: it\\'s' --data-raw $'{\"a\": \"\\u4e2d\\xe6\\x96\\x87\\\\n\"}'")[0]
+        params = {(p["in"], p["name"]): p["default"] for p in endpoint["parameters"]}
+        self.assertEqual(params[("header", "X-Note")], "it's")
+        self.assertEqual(endpoint["requestBody"]["content"]["application/json"]["example"], {"a": "中文\n"})
+
+    def test_data_urlencode_encodes_values(self):
+        """--data-urlencode 按 curl 规则只编码内容部分，@文件 以 JMeter 函数读取并编码。"""
+        endpoint = CurlParser().parse_from_string(
+            "curl https://x.io/e --data-urlencode 'q=a b&c' --data-urlencode '=x/y' --data-urlencode 'f@d.txt'")[0]
+        body = endpoint["requestBody"]["content"]["application/x-www-form-urlencoded"]["example"]
+        self.assertEqual(body, "q=a%20b%26c&x%2Fy&f=${__urlencode(${__FileToString(d.txt,,)})}")
+
+    def test_cli_generates_jmx_from_curl_and_postman(self):
+        """generate_jmx.py --format 直接从 curl / Postman 生成 JMX。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            curl_path = td_path / "commands.sh"
+            curl_path.write_text(
+                "curl -X PUT https://api.example.com/api/users/1 -d 'name=John&age=3'\n", encoding="utf-8")
+            postman_path = td_path / "collection.json"
+            postman_path.write_text(json.dumps(_collection(), ensure_ascii=False), encoding="utf-8")
+
+            curl_jmx = td_path / "curl.jmx"
+            subprocess.check_call(
+                [_venv_python(), _jmx_script(), "--input", str(curl_path), "--format", "curl",
+                 "--output", str(curl_jmx)],
+                timeout=30,
+            )
+            root = ET.parse(str(curl_jmx)).getroot()
+            sampler = root.find(".//HTTPSamplerProxy")
+            self.assertEqual(sampler.find("stringProp[@name='HTTPSampler.method']").text, "PUT")
+            body = sampler.find(".//elementProp[@elementType='HTTPArgument']/stringProp[@name='Argument.value']")
+            self.assertEqual(body.text, "name=John&age=3")
+            header_values = [h.text for h in root.findall(".//stringProp[@name='Header.value']")]
+            self.assertIn("application/x-www-form-urlencoded", header_values)
+
+            postman_jmx = td_path / "postman.jmx"
+            subprocess.check_call(
+                [_venv_python(), _jmx_script(), "--input", str(postman_path), "--format", "postman",
+                 "--output", str(postman_jmx)],
+                timeout=30,
+            )
+            root = ET.parse(str(postman_jmx)).getroot()
+            self.assertEqual(len(root.findall(".//ThreadGroup")), 3)
+            paths = [p.text for p in root.findall(".//stringProp[@name='HTTPSampler.path']")]
+            self.assertIn("/v1/users/42", paths)
+
+
+if __name__ == "__main__":
+    unittest.main()
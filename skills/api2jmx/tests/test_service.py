@@ -0,0 +1,155 @@
+import http.client
+import json
+import socket
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from scripts.generator import JmxGenerator
+from scripts.local_service import LruCache
+from scripts.service import GenerationService, make_server
+
+
+def _endpoints(count: int) -> dict:
+    return {
+        "base_url": "https://api.example.com",
+        "endpoints": [{"path": f"/api/items/{i}", "method": "GET", "summary": f"Item {i}"} for i in range(count)],
+    }
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self.unix_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+class TestGenerationService(unittest.TestCase):
+    def _start(self, **kwargs):
+        server = make_server(GenerationService(), port=0, **kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def _request(self, conn: http.client.HTTPConnection, method: str, path: str, body: bytes = None):
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        return response.status, response.read()
+
+    def test_concurrent_requests_match_cli_output(self):
+        server = self._start()
+        host, port = server.server_address
+        data = _endpoints(3)
+        body = json.dumps(data).encode("utf-8")
+
+        def post(threads: int):
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            try:
+                return threads, self._request(conn, "POST", f"/jmx?threads={threads}&name=Portal", body)
+            finally:
+                conn.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(post, [1, 2, 3, 4] * 4))
+        for threads, (status, xml) in results:
+            self.assertEqual(status, 200)
+            expected = JmxGenerator().generate_from_endpoints(data, test_plan_name="Portal", num_threads=threads)
+            self.assertEqual(xml.decode("utf-8"), expected)
+
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        self.addCleanup(conn.close)
+        status, health = self._request(conn, "GET", "/health")
+        stats = json.loads(health)
+        self.assertEqual(status, 200)
+        # 同一文档只缓存一份解析结果，4 种选项各缓存一份 JMX；再次请求直接命中
+        self.assertEqual(stats["parse_cache"]["size"], 1)
+        self.assertEqual(stats["result_cache"]["size"], 4)
+        self.assertEqual(self._request(conn, "POST", "/jmx?threads=2&name=Portal", body)[0], 200)
+        stats_after = json.loads(self._request(conn, "GET", "/health")[1])
+        self.assertEqual(stats_after["result_cache"]["hits"], stats["result_cache"]["hits"] + 1)
+
+        # 同一连接上的错误请求：格式、选项、空输入、路径
+        for path, payload, code in [
+            ("/jmx?format=wsdl", body, 400),
+            ("/jmx?threads=many", body, 400),
+            ("/jmx?unknown=1", body, 400),
+            ("/jmx", b'{"endpoints": []}', 400),
+            ("/jmx", b'{"endpoints": [', 400),
+            ("/jmx", b'[1, 2]', 400),
+            ("/jmx", b'{"endpoints": [null]}', 400),
+            ("/jmx", b'{"endpoints": "abc"}', 400),
+            ("/jmx", b'{"endpoints": [{"path": "/a"}]}', 400),
+            ("/xlsx", body, 404),
+        ]:
+            with self.subTest(path=path):
+                status, error = self._request(conn, "POST", path, payload)
+                self.assertEqual(status, code)
+                self.assertIn("error", json.loads(error))
+
+        # 负数 Content-Length 直接拒绝，不会在保持的连接上阻塞读取
+        conn = http.client.HTTPConnection(host, port, timeout=5)
+        self.addCleanup(conn.close)
+        conn.putrequest("POST", "/jmx")
+        conn.putheader("Content-Length", "-1")
+        conn.endheaders()
+        self.assertEqual(conn.getresponse().status, 400)
+
+    def test_cache_is_bounded_by_bytes(self):
+        cache = LruCache(max_bytes=10)
+        cache.put("a", "A", 4)
+        cache.put("b", "B", 4)
+        self.assertEqual(cache.get("a"), "A")
+        cache.put("c", "C", 4)
+        # 超出上限时淘汰最久未用的 b；单条超过上限的不缓存
+        self.assertIsNone(cache.get("b"))
+        cache.put("huge", "H", 11)
+        self.assertIsNone(cache.get("huge"))
+        self.assertEqual({k: v for k, v in cache.stats().items() if k in ("size", "bytes")}, {"size": 2, "bytes": 8})
+
+    def test_shared_modules_match_testspec_copies(self):
+        """共享模块在两个 skill 中各有一份，内容必须一致（见仓库 README「共享模块」）。"""
+        scripts = Path(__file__).resolve().parents[1] / "scripts"
+        other = Path(__file__).resolve().parents[2] / "testspec-generate" / "scripts"
+        if not other.exists():
+            self.skipTest("testspec-generate 未与 api2jmx 一同安装")
+        for name in ("local_service.py", "build_cache.py"):
+            with self.subTest(name=name):
+                self.assertEqual((scripts / name).read_bytes(), (other / name).read_bytes())
+
+    def test_curl_input_over_unix_socket(self):
+        if not hasattr(socket, "AF_UNIX"):
+            self.skipTest("Unix socket not supported")
+        with tempfile.TemporaryDirectory() as td:
+            sock_path = str(Path(td) / "api2jmx.sock")
+            self._start(unix_socket=sock_path)
+            conn = _UnixConnection(sock_path)
+            self.addCleanup(conn.close)
+            status, xml = self._request(
+                conn, "POST", "/jmx?format=curl&think_time=constant:500",
+                b"curl -X POST https://api.example.com/api/login -H 'Content-Type: application/json' "
+                b"-d '{\"user\": \"a\"}'\n")
+            self.assertEqual(status, 200)
+            self.assertIn(b"/api/login", xml)
+            self.assertIn(b"ConstantTimer", xml)
+
+    def test_unix_socket_path_must_not_be_regular_file(self):
+        if not hasattr(socket, "AF_UNIX"):
+            self.skipTest("Unix socket not supported")
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "endpoints.json"
+            path.write_text("{}", encoding="utf-8")
+            with self.assertRaises(FileExistsError):
+                make_server(GenerationService(), unix_socket=str(path))
+            self.assertEqual(path.read_text(encoding="utf-8"), "{}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+产物构建缓存：记录每个产物的输入摘要、生成选项与生成器版本，输入未变时跳过重新生成。
+
+清单（.build-manifest.json）与产物放在同一目录，每个产物一条记录：
+    generator: 脚本目录下全部 .py 源码的摘要（脚本升级后自动失效）
+    options:   影响产物内容的命令行选项
+    inputs / outputs: 文件大小、mtime 与内容摘要（路径相对清单目录）
+
+检查时先比较大小与 mtime，一致则直接沿用记录的摘要，不读取文件内容；
+不一致（如 CI 重新检出）时再计算摘要比较，内容相同仍视为未变化。
+
+多个脚本可能同时写同一目录的清单（如 CI 并行生成 Excel 与 XMind），
+写入时在清单旁的 .build-manifest.json.lock 上持有排他锁，读取-合并-替换期间不会覆盖其他进程的记录。
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MANIFEST_NAME = ".build-manifest.json"
+LOCK_SUFFIX = ".lock"
+MANIFEST_VERSION = 1
+
+_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """文件内容摘要（blake2b-128），按块读取。"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generator_digest() -> str:
+    """生成器版本：本脚本所在目录下全部 .py 源码的摘要。"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def _exclusive_lock(lock_path: str) -> Iterator[None]:
+    """在锁文件上持有排他的建议锁（阻塞等待），退出时释放。锁文件保留，删除会让等待中的进程锁住旧文件。"""
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK 重试约 10 秒后仍失败时抛出 OSError，继续等待
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _file_record(path: str, recorded: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """文件当前的 {size, mtime_ns, digest}；大小与 mtime 与 recorded 一致时沿用其摘要。文件不存在返回 None。"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if recorded and recorded.get("size") == st.st_size and recorded.get("mtime_ns") == st.st_mtime_ns:
+        return recorded
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": file_digest(path)}
+
+
+class BuildCache:
+    """单个产物的缓存记录。
+
+    用法：
+        cache = BuildCache(output_path, [input_path], options)
+        if not force and cache.is_fresh():
+            return
+        ... 生成产物 ...
+        cache.record()
+    """
+
+    def __init__(self, output_path: str, inputs: Iterable[str], options: Dict[str, Any]) -> None:
+        self.output_path = output_path
+        self.base_dir = os.path.dirname(os.path.abspath(output_path))
+        self.manifest_path = os.path.join(self.base_dir, MANIFEST_NAME)
+        self.key = os.path.basename(output_path)
+        self.inputs = list(inputs)
+        # 规范化为 JSON 可表示的值，便于与清单中的记录直接比较
+        self.options = json.loads(json.dumps(options, sort_keys=True, default=str))
+        self.generator = generator_digest()
+
+    def _rel(self, path: str) -> str:
+        try:
+            return os.path.relpath(os.path.abspath(path), self.base_dir)
+        except ValueError:
+            # Windows 下不同盘符无法取相对路径
+            return os.path.abspath(path)
+
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.base_dir, rel)
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    def _save_entry(self, entry: Dict[str, Any]) -> None:
+        """
+        写入本产物的记录：持锁重新读取清单后合并，临时文件 + 替换，
+        既不会写出半个清单，也不会覆盖其他进程同时写入的记录。
+        """
+        os.makedirs(self.base_dir, exist_ok=True)
+        with _exclusive_lock(self.manifest_path + LOCK_SUFFIX):
+            manifest = self._load()
+            entries = manifest.get("entries") if isinstance(manifest.get("entries"), dict) else {}
+            entries[self.key] = entry
+            fd, tmp_path = tempfile.mkstemp(prefix=MANIFEST_NAME, suffix=".tmp", dir=self.base_dir)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"version": MANIFEST_VERSION, "entries": entries}, f,
+                              ensure_ascii=False, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.manifest_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    @staticmethod
+    def _current(recorded: Dict[str, Any], paths: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """paths 为 {相对路径: 实际路径}；全部文件与记录内容一致时返回最新记录，否则返回 None。"""
+        if set(recorded) != set(paths):
+            return None
+        current = {}
+        for rel, path in paths.items():
+            record = _file_record(path, recorded[rel])
+            if record is None or record["digest"] != recorded[rel].get("digest"):
+                return None
+            current[rel] = record
+        return current
+
+    def is_fresh(self) -> bool:
+        """产物存在且输入、选项、生成器版本均与上次生成时一致。"""
+        entry = self._load().get("entries", {}).get(self.key)
+        if not isinstance(entry, dict):
+            return False
+        if entry.get("generator") != self.generator or entry.get("options") != self.options:
+            return False
+        inputs = self._current(entry.get("inputs") or {}, {self._rel(p): p for p in self.inputs})
+        if inputs is None:
+            return False
+        recorded_outputs = entry.get("outputs") or {}
+        if not recorded_outputs:
+            return False
+        outputs = self._current(recorded_outputs, {rel: self._abs(rel) for rel in recorded_outputs})
+        if outputs is None:
+            return False
+        if inputs != entry["inputs"] or outputs != recorded_outputs:
+            # 内容未变但大小/mtime 变了（如重新检出），刷新记录，下次检查无需再读文件
+            self._save_entry(dict(entry, inputs=inputs, outputs=outputs))
+        return True
+
+    def record(self, outputs: Optional[List[str]] = None) -> None:
+        """生成成功后记录本次输入与产物；outputs 默认为 output_path（拆分为多个文件时传入全部路径）。"""
+        entry = {
+            "generator": self.generator,
+            "options": self.options,
+            "inputs": {},
+            "outputs": {},
+        }
+        for path in self.inputs:
+            entry["inputs"][self._rel(path)] = _file_record(path)
+        for path in outputs or [self.output_path]:
+            entry["outputs"][self._rel(path)] = _file_record(path)
+        self._save_entry(entry)
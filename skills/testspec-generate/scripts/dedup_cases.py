@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+TestSpec 近似重复用例检测（评审 H1 冗余检测的候选生成阶段）：MinHash 签名 + LSH 分桶，近线性时间找出相似用例簇。
+
+两两比较标题/步骤/预期结果是 O(n²)，5 万条用例时不可行。本脚本：
+1. 将每条用例的 title / steps / expected_result 切分为 shingle：中日韩文字取相邻二字组，
+   字母数字取小写单词；shingle 带字段前缀，同一词出现在不同字段中视为不同特征
+2. 用 NumPy 批量计算 MinHash 签名：num_perm 个 multiply-shift 哈希函数（64 位乘法取高 32 位，无需取模），
+   按用例分批，批内矩阵保持在 CPU 缓存大小，避免一次展开全部 shingle × 哈希函数
+3. LSH 分桶：签名按 bands × rows 切分，任一 band 完全相同的用例成为候选；桶内只与首个成员和前一个成员配对，
+   大桶（模板化用例）也不会退化为平方级
+4. 候选对按 shingle 集合的精确 Jaccard 相似度复核，达到阈值的用并查集合并为簇
+
+输出的簇供评审者做 H1 的 AI 判断阶段，只需逐簇确认，不再通读全部用例。
+
+用法：
+    python dedup_cases.py --input testcases.json --output h1-candidates.json
+    python dedup_cases.py --input testcases.json --output h1-candidates.json --threshold 0.8 --num-perm 128
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+import zlib
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    from utils import configure_logging, iter_and_validate_testcases
+except ImportError:
+    from .utils import configure_logging, iter_and_validate_testcases
+
+logger = logging.getLogger(__name__)
+
+# numpy 导入约 0.1s：--help、参数错误等无需计算的路径不必承担，首次检测时由 _load_numpy() 导入
+np: Any = None
+
+
+def _load_numpy() -> bool:
+    """按需导入 numpy；未安装时返回 False。"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+# 参与比较的字段
+FIELDS = ("title", "steps", "expected_result")
+
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_NUM_PERM = 128
+DEFAULT_SEED = 1
+
+# 每批参与 MinHash 计算的 shingle 数上限（批内矩阵为 该数 × num_perm 个 uint64，约 1MB 时最快）
+_BATCH_SHINGLES = 1 << 10
+
+# 中日韩统一表意文字（含扩展 A）、平假名、片假名、谚文；其余按字母数字单词切分
+_CJK_RUN_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]+")
+_WORD_RE = re.compile(r"[0-9a-z]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """CJK 感知切分：连续的中日韩文字取相邻二字组（单字保留为一元组），其余取小写字母数字单词。"""
+    text = text.lower()
+    tokens: List[str] = []
+    last = 0
+    for match in _CJK_RUN_RE.finditer(text):
+        tokens.extend(_WORD_RE.findall(text, last, match.start()))
+        run = match.group()
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        last = match.end()
+    tokens.extend(_WORD_RE.findall(text, last))
+    return tokens
+
+
+# 字段前缀的 CRC，作为该字段 shingle 哈希的初值（等价于对 "字段名\x1f词" 求 CRC，但无需拼接字符串）
+_FIELD_SEEDS = [(field, zlib.crc32(f"{field}\x1f".encode("utf-8"))) for field in FIELDS]
+
+
+def shingle_hashes(tc: Dict[str, Any]) -> List[int]:
+    """用例的 shingle 集合（32 位 CRC 哈希，已去重排序）。"""
+    hashes = set()
+    for field, seed in _FIELD_SEEDS:
+        value = tc.get(field)
+        if value:
+            text = value if isinstance(value, str) else str(value)
+            hashes.update(zlib.crc32(token.encode("utf-8"), seed) for token in tokenize(text))
+    return sorted(hashes)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """选择 bands × rows（rows 整除 num_perm），使 LSH 的 S 曲线拐点 (1/b)^(1/r) 最接近阈值。"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        knee = (1.0 / bands) ** (1.0 / rows)
+        if best is None or abs(knee - threshold) < best[0]:
+            best = (abs(knee - threshold), bands, rows)
+    return best[1], best[2]
+
+
+def minhash_signatures(shingles: "np.ndarray", offsets: "np.ndarray", num_perm: int, seed: int) -> "np.ndarray":
+    """
+    批量计算 MinHash 签名。
+
+    Args:
+        shingles: 全部用例的 shingle 哈希（uint64，按用例依次拼接）
+        offsets: 长度 n+1，第 i 条用例的 shingle 为 shingles[offsets[i]:offsets[i+1]]；不允许空用例
+        num_perm: 哈希函数个数
+        seed: 哈希函数参数的随机种子
+
+    Returns:
+        (n, num_perm) 的 uint32 签名矩阵
+    """
+    rng = np.random.RandomState(seed)
+    # multiply-shift：h(x) = (a * x + b) >> 32（uint64 乘加按 2^64 回绕），a 为奇数
+    a = (rng.randint(0, 1 << 62, size=num_perm, dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+    b = rng.randint(0, 1 << 62, size=num_perm, dtype=np.int64).astype(np.uint64)
+    shift = np.uint64(32)
+
+    n = len(offsets) - 1
+    signatures = np.empty((n, num_perm), dtype=np.uint32)
+    start = 0
+    while start < n:
+        # 按用例切批，批内 shingle 数不超过上限（单条用例超限时独占一批）
+        end = int(np.searchsorted(offsets, offsets[start] + _BATCH_SHINGLES, side="right")) - 1
+        end = min(max(end, start + 1), n)
+        lo, hi = offsets[start], offsets[end]
+        values = shingles[lo:hi, None] * a
+        values += b
+        values >>= shift
+        signatures[start:end] = np.minimum.reduceat(values.astype(np.uint32), offsets[start:end] - lo, axis=0)
+        start = end
+    return signatures
+
+
+def lsh_candidates(signatures: "np.ndarray", bands: int, rows: int) -> "np.ndarray":
+    """LSH 分桶，返回去重后的候选对 (k, 2)，每对 i < j。"""
+    n = len(signatures)
+    pairs = []
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        if not same.any():
+            continue
+        # 桶内成员与前一个成员配对
+        pairs.append(np.stack([order[:-1][same], order[1:][same]], axis=1))
+        # 桶内成员与桶首成员配对
+        bucket_start = np.concatenate(([True], ~same))
+        first = np.maximum.accumulate(np.where(bucket_start, np.arange(n), 0))
+        star = ~bucket_start & (first != np.arange(n) - 1)
+        if star.any():
+            pairs.append(np.stack([order[first[star]], order[star]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    candidates = np.sort(np.concatenate(pairs).astype(np.int64), axis=1)
+    return np.unique(candidates, axis=0)
+
+
+def _jaccard(x: "np.ndarray", y: "np.ndarray") -> float:
+    inter = len(np.intersect1d(x, y, assume_unique=True))
+    return inter / (len(x) + len(y) - inter)
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        parent.setdefault(x, x)
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x: int, y: int) -> None:
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+
+def find_duplicates(
+    test_cases: Sequence[Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    seed: int = DEFAULT_SEED,
+) -> Dict[str, Any]:
+    """检测近似重复用例，返回候选统计与相似用例簇。"""
+    if not _load_numpy():
+        raise ImportError("近似重复检测需要安装 numpy: pip install numpy")
+
+    case_shingles = [shingle_hashes(tc if isinstance(tc, dict) else {}) for tc in test_cases]
+    indexed = [i for i, hashes in enumerate(case_shingles) if hashes]
+    lengths = np.fromiter((len(case_shingles[i]) for i in indexed), dtype=np.int64, count=len(indexed))
+    offsets = np.zeros(len(indexed) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    shingles = np.fromiter((h for i in indexed for h in case_shingles[i]), dtype=np.uint64, count=int(offsets[-1]))
+
+    bands, rows = lsh_params(threshold, num_perm)
+    candidates = np.empty((0, 2), dtype=np.int64)
+    if len(indexed) > 1:
+        signatures = minhash_signatures(shingles, offsets, num_perm, seed)
+        candidates = lsh_candidates(signatures, bands, rows)
+
+    # 复核：精确 Jaccard 相似度
+    uf = _UnionFind()
+    edges: List[Tuple[int, int, float]] = []
+    for i, j in candidates.tolist():
+        x = shingles[offsets[i]:offsets[i + 1]]
+        y = shingles[offsets[j]:offsets[j + 1]]
+        similarity = _jaccard(x, y)
+        if similarity >= threshold:
+            edges.append((indexed[i], indexed[j], similarity))
+            uf.union(indexed[i], indexed[j])
+
+    members: Dict[int, List[int]] = {}
+    for case in uf.parent:
+        members.setdefault(uf.find(case), []).append(case)
+    pairs_by_root: Dict[int, List[Tuple[int, int, float]]] = {}
+    for i, j, similarity in edges:
+        pairs_by_root.setdefault(uf.find(i), []).append((i, j, similarity))
+
+    def describe(index: int) -> Dict[str, Any]:
+        tc = test_cases[index] if isinstance(test_cases[index], dict) else {}
+        return {"index": index + 1, "id": tc.get("id") or "", "title": tc.get("title") or tc.get("name") or ""}
+
+    clusters = []
+    for root, cases in members.items():
+        pairs = sorted(pairs_by_root.get(root, []), key=lambda p: -p[2])
+        clusters.append({
+            "size": len(cases),
+            "max_similarity": round(pairs[0][2], 3),
+            "min_similarity": round(pairs[-1][2], 3),
+            "cases": [describe(i) for i in sorted(cases)],
+            "pairs": [{"a": describe(i)["id"] or f"#{i + 1}", "b": describe(j)["id"] or f"#{j + 1}",
+                       "similarity": round(s, 3)} for i, j, s in pairs],
+        })
+    clusters.sort(key=lambda c: (-c["size"], -c["max_similarity"], c["cases"][0]["index"]))
+
+    return {
+        "cases": len(test_cases),
+        "threshold": threshold,
+        "num_perm": num_perm,
+        "bands": bands,
+        "rows": rows,
+        "candidate_pairs": int(len(candidates)),
+        "similar_pairs": len(edges),
+        "clusters": clusters,
+    }
+
+
+def main() -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate test cases with MinHash/LSH")
+    parser.add_argument("--input", "-i", required=True, help="Path to testcases.json")
+    parser.add_argument("--output", "-o", help="Output clusters JSON path (default: stdout)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Jaccard similarity threshold (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--num-perm", type=int, default=DEFAULT_NUM_PERM,
+                        help=f"MinHash permutations (default: {DEFAULT_NUM_PERM})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Hash seed (default: 1)")
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        logger.error("--threshold 必须在 (0, 1] 之间：%s", args.threshold)
+        sys.exit(1)
+    if args.num_perm < 1:
+        logger.error("--num-perm 必须为正整数：%s", args.num_perm)
+        sys.exit(1)
+    if not _load_numpy():
+        logger.error("需要安装 numpy，请运行：pip install numpy")
+        sys.exit(1)
+
+    test_cases = list(iter_and_validate_testcases(args.input))
+    result = find_duplicates(test_cases, args.threshold, args.num_perm, args.seed)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if not args.output:
+        print(text)
+        return
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"已生成：{args.output}（{result['cases']} 条用例，{len(result['clusters'])} 个相似簇，"
+          f"候选对 {result['candidate_pairs']}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+TestSpec 一次性多格式导出：testcases.json 只读取、校验一次，同时写出 Excel 与 XMind（及后续新增格式）。
+
+依次运行 generate_excel.py 与 generate_xmind.py 时，同一份用例要经历两次解释器启动与两次解析；
+本脚本将用例加载为共享的只读列表后分发给各写出器，写出器在线程池或进程池中并发执行，
+并逐个输出耗时。进程池在 fork 平台上直接继承已加载的用例，不做序列化；
+单核机器上进程池只增加开销，默认（--executor auto）改用线程池。
+与单独脚本共用构建缓存（build_cache.py）：输入与选项未变的产物跳过，全部未变时不读取用例；--force 强制重新生成。
+
+用法：
+    python export_all.py --input testcases.json --xlsx artifacts/cases.xlsx --xmind artifacts/cases.xmind
+    python export_all.py --input testcases.json --xlsx artifacts/cases.xlsx --xmind artifacts/cases.xmind \\
+        --xmind-format zen --reproducible --executor thread
+"""
+import argparse
+import os
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+try:
+    from build_cache import BuildCache
+    from generate_excel import ENGINES
+    from generate_xmind import FORMATS, build_xmind_structure
+    from utils import configure_logging, load_and_validate_testcases
+except ImportError:
+    from .build_cache import BuildCache
+    from .generate_excel import ENGINES
+    from .generate_xmind import FORMATS, build_xmind_structure
+    from .utils import configure_logging, load_and_validate_testcases
+
+# 当前进程中共享的用例（进程池 worker 通过 initializer 设置）
+_CASES: Sequence[dict] = ()
+
+
+def _set_cases(test_cases: Sequence[dict]) -> None:
+    global _CASES
+    _CASES = test_cases
+
+
+def write_xlsx(test_cases: Sequence[dict], output_path: str, options: Dict[str, Any]) -> None:
+    ENGINES[options["engine"]](test_cases, output_path)
+
+
+def write_xmind(test_cases: Sequence[dict], output_path: str, options: Dict[str, Any]) -> None:
+    title = options["title"]
+    structure = build_xmind_structure(test_cases, title)
+    FORMATS[options["xmind_format"]](structure, output_path, title, sheet_title=title,
+                                     reproducible=options["reproducible"])
+
+
+# 导出格式 -> 写出函数 (用例, 输出路径, 选项)；新增格式在此登记即可获得同名 --<格式> 参数
+WRITERS: Dict[str, Callable[[Sequence[dict], str, Dict[str, Any]], None]] = {
+    "xlsx": write_xlsx,
+    "xmind": write_xmind,
+}
+
+
+def cache_options(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """写出器的缓存选项，与 generate_excel.py / generate_xmind.py 记录的一致，两种入口可互相复用缓存。"""
+    if name == "xlsx":
+        return {"engine": options["engine"]}
+    if name == "xmind":
+        return {"title": options["title"], "format": options["xmind_format"],
+                "reproducible": options["reproducible"]}
+    return dict(options)
+
+
+def _run_writer(task: Tuple[str, str, Dict[str, Any]]) -> Tuple[str, str, float]:
+    """执行单个写出器，返回 (格式, 输出路径, 耗时秒数)。"""
+    name, output_path, options = task
+    start = time.perf_counter()
+    WRITERS[name](_CASES, output_path, options)
+    return name, output_path, time.perf_counter() - start
+
+
+def _make_executor(kind: str, workers: int, test_cases: Sequence[dict]) -> Executor:
+    if kind == "auto":
+        kind = "process" if (os.cpu_count() or 1) > 1 else "thread"
+    if kind == "process":
+        from concurrent.futures import ProcessPoolExecutor  # 进程池模块较重，只在真正并行时导入
+
+        return ProcessPoolExecutor(max_workers=workers, initializer=_set_cases, initargs=(test_cases,))
+    from concurrent.futures import ThreadPoolExecutor
+
+    _set_cases(test_cases)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def export_all(
+    test_cases: Sequence[dict],
+    outputs: List[Tuple[str, str]],
+    options: Dict[str, Any],
+    executor: str = "auto",
+) -> List[Tuple[str, str, float]]:
+    """
+    将同一份用例并发写出为多种格式。
+
+    Args:
+        test_cases: 已校验的用例列表（各写出器只读共享）
+        outputs: [(格式, 输出路径)]，格式为 WRITERS 中的键
+        options: 写出选项（engine、title、xmind_format、reproducible）
+        executor: process（多核并行）、thread，或 auto（默认，多核时用进程池，否则用线程池）
+
+    Returns:
+        按 outputs 顺序的 [(格式, 输出路径, 耗时秒数)]
+    """
+    tasks = [(name, path, options) for name, path in outputs]
+    if len(tasks) == 1:
+        _set_cases(test_cases)
+        return [_run_writer(tasks[0])]
+    with _make_executor(executor, len(tasks), test_cases) as pool:
+        return list(pool.map(_run_writer, tasks))
+
+
+def main() -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Export test cases to several formats in one pass")
+    parser.add_argument("--input", "-i", required=True, help="Path to testcases.json")
+    for name in WRITERS:
+        parser.add_argument(f"--{name}", metavar="PATH", help=f"Output .{name} path")
+    parser.add_argument("--title", "-t", default="测试用例", help="XMind root topic / sheet title")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="builtin", help="XLSX writer")
+    parser.add_argument("--xmind-format", choices=sorted(FORMATS), default="xmind8", help="XMind format")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="Content-derived XMind topic IDs and fixed timestamps")
+    parser.add_argument("--executor", choices=["auto", "process", "thread"], default="auto",
+                        help="Run writers in worker processes or threads (auto: processes on multi-core machines)")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if input and options are unchanged")
+    args = parser.parse_args()
+
+    outputs = [(name, getattr(args, name)) for name in WRITERS if getattr(args, name)]
+    if not outputs:
+        parser.error("至少指定一个输出：" + " / ".join(f"--{name}" for name in WRITERS))
+
+    options = {
+        "engine": args.engine,
+        "title": args.title,
+        "xmind_format": args.xmind_format,
+        "reproducible": args.reproducible,
+    }
+    start = time.perf_counter()
+    caches = {path: BuildCache(path, [args.input], cache_options(name, options)) for name, path in outputs}
+    if not args.force:
+        fresh = {path for _, path in outputs if caches[path].is_fresh()}
+        for path in sorted(fresh):
+            print(f"未变化，跳过：{path}")
+        outputs = [(name, path) for name, path in outputs if path not in fresh]
+    if not outputs:
+        return
+
+    test_cases = load_and_validate_testcases(args.input)
+    load_seconds = time.perf_counter() - start
+    print(f"已加载 {len(test_cases)} 条用例（{load_seconds:.2f}s）")
+
+    for name, path, seconds in export_all(test_cases, outputs, options, executor=args.executor):
+        # 清单在主进程中依次写入，避免并发写出器同时改写同一目录的清单
+        caches[path].record()
+        print(f"已生成：{path}（{name}，{seconds:.2f}s）")
+    print(f"总耗时：{time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
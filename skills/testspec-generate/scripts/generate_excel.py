@@ -2,19 +2,28 @@
 """
 TestSpec Excel 用例生成脚本：根据 testcases.json 生成 .xlsx 测试用例文档。
 
+默认使用内置 XLSX 写出器（xlsx_writer.py，无第三方依赖）；--engine openpyxl 使用 openpyxl。
+输入、选项与脚本均未变化时跳过生成（见 build_cache.py），--force 强制重新生成。
+
 用法：
     python generate_excel.py --input testcases.json --output artifacts/cases.xlsx
+    python generate_excel.py --input testcases.json --output artifacts/cases.xlsx --engine openpyxl
 """
 import argparse
 import json
 import logging
 import os
 import sys
+from typing import Iterable
 
 try:
-    from utils import configure_logging, load_and_validate_testcases
+    from build_cache import BuildCache
+    from utils import configure_logging, iter_and_validate_testcases
+    from xlsx_writer import write_xlsx
 except ImportError:
-    from .utils import configure_logging, load_and_validate_testcases
+    from .build_cache import BuildCache
+    from .utils import configure_logging, iter_and_validate_testcases
+    from .xlsx_writer import write_xlsx
 
 logger = logging.getLogger(__name__)
 
@@ -33,52 +42,55 @@ COLUMNS = [
 ]
 
 
-def create_excel_with_openpyxl(test_cases: list, output_path: str) -> None:
-    """使用 openpyxl 创建 Excel 文件。"""
+def _row_values(tc: dict, index: int) -> tuple:
+    """将单条用例映射为一行单元格值（顺序与 COLUMNS 一致），index 从 1 开始。"""
+    tc_id = tc.get("id") or tc.get("case_id") or f"TC-{index:03d}"
+    title = tc.get("title") or tc.get("name", "")
+    priority = tc.get("priority", "P1")
+    preconditions = tc.get("preconditions", "")
+    steps = tc.get("steps", "")
+    expected = tc.get("expected_result", tc.get("expected", ""))
+    return (tc_id, title, priority, preconditions, steps, expected, "", "", "", "")
+
+
+def create_excel_with_openpyxl(test_cases: Iterable[dict], output_path: str) -> None:
+    """使用 openpyxl 的 write-only 模式流式创建 Excel 文件。
+
+    逐行 append 到工作表，不为每个单元格保留 Python 对象，内存占用与用例数量无关；
+    表头样式对象只创建一次，供所有表头单元格共享。
+    """
     try:
         from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, PatternFill, Alignment
         from openpyxl.utils import get_column_letter
     except ImportError:
         logger.error("需要安装 openpyxl，请运行：pip install openpyxl")
         sys.exit(1)
 
-    wb = Workbook()
+    wb = Workbook(write_only=True)
     try:
-        sheet = wb.active
-        sheet.title = "测试用例"
+        sheet = wb.create_sheet("测试用例")
+
+        # write-only 模式下列宽必须在写入任何行之前设置
+        for col_idx, (_, width) in enumerate(COLUMNS, 1):
+            sheet.column_dimensions[get_column_letter(col_idx)].width = width
 
         header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
         header_font = Font(bold=True, color="FFFFFF", size=11)
+        header_alignment = Alignment(horizontal="center", vertical="center")
 
-        for col_idx, (header, _) in enumerate(COLUMNS, 1):
-            cell = sheet.cell(row=1, column=col_idx)
-            cell.value = header
+        header_row = []
+        for header, _ in COLUMNS:
+            cell = WriteOnlyCell(sheet, value=header)
             cell.font = header_font
             cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.alignment = header_alignment
+            header_row.append(cell)
+        sheet.append(header_row)
 
-        for col_idx, (_, width) in enumerate(COLUMNS, 1):
-            sheet.column_dimensions[get_column_letter(col_idx)].width = width
-
-        for row_idx, tc in enumerate(test_cases, 2):
-            tc_id = tc.get("id") or tc.get("case_id") or f"TC-{row_idx - 1:03d}"
-            title = tc.get("title") or tc.get("name", "")
-            priority = tc.get("priority", "P1")
-            preconditions = tc.get("preconditions", "")
-            steps = tc.get("steps", "")
-            expected = tc.get("expected_result", tc.get("expected", ""))
-
-            sheet.cell(row=row_idx, column=1, value=tc_id)
-            sheet.cell(row=row_idx, column=2, value=title)
-            sheet.cell(row=row_idx, column=3, value=priority)
-            sheet.cell(row=row_idx, column=4, value=preconditions)
-            sheet.cell(row=row_idx, column=5, value=steps)
-            sheet.cell(row=row_idx, column=6, value=expected)
-            sheet.cell(row=row_idx, column=7, value="")
-            sheet.cell(row=row_idx, column=8, value="")
-            sheet.cell(row=row_idx, column=9, value="")
-            sheet.cell(row=row_idx, column=10, value="")
+        for index, tc in enumerate(test_cases, 1):
+            sheet.append(_row_values(tc, index))
 
         os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
         wb.save(output_path)
@@ -86,16 +98,38 @@ def create_excel_with_openpyxl(test_cases: list, output_path: str) -> None:
         wb.close()
 
 
+def create_excel_builtin(test_cases: Iterable[dict], output_path: str) -> None:
+    """使用内置写出器流式创建 Excel 文件（无需 openpyxl，版式与 openpyxl 版本一致）。"""
+    rows = (_row_values(tc, index) for index, tc in enumerate(test_cases, 1))
+    write_xlsx(output_path, COLUMNS, rows, sheet_name="测试用例")
+
+
+# 写出引擎：builtin 无依赖且启动快，openpyxl 作为可选实现保留
+ENGINES = {
+    "builtin": create_excel_builtin,
+    "openpyxl": create_excel_with_openpyxl,
+}
+
+
 def main() -> None:
     configure_logging()
 
     parser = argparse.ArgumentParser(description="Generate Excel test cases from JSON")
     parser.add_argument("--input", "-i", required=True, help="Path to testcases.json")
     parser.add_argument("--output", "-o", required=True, help="Output .xlsx path")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="builtin",
+                        help="XLSX writer: builtin (no dependency, default) or openpyxl")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if input and options are unchanged")
     args = parser.parse_args()
 
-    test_cases = load_and_validate_testcases(args.input)
-    create_excel_with_openpyxl(test_cases, args.output)
+    cache = BuildCache(args.output, [args.input], {"engine": args.engine})
+    if not args.force and cache.is_fresh():
+        print(f"未变化，跳过：{args.output}")
+        return
+
+    test_cases = iter_and_validate_testcases(args.input)
+    ENGINES[args.engine](test_cases, args.output)
+    cache.record()
     print(f"已生成：{args.output}")
 
 
@@ -2,33 +2,65 @@
 """
 TestSpec XMind 用例生成脚本：根据 testcases.json 生成 .xmind 测试用例思维导图。
 
-实现参考项目内 xmind_generator.py，输出 XMind 8 格式（content.xml + manifest/styles/meta），
+实现参考项目内 xmind_generator.py，默认输出 XMind 8 格式（content.xml + manifest/styles/meta），
 支持前置条件/测试步骤/预期结果子节点及优先级与类型标记，兼容 XMind 桌面版打开。
+--format zen 输出新版 XMind 原生读取的 content.json + metadata.json + manifest.json，体积更小、生成更快。
+
+--split-by feature|size 将超大导图拆成多个 sheet（或 --split-output files 拆成多个 .xmind），
+每个分片保持 功能模块 → 用例类型 的分组，并在进程池中并行渲染。
+
+输入、选项与脚本均未变化时跳过生成（见 build_cache.py），--force 强制重新生成。
+
+--reproducible 时主题 ID 由父节点 ID、标题与同名序号哈希得到，压缩包时间戳与 meta 时间固定，
+相同输入生成逐字节相同的文件，便于缓存与评审时比对。
 
 用法：
     python generate_xmind.py --input testcases.json --output artifacts/cases.xmind --title "测试用例"
+    python generate_xmind.py --input testcases.json --output artifacts/cases.xmind --reproducible
+    python generate_xmind.py --input testcases.json --output artifacts/cases.xmind --format zen
+    python generate_xmind.py --input testcases.json --output artifacts/cases.xmind --split-by size --max-topics 5000
 """
 import argparse
+import hashlib
+import io
 import json
 import logging
 import os
+import re
 import sys
 import time
 import uuid
 import zipfile
-import xml.etree.ElementTree as ET
 from collections import defaultdict
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 try:
-    from utils import configure_logging, load_and_validate_testcases
+    from build_cache import BuildCache
+    from utils import configure_logging, iter_and_validate_testcases
 except ImportError:
-    from .utils import configure_logging, load_and_validate_testcases
+    from .build_cache import BuildCache
+    from .utils import configure_logging, iter_and_validate_testcases
 
 logger = logging.getLogger(__name__)
 
 NS = "urn:xmind:xmap:xmlns:content:2.0"
 
+# XML 1.0 不允许的控制字符，写出前剔除
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# 写出 content.xml 时每累积多少个片段向压缩流写一次
+_WRITE_BATCH = 4096
+
+# --reproducible 时压缩包条目与 meta.xml 使用的固定时间（zip 格式可表示的最早时间）
+REPRODUCIBLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+REPRODUCIBLE_TIMESTAMP_MS = 315532800000
+
+# --split-by size 时每个分片的默认主题数上限
+DEFAULT_MAX_TOPICS = 5000
+
+# 主题 ID 生成函数：(父节点 ID, 标题, 同级同名序号) -> ID
+TopicIdFunc = Callable[[str, str, int], str]
+
 # 优先级 -> XMind marker（与 xmind_generator 一致）
 PRIORITY_MARKERS = {"P1": "priority-1", "P2": "priority-2", "P3": "priority-3"}
 
@@ -43,10 +75,36 @@ TYPE_MARKERS = {
 }
 
 
-def _topic_id() -> str:
+def _topic_id(parent_id: str = "", title: str = "", occurrence: int = 0) -> str:
+    """随机主题 ID（默认模式，参数仅为与 _stable_topic_id 保持同一签名）。"""
     return uuid.uuid4().hex
 
 
+def _stable_topic_id(parent_id: str, title: str, occurrence: int) -> str:
+    """由父节点 ID、标题与同级同名序号派生的稳定主题 ID：插入新用例不会改变其兄弟节点的 ID。"""
+    key = f"{parent_id}\x1f{title}\x1f{occurrence}".encode("utf-8")
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
+def _child_title(child: Any) -> str:
+    if isinstance(child, dict) and "title" in child:
+        return child.get("title") or ""
+    return str(child) if child else ""
+
+
+def _child_entries(children: List[Any], parent_id: str, chain: List[str],
+                   topic_id: TopicIdFunc) -> List[Any]:
+    """为子节点分配 ID，返回 [(子节点, ID)]；同级同名节点（含字段链首节点）按出现顺序编号，保证 ID 唯一。"""
+    seen: Dict[str, int] = {chain[0]: 1} if chain else {}
+    entries = []
+    for child in children:
+        child_title = _child_title(child)
+        occurrence = seen.get(child_title, 0)
+        seen[child_title] = occurrence + 1
+        entries.append((child, topic_id(parent_id, child_title, occurrence)))
+    return entries
+
+
 def _generate_markers(tc_type: str, priority: str) -> List[str]:
     """根据测试类型与优先级生成 marker 列表（与 xmind_generator._generate_markers 一致）。"""
     markers = []
@@ -78,7 +136,7 @@ def _build_case_node(tc: Dict[str, Any], tc_type: str) -> Dict[str, Any]:
     return node
 
 
-def build_xmind_structure(test_cases: list, root_title: str) -> List[Dict[str, Any]]:
+def build_xmind_structure(test_cases: Iterable[Dict[str, Any]], root_title: str) -> List[Dict[str, Any]]:
     """
     将 testcases.json 的扁平用例列表组织为 XMind 层级结构。
     每个叶子用例节点可带 fields（前置条件、测试步骤、预期结果）和 markers（优先级、类型）。
@@ -112,129 +170,180 @@ def build_xmind_structure(test_cases: list, root_title: str) -> List[Dict[str, A
     return [{"title": root_title, "children": [grouping_node]}]
 
 
-def _create_topic_xml(
-    parent: ET.Element,
-    title: str,
-    *,
-    children: Optional[List[Dict]] = None,
-    note: Optional[str] = None,
-    fields: Optional[Dict[str, str]] = None,
-    markers: Optional[List[str]] = None,
-) -> ET.Element:
+def _escape(text: str) -> str:
+    """转义 XML 文本，并剔除 XML 1.0 不允许的控制字符。"""
+    return _ILLEGAL_XML_CHARS.sub("", text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _field_chain_titles(fields: Optional[Dict[str, str]]) -> List[str]:
+    """用例字段链标题：预置条件 → 测试步骤 → 预期结果（依次嵌套，空字段跳过）。"""
+    if not fields:
+        return []
+    priority = fields.get("priority", "P1")
+    expected_val = fields.get("expected_result", "")
+    steps_val = fields.get("test_steps", "")
+    precond_val = fields.get("preconditions", "")
+    titles = []
+    if precond_val:
+        titles.append(f"预置条件：{precond_val}")
+    if steps_val:
+        titles.append(f"{priority}操作步骤：{steps_val}")
+    if expected_val:
+        titles.append(f"期望结果：{expected_val}")
+    return titles
+
+
+def _write_topic_xml(out: TextIO, node: Any, node_id: str, topic_id: TopicIdFunc = _topic_id) -> None:
     """
-    创建主题节点（XMind 8 XML），与 xmind_generator._create_topic_xml 逻辑一致。
+    写出主题节点及其全部子孙（XMind 8 XML），与 xmind_generator._create_topic_xml 输出一致。
     支持备注、字段（前置条件→测试步骤→预期结果 嵌套子节点）、标记。
-    """
-    topic = ET.SubElement(parent, f"{{{NS}}}topic")
-    topic.set("id", _topic_id())
-    title_elem = ET.SubElement(topic, f"{{{NS}}}title")
-    title_elem.text = title or ""
 
-    if markers:
-        marker_refs = ET.SubElement(topic, f"{{{NS}}}marker-refs")
-        for marker_id in markers:
-            marker_ref = ET.SubElement(marker_refs, f"{{{NS}}}marker-ref")
-            marker_ref.set("marker-id", marker_id)
-
-    if note:
-        notes = ET.SubElement(topic, f"{{{NS}}}notes")
-        plain = ET.SubElement(notes, f"{{{NS}}}plain")
-        plain.text = note
-
-    if fields:
-        if not children:
-            children = []
-        priority = fields.get("priority", "P1")
-        expected_val = fields.get("expected_result", "")
-        steps_val = fields.get("test_steps", "")
-        precond_val = fields.get("preconditions", "")
-
-        current_node = None
-        if expected_val:
-            current_node = {
-                "title": f"期望结果：{expected_val}",
-                "children": [],
-            }
-        if steps_val:
-            current_node = {
-                "title": f"{priority}操作步骤：{steps_val}",
-                "children": [current_node] if current_node else [],
-            }
-        if precond_val:
-            current_node = {
-                "title": f"预置条件：{precond_val}",
-                "children": [current_node] if current_node else [],
-            }
-        if current_node:
-            children = [current_node] + list(children)
-
-    if children:
-        children_elem = ET.SubElement(topic, f"{{{NS}}}children")
-        topics_elem = ET.SubElement(children_elem, f"{{{NS}}}topics")
-        topics_elem.set("type", "attached")
-        for child in children:
-            if isinstance(child, dict) and "title" in child:
-                _create_topic_xml(
-                    topics_elem,
-                    child.get("title", ""),
-                    children=child.get("children"),
-                    note=child.get("note"),
-                    fields=child.get("fields"),
-                    markers=child.get("markers"),
-                )
-            else:
-                _create_topic_xml(topics_elem, str(child) if child else "")
-
-    return topic
+    使用显式栈代替递归：栈中为待写出的（节点, ID），或节点写完子节点后需要补上的闭合标签，
+    层级深度不受递归上限限制；字段链直接写出，不再为每个用例构造中间节点。
+    输出先累积到本地缓冲区，按块写入 out。
+    """
+    buf: List[str] = []
+    write = buf.append
+    stack: List[Any] = [(node, node_id)]
+    while stack:
+        entry = stack.pop()
+        if isinstance(entry, str):
+            write(entry)
+            continue
+        item, item_id = entry
+        if not (isinstance(item, dict) and "title" in item):
+            item = {"title": str(item) if item else ""}
+
+        write(f'<topic id="{item_id}"><title>{_escape(item.get("title") or "")}</title>')
+
+        markers = item.get("markers")
+        if markers:
+            write("<marker-refs>")
+            for marker_id in markers:
+                write(f'<marker-ref marker-id="{marker_id}"/>')
+            write("</marker-refs>")
+
+        note = item.get("note")
+        if note:
+            write(f"<notes><plain>{_escape(note)}</plain></notes>")
+
+        children = item.get("children")
+        chain = _field_chain_titles(item.get("fields"))
+        if not children and not chain:
+            write("</topic>")
+        else:
+            write('<children><topics type="attached">')
+            # 字段链作为第一个子节点，逐级嵌套写出后一次性闭合
+            chain_id = item_id
+            for depth, chain_title in enumerate(chain):
+                if depth:
+                    write('<children><topics type="attached">')
+                chain_id = topic_id(chain_id, chain_title, 0)
+                write(f'<topic id="{chain_id}"><title>{_escape(chain_title)}</title>')
+            if chain:
+                write("</topic>" + "</topics></children></topic>" * (len(chain) - 1))
+            stack.append("</topics></children></topic>")
+            if children:
+                stack.extend(reversed(_child_entries(children, item_id, chain, topic_id)))
+
+        if len(buf) >= _WRITE_BATCH:
+            out.write("".join(buf))
+            buf.clear()
+    out.write("".join(buf))
+
+
+def _write_sheet_xml(
+    out: TextIO,
+    structure: List[Dict],
+    root_title: str,
+    sheet_title: str,
+    topic_id: TopicIdFunc = _topic_id,
+) -> None:
+    """
+    流式写出 XMind 8 content.xml 中的一个 sheet（与 xmind_generator.generate_xmind 中 XML 结构一致）。
+    边遍历边写入，不构建 ElementTree，也不产生整份文档的字符串副本。
+    """
+    sheet_id = topic_id("", sheet_title, 0)
+    out.write(f'<sheet id="{sheet_id}" theme="plain"><title>{_escape(sheet_title)}</title>')
+    root_node = structure[0] if structure else {"title": root_title, "children": []}
+    _write_topic_xml(out, {"title": root_title, "children": root_node.get("children") or []},
+                     topic_id(sheet_id, root_title, 0), topic_id)
+    out.write("</sheet>")
 
 
-def _prettify_xml(elem: ET.Element) -> str:
-    """与 xmind_generator._prettify_xml 一致：生成 XML 字符串并在根元素添加 xmlns。"""
-    rough = ET.tostring(elem, encoding="utf-8", xml_declaration=True)
-    xml_str = rough.decode("utf-8")
-    if "xmlns=" not in xml_str:
-        xml_str = xml_str.replace(
-            "<xmap-content",
-            '<xmap-content xmlns="urn:xmind:xmap:xmlns:content:2.0"',
-            1,
-        )
-    return xml_str
+def _json_str(text: str) -> str:
+    return json.dumps(text, ensure_ascii=False)
 
 
-def _create_content_xml(structure: List[Dict], root_title: str, sheet_title: str) -> bytes:
-    """生成 XMind 8 content.xml（与 xmind_generator.generate_xmind 中 XML 结构一致）。"""
-    ET.register_namespace("", NS)
-    xmap_content = ET.Element(f"{{{NS}}}xmap-content")
-    xmap_content.set("version", "2.0")
+def _write_topic_json(out: TextIO, node: Any, node_id: str, topic_id: TopicIdFunc = _topic_id) -> None:
+    """
+    写出主题节点及其全部子孙（XMind Zen content.json 中的 topic 对象），结构与 _write_topic_xml 相同：
+    字段链作为第一个子节点，markers 使用相同的 marker ID。同样使用显式栈，栈中条目带前缀逗号。
+    """
+    buf: List[str] = []
+    write = buf.append
+    stack: List[Any] = [(node, node_id, "")]
+    while stack:
+        entry = stack.pop()
+        if isinstance(entry, str):
+            write(entry)
+            continue
+        item, item_id, prefix = entry
+        if not (isinstance(item, dict) and "title" in item):
+            item = {"title": str(item) if item else ""}
+
+        write(f'{prefix}{{"id":"{item_id}","class":"topic","title":{_json_str(item.get("title") or "")}')
+
+        markers = item.get("markers")
+        if markers:
+            write(',"markers":[' + ",".join(f'{{"markerId":"{marker_id}"}}' for marker_id in markers) + "]")
+
+        note = item.get("note")
+        if note:
+            write(f',"notes":{{"plain":{{"content":{_json_str(note)}}}}}')
+
+        children = item.get("children")
+        chain = _field_chain_titles(item.get("fields"))
+        if not children and not chain:
+            write("}")
+        else:
+            write(',"children":{"attached":[')
+            chain_id = item_id
+            for depth, chain_title in enumerate(chain):
+                if depth:
+                    write(',"children":{"attached":[')
+                chain_id = topic_id(chain_id, chain_title, 0)
+                write(f'{{"id":"{chain_id}","class":"topic","title":{_json_str(chain_title)}')
+            if chain:
+                write("}" + "]}}" * (len(chain) - 1))
+            stack.append("]}}")
+            if children:
+                entries = _child_entries(children, item_id, chain, topic_id)
+                stack.extend(
+                    (child, child_id, "," if chain or index else "")
+                    for index, (child, child_id) in reversed(list(enumerate(entries)))
+                )
 
-    sheet = ET.SubElement(xmap_content, f"{{{NS}}}sheet")
-    sheet.set("id", _topic_id())
-    sheet.set("theme", "plain")
-    sheet_title_el = ET.SubElement(sheet, f"{{{NS}}}title")
-    sheet_title_el.text = sheet_title
+        if len(buf) >= _WRITE_BATCH:
+            out.write("".join(buf))
+            buf.clear()
+    out.write("".join(buf))
 
-    root_topic = ET.SubElement(sheet, f"{{{NS}}}topic")
-    root_topic.set("id", _topic_id())
-    root_title_el = ET.SubElement(root_topic, f"{{{NS}}}title")
-    root_title_el.text = root_title
 
+def _write_sheet_json(
+    out: TextIO,
+    structure: List[Dict],
+    root_title: str,
+    sheet_title: str,
+    topic_id: TopicIdFunc = _topic_id,
+) -> None:
+    """流式写出 XMind Zen content.json 中的一个 sheet 对象，ID 规则与 content.xml 相同。"""
+    sheet_id = topic_id("", sheet_title, 0)
+    out.write(f'{{"id":"{sheet_id}","class":"sheet","title":{_json_str(sheet_title)},"rootTopic":')
     root_node = structure[0] if structure else {"title": root_title, "children": []}
-    root_children = root_node.get("children") or []
-    if root_children:
-        children_elem = ET.SubElement(root_topic, f"{{{NS}}}children")
-        topics_elem = ET.SubElement(children_elem, f"{{{NS}}}topics")
-        topics_elem.set("type", "attached")
-        for item in root_children:
-            _create_topic_xml(
-                topics_elem,
-                item.get("title", ""),
-                children=item.get("children"),
-                note=item.get("note"),
-                fields=item.get("fields"),
-                markers=item.get("markers"),
-            )
-
-    return _prettify_xml(xmap_content).encode("utf-8")
+    _write_topic_json(out, {"title": root_title, "children": root_node.get("children") or []},
+                      topic_id(sheet_id, root_title, 0), topic_id)
+    out.write("}")
 
 
 def _create_manifest() -> bytes:
@@ -256,9 +365,9 @@ def _create_styles_xml() -> bytes:
 </xmap-styles>"""
 
 
-def _create_meta_xml() -> bytes:
-    """与 xmind_generator._create_meta_xml 一致。"""
-    t = int(time.time() * 1000)
+def _create_meta_xml(timestamp_ms: Optional[int] = None) -> bytes:
+    """与 xmind_generator._create_meta_xml 一致；timestamp_ms 为空时使用当前时间。"""
+    t = int(time.time() * 1000) if timestamp_ms is None else timestamp_ms
     return f"""<?xml version="1.0" encoding="UTF-8" standalone="no"?>
 <meta xmlns="urn:xmind:xmap:xmlns:meta:2.0" version="2.0">
     <Author>
@@ -271,20 +380,250 @@ def _create_meta_xml() -> bytes:
     )
 
 
+def _zip_entry(name: str, reproducible: bool) -> Any:
+    """压缩包条目：可复现模式下使用固定时间戳与权限，否则直接使用文件名（当前时间）。"""
+    if not reproducible:
+        return name
+    info = zipfile.ZipInfo(name, date_time=REPRODUCIBLE_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    return info
+
+
+def _write_package(
+    output_path: str,
+    fmt: str,
+    reproducible: bool,
+    write_sheets: Callable[[TextIO, str], None],
+) -> None:
+    """
+    写出 .xmind 压缩包。write_sheets(out, separator) 负责写出全部 sheet，
+    相邻 sheet 之间需写入 separator（content.json 为逗号，content.xml 为空）。
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        if fmt == "zen":
+            with zf.open(_zip_entry("content.json", reproducible), "w") as raw, \
+                    io.TextIOWrapper(raw, encoding="utf-8") as out:
+                out.write("[")
+                write_sheets(out, ",")
+                out.write("]")
+            zf.writestr(_zip_entry("metadata.json", reproducible), b'{"creator":{"name":"TestSpec"}}')
+            zf.writestr(_zip_entry("manifest.json", reproducible),
+                        b'{"file-entries":{"content.json":{},"metadata.json":{}}}')
+            return
+
+        timestamp_ms = REPRODUCIBLE_TIMESTAMP_MS if reproducible else None
+        zf.writestr(_zip_entry("META-INF/manifest.xml", reproducible), _create_manifest())
+        with zf.open(_zip_entry("content.xml", reproducible), "w") as raw, \
+                io.TextIOWrapper(raw, encoding="utf-8") as out:
+            # 命名空间直接写在根元素上
+            out.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n')
+            out.write(f'<xmap-content xmlns="{NS}" version="2.0">')
+            write_sheets(out, "")
+            out.write("</xmap-content>")
+        zf.writestr(_zip_entry("styles.xml", reproducible), _create_styles_xml())
+        zf.writestr(_zip_entry("meta.xml", reproducible), _create_meta_xml(timestamp_ms))
+
+
+# 输出格式 -> sheet 写出函数
+SHEET_WRITERS = {
+    "xmind8": _write_sheet_xml,
+    "zen": _write_sheet_json,
+}
+
+
+def _create_xmind(
+    fmt: str,
+    structure: List[Dict],
+    output_path: str,
+    root_title: str,
+    sheet_title: str,
+    reproducible: bool,
+) -> None:
+    topic_id = _stable_topic_id if reproducible else _topic_id
+    _write_package(
+        output_path, fmt, reproducible,
+        lambda out, _sep: SHEET_WRITERS[fmt](out, structure, root_title, sheet_title, topic_id),
+    )
+
+
 def create_xmind_xmind8(
     structure: List[Dict],
     output_path: str,
     root_title: str,
     sheet_title: str = "测试用例",
+    reproducible: bool = False,
 ) -> None:
-    """生成 XMind 8 格式 .xmind（与 xmind_generator 输出结构一致）。"""
-    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    content_bytes = _create_content_xml(structure, root_title, sheet_title)
-    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("META-INF/manifest.xml", _create_manifest())
-        zf.writestr("content.xml", content_bytes)
-        zf.writestr("styles.xml", _create_styles_xml())
-        zf.writestr("meta.xml", _create_meta_xml())
+    """生成 XMind 8 格式 .xmind（与 xmind_generator 输出结构一致）。
+
+    reproducible 为 True 时主题 ID 由内容派生、时间戳固定，相同输入生成逐字节相同的文件。
+    """
+    _create_xmind("xmind8", structure, output_path, root_title, sheet_title, reproducible)
+
+
+def create_xmind_zen(
+    structure: List[Dict],
+    output_path: str,
+    root_title: str,
+    sheet_title: str = "测试用例",
+    reproducible: bool = False,
+) -> None:
+    """生成 XMind Zen 格式 .xmind（content.json + metadata.json + manifest.json）。"""
+    _create_xmind("zen", structure, output_path, root_title, sheet_title, reproducible)
+
+
+# 输出格式 -> 写出函数
+FORMATS = {
+    "xmind8": create_xmind_xmind8,
+    "zen": create_xmind_zen,
+}
+
+
+def _count_topics(node: Dict[str, Any]) -> int:
+    """节点及其子孙的主题数（含字段链节点）。"""
+    count = 0
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if not (isinstance(item, dict) and "title" in item):
+            count += 1
+            continue
+        count += 1 + len(_field_chain_titles(item.get("fields")))
+        stack.extend(item.get("children") or [])
+    return count
+
+
+def _size_pieces(feat_node: Dict[str, Any], max_topics: int) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """超过上限的功能模块按用例类型、再按用例切块，返回 (功能模块节点片段, 主题数)。"""
+    total = _count_topics(feat_node)
+    if total <= max_topics:
+        yield feat_node, total
+        return
+    for type_node in feat_node["children"]:
+        chunk: List[Any] = []
+        chunk_size = 2  # 功能模块节点 + 类型节点
+        for case in type_node["children"]:
+            case_size = _count_topics(case)
+            if chunk and chunk_size + case_size > max_topics:
+                yield {"title": feat_node["title"], "children": [{"title": type_node["title"], "children": chunk}]}, chunk_size
+                chunk, chunk_size = [], 2
+            chunk.append(case)
+            chunk_size += case_size
+        if chunk:
+            yield {"title": feat_node["title"], "children": [{"title": type_node["title"], "children": chunk}]}, chunk_size
+
+
+def shard_structure(
+    structure: List[Dict],
+    root_title: str,
+    split_by: str,
+    max_topics: int = DEFAULT_MAX_TOPICS,
+) -> List[Tuple[str, List[Dict]]]:
+    """
+    将 build_xmind_structure 的结果拆为多个分片，返回 [(sheet 标题, 分片结构)]。
+    每个分片结构与 build_xmind_structure 相同（根 → 分组 → 功能模块 → 用例类型 → 用例），可直接写出。
+
+    split_by:
+        feature: 每个功能模块一个分片，sheet 标题为功能模块标题
+        size: 按功能模块顺序装箱，每个分片主题数不超过 max_topics；单个功能模块超限时按类型、用例切开
+    """
+    root_node = structure[0] if structure else {"title": root_title, "children": []}
+    grouping = (root_node.get("children") or [{"title": root_title, "children": []}])[0]
+    features = grouping.get("children") or []
+
+    def wrap(feat_nodes: List[Dict[str, Any]]) -> List[Dict]:
+        return [{"title": root_title, "children": [{"title": grouping.get("title") or root_title,
+                                                    "children": feat_nodes}]}]
+
+    if split_by == "feature":
+        return [(feat["title"], wrap([feat])) for feat in features]
+
+    shards: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    overhead = current_size = 2  # 根 + 分组
+    for feat in features:
+        for piece, piece_size in _size_pieces(feat, max_topics - overhead):
+            if current and current_size + piece_size > max_topics:
+                shards.append(current)
+                current, current_size = [], overhead
+            if current and current[-1]["title"] == piece["title"]:
+                # 同一功能模块被切开后的相邻片段落入同一分片时合并
+                current[-1] = {"title": piece["title"], "children": current[-1]["children"] + piece["children"]}
+                current_size += piece_size - 1
+            else:
+                current.append(piece)
+                current_size += piece_size
+    if current or not shards:
+        shards.append(current)
+    if len(shards) == 1:
+        return [(root_title, wrap(shards[0]))]
+    return [(f"{root_title} ({i}/{len(shards)})", wrap(shard)) for i, shard in enumerate(shards, 1)]
+
+
+def _render_sheet(task: Tuple[str, List[Dict], str, str, bool]) -> str:
+    """进程池任务：渲染单个 sheet 片段（content.xml 的 <sheet> 或 content.json 的 sheet 对象）。"""
+    fmt, structure, root_title, sheet_title, reproducible = task
+    buf = io.StringIO()
+    SHEET_WRITERS[fmt](buf, structure, root_title, sheet_title,
+                       _stable_topic_id if reproducible else _topic_id)
+    return buf.getvalue()
+
+
+def _write_shard_file(task: Tuple[str, List[Dict], str, str, str, bool]) -> str:
+    """进程池任务：将单个分片写为独立的 .xmind 文件。"""
+    fmt, structure, output_path, root_title, sheet_title, reproducible = task
+    FORMATS[fmt](structure, output_path, root_title, sheet_title=sheet_title, reproducible=reproducible)
+    return output_path
+
+
+def _map_tasks(func: Callable[[Any], Any], tasks: List[Any], jobs: int) -> Iterator[Any]:
+    """按顺序返回结果；单任务或 jobs <= 1 时在当前进程执行，免去进程池开销。"""
+    if jobs <= 1 or len(tasks) <= 1:
+        yield from map(func, tasks)
+        return
+    from concurrent.futures import ProcessPoolExecutor  # 进程池模块较重，只在真正并行时导入
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        yield from pool.map(func, tasks)
+
+
+def shard_output_paths(output_path: str, count: int) -> List[str]:
+    """分片文件路径：cases.xmind -> cases_01.xmind, cases_02.xmind ..."""
+    stem, ext = os.path.splitext(output_path)
+    width = max(2, len(str(count)))
+    return [f"{stem}_{i:0{width}d}{ext or '.xmind'}" for i in range(1, count + 1)]
+
+
+def create_xmind_sharded(
+    shards: List[Tuple[str, List[Dict]]],
+    output_path: str,
+    root_title: str,
+    fmt: str = "xmind8",
+    split_output: str = "sheets",
+    reproducible: bool = False,
+    jobs: int = 1,
+) -> List[str]:
+    """
+    在进程池中并行渲染分片：split_output 为 sheets 时写入同一 .xmind 的多个 sheet，
+    为 files 时每个分片一个 .xmind。返回生成的文件路径。
+    """
+    if split_output == "files":
+        paths = shard_output_paths(output_path, len(shards))
+        tasks = [(fmt, structure, path, root_title, sheet_title, reproducible)
+                 for path, (sheet_title, structure) in zip(paths, shards)]
+        return list(_map_tasks(_write_shard_file, tasks, jobs))
+
+    tasks = [(fmt, structure, root_title, sheet_title, reproducible) for sheet_title, structure in shards]
+
+    def write_sheets(out: TextIO, separator: str) -> None:
+        for index, fragment in enumerate(_map_tasks(_render_sheet, tasks, jobs)):
+            if index:
+                out.write(separator)
+            out.write(fragment)
+
+    _write_package(output_path, fmt, reproducible, write_sheets)
+    return [output_path]
 
 
 def main() -> None:
@@ -294,12 +633,51 @@ def main() -> None:
     parser.add_argument("--input", "-i", required=True, help="Path to testcases.json")
     parser.add_argument("--output", "-o", required=True, help="Output .xmind path")
     parser.add_argument("--title", "-t", default="测试用例", help="Root topic / sheet title")
+    parser.add_argument("--format", "-f", choices=sorted(FORMATS), default="xmind8",
+                        help="xmind8: content.xml (default); zen: content.json for XMind 2020+")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="Content-derived topic IDs and fixed timestamps (identical input -> identical bytes)")
+    parser.add_argument("--split-by", choices=["feature", "size"],
+                        help="Split the map: one shard per feature, or shards of at most --max-topics topics")
+    parser.add_argument("--max-topics", type=int, default=DEFAULT_MAX_TOPICS,
+                        help=f"Topic limit per shard for --split-by size (default: {DEFAULT_MAX_TOPICS})")
+    parser.add_argument("--split-output", choices=["sheets", "files"], default="sheets",
+                        help="sheets: one .xmind with a sheet per shard (default); files: one .xmind per shard")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for rendering shards (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if input and options are unchanged")
     args = parser.parse_args()
 
-    test_cases = load_and_validate_testcases(args.input)
+    if args.max_topics < 1:
+        logger.error("--max-topics 必须为正整数：%s", args.max_topics)
+        sys.exit(1)
+
+    options = {"title": args.title, "format": args.format, "reproducible": args.reproducible}
+    if args.split_by:
+        options.update(split_by=args.split_by, max_topics=args.max_topics, split_output=args.split_output)
+    cache = BuildCache(args.output, [args.input], options)
+    if not args.force and cache.is_fresh():
+        print(f"未变化，跳过：{args.output}")
+        return
+
+    test_cases = iter_and_validate_testcases(args.input)
     structure = build_xmind_structure(test_cases, args.title)
-    create_xmind_xmind8(structure, args.output, args.title, sheet_title=args.title)
-    print(f"已生成：{args.output}")
+    if not args.split_by:
+        FORMATS[args.format](structure, args.output, args.title, sheet_title=args.title,
+                             reproducible=args.reproducible)
+        cache.record()
+        print(f"已生成：{args.output}")
+        return
+
+    shards = shard_structure(structure, args.title, args.split_by, args.max_topics)
+    paths = create_xmind_sharded(shards, args.output, args.title, fmt=args.format,
+                                 split_output=args.split_output, reproducible=args.reproducible,
+                                 jobs=args.jobs)
+    cache.record(paths)
+    for path in paths:
+        print(f"已生成：{path}")
+    if args.split_output == "sheets":
+        print(f"共 {len(shards)} 个 sheet")
 
 
 if __name__ == "__main__":
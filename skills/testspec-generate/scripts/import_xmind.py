@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+TestSpec XMind 导入：把测试人员编辑过的 .xmind（generate_xmind.py 生成）还原为 testcases.json。
+
+按生成时的层级识别用例：
+    「{功能模块} - 测试用例」→「{类型}用例」→ 用例标题 →「预置条件：…」→「{优先级}操作步骤：…」→「期望结果：…」
+优先级取用例上的 priority-N 标记（没有时取「P1操作步骤：」前缀）；类型取所在的「{类型}用例」分组，
+用例上的旗帜标记能唯一对应某个类型（如 flag-green → 冒烟）且与分组不同时，以旗帜为准（测试人员改标记即改类型）。
+
+XMind 8 格式（content.xml）用 ElementTree.iterparse 流式读取：每读完一个主题即产出用例并 clear()，
+并清空父容器中已处理的兄弟节点，内存占用与导图大小无关。
+XMind 2020+ 另存的 content.json 没有流式解析器可用，整体加载后按同样规则遍历。
+
+导图中不保存用例编号与 tp_refs：指定 --base（原 testcases.json）时按 (功能模块, 标题) 匹配原用例，
+保留其编号、tp_refs 等字段，再用导图中的内容覆盖标题、类型、优先级与步骤；未匹配的用例按 --id-prefix 编号。
+输出沿用 --base 的 schema_version；未指定 --base 时没有 tp_refs，输出 v1 格式（顶层数组）。
+
+用法：
+    python import_xmind.py --input cases.xmind --output testcases.json
+    python import_xmind.py --input cases_01.xmind cases_02.xmind --base testcases.json --output testcases.json
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from generate_xmind import NS, PRIORITY_MARKERS, TYPE_MARKERS
+    from utils import configure_logging, iter_and_validate_testcases, write_testcases
+except ImportError:
+    from .generate_xmind import NS, PRIORITY_MARKERS, TYPE_MARKERS
+    from .utils import configure_logging, iter_and_validate_testcases, write_testcases
+
+logger = logging.getLogger(__name__)
+
+FEATURE_SUFFIX = " - 测试用例"
+TYPE_SUFFIX = "用例"
+DEFAULT_ID_PREFIX = "TC-"
+
+_PRIORITIES = {marker: priority for priority, marker in PRIORITY_MARKERS.items()}
+# 只保留能唯一确定类型的旗帜（flag-red 同时用于负向与异常，不能反推）
+_FLAG_TYPES = {
+    marker: tc_type for tc_type, marker in TYPE_MARKERS.items()
+    if list(TYPE_MARKERS.values()).count(marker) == 1
+}
+
+_FIELD_RES = (
+    ("preconditions", re.compile(r"^预置条件[:：]\s?(.*)$", re.DOTALL)),
+    ("steps", re.compile(r"^(P\d)?操作步骤[:：]\s?(.*)$", re.DOTALL)),
+    ("expected_result", re.compile(r"^期望结果[:：]\s?(.*)$", re.DOTALL)),
+)
+
+_TOPIC_TAG = f"{{{NS}}}topic"
+_TITLE_TAG = f"{{{NS}}}title"
+_TOPICS_TAG = f"{{{NS}}}topics"
+_MARKER_TAG = f"{{{NS}}}marker-ref"
+
+
+class _CaseBuilder:
+    """
+    按主题的角色把导图还原为用例。调用方按文档顺序报告：role(父主题角色, 标题) 返回主题角色
+    （feature / type / case / field / other），marker 记录当前用例的标记，用例主题结束时 end_case 返回用例。
+    """
+
+    def __init__(self) -> None:
+        self.feature = ""
+        self.tc_type = ""
+        self.case: Optional[Dict[str, Any]] = None
+        self.ignored = 0
+
+    def role(self, parent_role: str, title: str) -> str:
+        if parent_role in ("case", "field"):
+            self._field(title)
+            return "field"
+        if parent_role == "type":
+            self.case = {"title": title.strip(), "feature": self.feature, "type": self.tc_type, "priority": "",
+                         "preconditions": "", "steps": "", "expected_result": "", "_markers": []}
+            return "case"
+        if title.endswith(FEATURE_SUFFIX):
+            self.feature = title[:-len(FEATURE_SUFFIX)].strip()
+            return "feature"
+        if parent_role == "feature" and title.endswith(TYPE_SUFFIX):
+            self.tc_type = title[:-len(TYPE_SUFFIX)].strip()
+            return "type"
+        return "other"
+
+    def _field(self, title: str) -> None:
+        if self.case is None:
+            return
+        for name, pattern in _FIELD_RES:
+            match = pattern.match(title)
+            if match:
+                self.case[name] = match.group(match.lastindex)
+                if name == "steps" and match.group(1):
+                    self.case["_step_priority"] = match.group(1)
+                return
+        self.ignored += 1
+
+    def marker(self, marker_id: str) -> None:
+        if self.case is not None:
+            self.case["_markers"].append(marker_id)
+
+    def end_case(self) -> Dict[str, Any]:
+        case, self.case = self.case, None
+        markers = case.pop("_markers")
+        step_priority = case.pop("_step_priority", "")
+        case["priority"] = next((_PRIORITIES[m] for m in markers if m in _PRIORITIES), step_priority)
+        flag_type = next((_FLAG_TYPES[m] for m in markers if m in _FLAG_TYPES), None)
+        if flag_type and flag_type != case["type"] and TYPE_MARKERS.get(case["type"]) not in markers:
+            case["type"] = flag_type
+        return case
+
+
+def _iter_content_xml(f: IO[bytes], builder: _CaseBuilder) -> Iterator[Dict[str, Any]]:
+    # roles：未结束的主题的角色（标题读到之前为 None）；containers：未结束的 <topics> 容器
+    roles: List[Optional[str]] = []
+    containers: List[ET.Element] = []
+    for event, el in ET.iterparse(f, events=("start", "end")):
+        tag = el.tag
+        if event == "start":
+            if tag == _TOPIC_TAG:
+                roles.append(None)
+            elif tag == _TOPICS_TAG:
+                containers.append(el)
+            continue
+        if tag == _TITLE_TAG:
+            # 主题的第一个结束的 <title> 即其自身标题（子主题开始时已压入新的角色；sheet 标题在任何主题之前）
+            if roles and roles[-1] is None:
+                roles[-1] = builder.role(roles[-2] if len(roles) > 1 else "", el.text or "")
+        elif tag == _MARKER_TAG:
+            if roles and roles[-1] == "case":
+                builder.marker(el.get("marker-id") or "")
+        elif tag == _TOPIC_TAG:
+            if roles.pop() == "case":
+                yield builder.end_case()
+            el.clear()
+            # 父容器中已处理完的兄弟主题不再需要
+            if containers:
+                containers[-1].clear()
+        elif tag == _TOPICS_TAG:
+            containers.pop()
+
+
+def _iter_content_json(f: IO[bytes], builder: _CaseBuilder) -> Iterator[Dict[str, Any]]:
+    sheets = json.load(f)
+    for sheet in sheets if isinstance(sheets, list) else []:
+        root = sheet.get("rootTopic") if isinstance(sheet, dict) else None
+        if not isinstance(root, dict):
+            continue
+        # 显式栈：(主题, 父角色)，或「用例结束」哨兵
+        stack: List[Any] = [(root, "")]
+        while stack:
+            entry = stack.pop()
+            if entry is None:
+                yield builder.end_case()
+                continue
+            topic, parent_role = entry
+            role = builder.role(parent_role, topic.get("title") or "")
+            if role == "case":
+                for marker in topic.get("markers") or []:
+                    builder.marker(marker.get("markerId") or "")
+                stack.append(None)
+            children = (topic.get("children") or {}).get("attached") or []
+            stack.extend((child, role) for child in reversed(children) if isinstance(child, dict))
+
+
+def iter_xmind_cases(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    逐条产出导图中的用例（title、feature、type、priority、preconditions、steps、expected_result）。
+
+    Raises:
+        SystemExit: 文件不存在、不是 .xmind 压缩包或没有 content.xml / content.json 时退出
+    """
+    try:
+        with zipfile.ZipFile(path) as zf:
+            names = set(zf.namelist())
+            builder = _CaseBuilder()
+            # XMind 2020+ 同时写入 content.json 与一个仅含提示的 content.xml，优先读取 content.json
+            if "content.json" in names:
+                with zf.open("content.json") as f:
+                    yield from _iter_content_json(f, builder)
+            elif "content.xml" in names:
+                with zf.open("content.xml") as f:
+                    yield from _iter_content_xml(f, builder)
+            else:
+                logger.error("不是 XMind 文件（缺少 content.xml / content.json）：%s", path)
+                sys.exit(1)
+            if builder.ignored:
+                logger.warning("%s：%d 个用例子主题不是「预置条件 / 操作步骤 / 期望结果」，已忽略", path, builder.ignored)
+    except FileNotFoundError:
+        logger.error("文件不存在: %s", path)
+        sys.exit(1)
+    except (zipfile.BadZipFile, ET.ParseError, ValueError) as e:
+        logger.error("无法读取 %s：%s", path, e)
+        sys.exit(1)
+
+
+def _load_base(path: str, meta: Optional[Dict[str, Any]] = None) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """原用例按 (功能模块, 标题) 分组，组内保持原顺序；meta 收集 testcases 以外的顶层字段。"""
+    base: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for tc in iter_and_validate_testcases(path, meta):
+        if isinstance(tc, dict):
+            key = (tc.get("feature", "未分类"), (tc.get("title") or tc.get("name", "")).strip())
+            base.setdefault(key, []).append(tc)
+    return base
+
+
+def merge_with_base(
+    cases: Iterable[Dict[str, Any]],
+    base: Optional[Dict[Tuple[str, str], List[Dict[str, Any]]]] = None,
+    id_prefix: str = DEFAULT_ID_PREFIX,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    为导图用例补全编号：匹配到原用例时保留其全部字段并以导图内容覆盖，否则按 id_prefix 顺序编号
+    （跳过原用例已使用的编号）。stats 记录 matched / added。
+
+    同一功能模块下的同名用例在导图中按类型分组，顺序与原文件不同：优先匹配类型相同的原用例，其次按原顺序。
+    """
+    base = base or {}
+    used = {tc.get("id") for cases_ in base.values() for tc in cases_}
+    stats = {} if stats is None else stats
+    stats.setdefault("matched", 0)
+    stats.setdefault("added", 0)
+    next_number = 1
+    for case in cases:
+        originals = base.get((case["feature"], case["title"]))
+        if originals:
+            index = next((i for i, tc in enumerate(originals) if tc.get("type", "其他") == case["type"]), 0)
+            tc = dict(originals.pop(index))
+            stats["matched"] += 1
+            if "expected" in tc and "expected_result" not in tc:
+                del tc["expected"]
+            tc.pop("name", None)
+            # 原用例缺省的类型 / 功能模块在导图中显示为「其他」「未分类」，不写回
+            if "type" not in tc and case["type"] == "其他":
+                del case["type"]
+            if "feature" not in tc and case["feature"] == "未分类":
+                del case["feature"]
+            tc.update(case)
+            yield tc
+            continue
+        while f"{id_prefix}{next_number:03d}" in used:
+            next_number += 1
+        stats["added"] += 1
+        yield {"id": f"{id_prefix}{next_number:03d}", **case}
+        next_number += 1
+
+
+def main() -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Import an edited XMind test case map back to testcases.json")
+    parser.add_argument("--input", "-i", nargs="+", required=True,
+                        help=".xmind files written by generate_xmind.py (several for --split-output files)")
+    parser.add_argument("--output", "-o", required=True, help="Output testcases.json path")
+    parser.add_argument("--base", "-b",
+                        help="Original testcases.json; matched cases keep their id, tp_refs and other fields")
+    parser.add_argument("--id-prefix", default=DEFAULT_ID_PREFIX,
+                        help=f"ID prefix for cases not found in --base (default: {DEFAULT_ID_PREFIX})")
+    args = parser.parse_args()
+
+    meta: Dict[str, Any] = {}
+    base = _load_base(args.base, meta) if args.base else None
+    cases = (case for path in args.input for case in iter_xmind_cases(path))
+    stats: Dict[str, int] = {}
+    # 导图中没有 tp_refs：只有原用例为 v2 时才能写回 v2，否则写出 v1 数组
+    count = write_testcases(args.output, merge_with_base(cases, base, args.id_prefix, stats),
+                            meta.get("schema_version"))
+    if not count:
+        logger.error("导图中没有识别到用例（需要「{功能模块} - 测试用例」→「{类型}用例」→ 用例 的层级）")
+        sys.exit(1)
+
+    detail = f"，匹配原用例 {stats['matched']} 条，新增 {stats['added']} 条" if base is not None else ""
+    print(f"已生成：{args.output}（{count} 条用例{detail}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+本地生成服务的传输层：HTTP / Unix socket 服务器、请求体读取与按字节数限制的 LRU 缓存。
+
+api2jmx 与 testspec-generate 的 service.py 共用本模块。两个 skill 各自独立安装、不能相互导入，
+因此本文件在两个 skill 的 scripts/ 下各有一份，内容必须完全一致（见仓库 README「共享模块」）。
+"""
+import json
+import logging
+import os
+import socketserver
+import stat
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+# 请求体上限（字节）
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+class LruCache:
+    """线程安全的 LRU 缓存，按条目的估算字节数（而不是条数）限制总大小，记录命中统计。"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any, size: int) -> None:
+        """size 为该条目占用内存的估算字节数；单条超过上限时不缓存。"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """请求处理基类：子类实现 do_GET / do_POST，通过 self.server.service 访问业务对象。"""
+
+    # 保持连接，调用方连续请求时免去重复建连
+    protocol_version = "HTTP/1.1"
+    max_body_bytes = MAX_BODY_BYTES
+
+    def read_body(self) -> Optional[bytes]:
+        """读取请求体；Content-Length 缺失、无效或超限时直接回复错误并返回 None。"""
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.send_json(411, {"error": "缺少 Content-Length"})
+            return None
+        if length < 0:
+            # rfile.read(-1) 会一直读到连接关闭，保持连接时将阻塞
+            self.send_json(400, {"error": f"Content-Length 无效: {length}"})
+            self.close_connection = True
+            return None
+        if length > self.max_body_bytes:
+            self.send_json(413, {"error": f"请求体超过 {self.max_body_bytes} 字节"})
+            self.close_connection = True
+            return None
+        return self.rfile.read(length)
+
+    def send_json(self, status: int, data: Dict[str, Any]) -> None:
+        self.send_bytes(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def send_bytes(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Unix socket 没有客户端地址，不使用默认的 address_string()
+        logger.debug("%s", format % args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: Any, handler_class: type, host: str = DEFAULT_HOST, port: int = 0,
+                unix_socket: Optional[str] = None) -> socketserver.BaseServer:
+    """
+    创建（尚未开始服务的）服务器；unix_socket 非空时监听该路径，否则监听 host:port（port 为 0 时自动分配）
+
+    Raises:
+        OSError: 无法监听，或 unix_socket 路径已存在且不是 socket（不会删除普通文件）
+    """
+    if unix_socket:
+        try:
+            mode = os.lstat(unix_socket).st_mode
+        except FileNotFoundError:
+            mode = None
+        if mode is not None:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{unix_socket} 已存在且不是 socket")
+            # 上次运行遗留的 socket 文件
+            os.remove(unix_socket)
+        server: socketserver.BaseServer = _UnixHTTPServer(unix_socket, handler_class)
+    else:
+        server = ThreadingHTTPServer((host, port), handler_class)
+    server.service = service
+    return server
+
+
+def server_address(server: socketserver.BaseServer) -> str:
+    address: Any = server.server_address
+    if isinstance(address, tuple):
+        return f"http://{address[0]}:{address[1]}"
+    return f"unix:{address}"
+
+
+def serve(server: socketserver.BaseServer) -> None:
+    """前台运行服务器直到 Ctrl+C，退出时关闭服务器并删除 Unix socket 文件。"""
+    print(f"服务已启动：{server_address(server)}（Ctrl+C 退出）", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("已停止服务")
+    finally:
+        server.server_close()
+        if isinstance(server, _UnixHTTPServer) and os.path.exists(server.server_address):
+            os.remove(server.server_address)
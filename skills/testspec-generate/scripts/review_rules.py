@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+TestSpec 评审规则检查：对 testcases.json 与 specs/testpoints.md 执行可判定的 R1-R6 规则，输出结构化 findings JSON。
+
+规则定义与判定标准见 testspec-review/SKILL.md。用例只流式遍历一次：
+预编译正则、TP_ID 与标题层级预先建立索引（testpoints.py），每条用例在同一次循环中完成 R2/R4/R5/R6 判定并累计 R1/R3 所需计数。
+启发式检查（H1-H6）仍由评审者基于本脚本输出完成。
+
+用法：
+    python review_rules.py --testcases testcases.json --testpoints specs/testpoints.md --output review-findings.json
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    from testpoints import NAME_RE, TestPoints, parse_testpoints
+    from utils import configure_logging, iter_and_validate_testcases
+except ImportError:
+    from .testpoints import NAME_RE, TestPoints, parse_testpoints
+    from .utils import configure_logging, iter_and_validate_testcases
+
+logger = logging.getLogger(__name__)
+
+# R4 必填字段
+REQUIRED_FIELDS = ("id", "title", "steps", "expected_result", "priority")
+
+# R5 可执行性最小条件
+MIN_TEXT_LENGTH = 10
+ACTION_VERBS = ("点击", "输入", "选择", "等待", "查看", "校验", "打开", "提交", "确认", "删除", "修改", "搜索", "上传", "下载")
+_ACTION_RE = re.compile("|".join(ACTION_VERBS))
+
+# R1 覆盖率阈值（%）
+COVERAGE_THRESHOLD = 95.0
+
+# R3 合理区间（占比 %）：目标 ± 10
+PRIORITY_TARGETS = {"冒烟": 30, "P1": 50, "P2": 30, "P3": 20}
+PRIORITY_TOLERANCE = 10
+
+# 每条规则输出的问题明细上限（超出部分只计数）
+DEFAULT_MAX_FINDINGS = 200
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else str(value).strip()
+
+
+def _case_id(tc: Dict[str, Any], index: int) -> str:
+    return _text(tc.get("id")) or f"#{index}"
+
+
+class _Findings:
+    """单条规则的问题明细，超过上限只计数。"""
+
+    def __init__(self, limit: int) -> None:
+        self.items: List[Dict[str, Any]] = []
+        self.total = 0
+        self.limit = limit
+
+    def add(self, item: Dict[str, Any]) -> None:
+        self.total += 1
+        if len(self.items) < self.limit:
+            self.items.append(item)
+
+
+def _rule(name: str, status: str, severity: Optional[str], metrics: Dict[str, Any],
+          findings: _Findings) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "status": status,
+        "severity": severity if status != "pass" else None,
+        "metrics": metrics,
+        "findings_total": findings.total,
+        "findings": findings.items,
+    }
+
+
+def _percent(part: int, total: int) -> float:
+    return round(part * 100.0 / total, 1) if total else 0.0
+
+
+def review(testcases_path: str, testpoints: TestPoints, max_findings: int = DEFAULT_MAX_FINDINGS) -> Dict[str, Any]:
+    """一次遍历用例，返回 R1-R6 的检查结果。"""
+    meta: Dict[str, Any] = {}
+    tp_ids = testpoints.points
+    tp_by_prefix = testpoints.by_prefix()
+    hierarchy = testpoints.hierarchy
+
+    r2, r3, r4, r5, r6 = (_Findings(max_findings) for _ in range(5))
+    covered_by_refs: Set[str] = set()
+    covered_by_title: Set[str] = set()
+    priorities: Counter = Counter()
+    types: Counter = Counter()
+    total = with_refs = mapped = 0
+
+    for index, tc in enumerate(iter_and_validate_testcases(testcases_path, meta), 1):
+        if not isinstance(tc, dict):
+            tc = {}
+        total += 1
+        case_id = _case_id(tc, index)
+        title = _text(tc.get("title"))
+        feature = _text(tc.get("feature"))
+        priority = _text(tc.get("priority"))
+        tc_type = _text(tc.get("type"))
+        steps = _text(tc.get("steps"))
+        expected = _text(tc.get("expected_result"))
+
+        # R2 命名契约
+        reasons = []
+        match = NAME_RE.match(title)
+        if not match:
+            reasons.append("标题不符合 {模块}_{功能点}_{场景} 三段式")
+        else:
+            module, point, scene = match.groups()
+            if feature and module != feature:
+                reasons.append(f"模块「{module}」与 feature「{feature}」不一致")
+            if hierarchy and (module, point) not in hierarchy:
+                reasons.append(f"「{module}_{point}」不在 testpoints.md 标题层级中")
+            # Legacy 模式按标题推断覆盖：同一 {模块}_{功能点} 下场景与验证意图互相包含
+            for tp_id, intent in tp_by_prefix.get(f"{module}_{point}", ()):
+                if intent in scene or scene in intent:
+                    covered_by_title.add(tp_id)
+        if reasons:
+            item = {"id": case_id, "title": title, "reasons": reasons}
+            if match and feature and match.group(1) != feature:
+                item["suggested_title"] = f"{feature}_{match.group(2)}_{match.group(3)}"
+            r2.add(item)
+
+        # R3 计数
+        priorities[priority] += 1
+        types[tc_type] += 1
+        if tc_type == "冒烟" and priority != "P1":
+            r3.add({"id": case_id, "title": title, "reason": f"冒烟用例优先级为 {priority or '空'}，应为 P1"})
+
+        # R4 字段完整性
+        missing = [name for name in REQUIRED_FIELDS if not _text(tc.get(name))]
+        if missing:
+            r4.add({"id": case_id, "title": title, "missing": missing})
+
+        # R5 可执行性（缺失字段已由 R4 报告，这里只检查已填写的内容）
+        problems = []
+        if steps and len(steps) < MIN_TEXT_LENGTH:
+            problems.append(f"steps 少于 {MIN_TEXT_LENGTH} 个字符")
+        if expected and len(expected) < MIN_TEXT_LENGTH:
+            problems.append(f"expected_result 少于 {MIN_TEXT_LENGTH} 个字符")
+        if steps and not _ACTION_RE.search(steps):
+            problems.append("steps 缺少动作动词")
+        if problems:
+            r5.add({"id": case_id, "title": title, "problems": problems})
+
+        # R6 可追溯性
+        refs = tc.get("tp_refs")
+        refs = [_text(ref) for ref in refs] if isinstance(refs, list) else []
+        refs = [ref for ref in refs if ref]
+        if refs:
+            with_refs += 1
+            covered_by_refs.update(ref for ref in refs if ref in tp_ids)
+            unknown = [ref for ref in refs if ref not in tp_ids]
+            if unknown:
+                r6.add({"id": case_id, "title": title, "reason": "tp_refs 引用了不存在的 TP_ID", "tp_refs": unknown})
+            else:
+                mapped += 1
+        else:
+            r6.add({"id": case_id, "title": title, "reason": "缺少 tp_refs"})
+
+    schema_version = meta.get("schema_version")
+    # 模式判定（testspec-review/SKILL.md）：v2 且所有用例都有非空 tp_refs 才是 Strict，遍历结束后才能确定
+    strict = isinstance(schema_version, int) and schema_version >= 2 and with_refs == total
+    rules: Dict[str, Any] = {}
+
+    # R1 覆盖度
+    covered = covered_by_refs if strict else covered_by_title
+    r1 = _Findings(max_findings)
+    for tp_id, info in tp_ids.items():
+        if tp_id not in covered:
+            r1.add({"tp_id": tp_id, "title": info["title"], "priority": info["priority"], "line": info["line"]})
+    coverage = _percent(len(covered), len(tp_ids))
+    rules["R1"] = _rule("测试点覆盖度", "pass" if coverage >= COVERAGE_THRESHOLD else "fail", "S2", {
+        "testpoints": len(tp_ids),
+        "covered": len(covered),
+        "coverage": coverage,
+        "method": "tp_refs" if strict else "title",
+        "confidence": "high" if strict else "low",
+    }, r1)
+
+    rules["R2"] = _rule("命名契约", "fail" if r2.total else "pass", "S2",
+                        {"cases": total, "violations": r2.total}, r2)
+
+    # R3 优先级分布
+    counts = {"冒烟": types["冒烟"], "P1": priorities["P1"], "P2": priorities["P2"], "P3": priorities["P3"]}
+    ratios = {level: _percent(count, total) for level, count in counts.items()}
+    out_of_range = {}
+    for level, target in PRIORITY_TARGETS.items():
+        if abs(ratios[level] - target) > PRIORITY_TOLERANCE:
+            out_of_range[level] = "偏高" if ratios[level] > target else "偏低"
+    rules["R3"] = _rule("优先级分布", "warn" if out_of_range or r3.total else "pass", "S3", {
+        "counts": counts,
+        "ratios": ratios,
+        "targets": {level: [t - PRIORITY_TOLERANCE, t + PRIORITY_TOLERANCE] for level, t in PRIORITY_TARGETS.items()},
+        "out_of_range": out_of_range,
+        "types": dict(types),
+    }, r3)
+
+    rules["R4"] = _rule("字段完整性", "fail" if r4.total else "pass", "S1",
+                        {"cases": total, "incomplete": r4.total}, r4)
+    rules["R5"] = _rule("可执行性最小条件", "fail" if r5.total else "pass", "S1",
+                        {"cases": total, "not_executable": r5.total}, r5)
+
+    # R6 可追溯性：Legacy 模式只给出警告
+    r6_metrics = {"cases": total, "with_tp_refs": with_refs, "mapped": mapped, "mapping_rate": _percent(mapped, total)}
+    if strict:
+        rules["R6"] = _rule("可追溯性", "fail" if mapped < total else "pass", "S1", r6_metrics, r6)
+    else:
+        rules["R6"] = _rule("可追溯性", "warn", "S2", r6_metrics, r6)
+
+    summary: Counter = Counter()
+    for rule in rules.values():
+        if rule["status"] != "pass":
+            summary[rule["severity"]] += 1
+    return {
+        "mode": "strict" if strict else "legacy",
+        "schema_version": schema_version,
+        "cases": total,
+        "testpoints": len(tp_ids),
+        "summary": {level: summary[level] for level in ("S1", "S2", "S3")},
+        "rules": rules,
+    }
+
+
+def main() -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Run decidable review rules R1-R6 on testcases.json")
+    parser.add_argument("--testcases", "-i", required=True, help="Path to testcases.json")
+    parser.add_argument("--testpoints", "-p", required=True, help="Path to specs/testpoints.md")
+    parser.add_argument("--output", "-o", help="Output findings JSON path (default: stdout)")
+    parser.add_argument("--max-findings", type=int, default=DEFAULT_MAX_FINDINGS,
+                        help=f"Findings listed per rule; the rest are only counted (default: {DEFAULT_MAX_FINDINGS})")
+    args = parser.parse_args()
+
+    try:
+        testpoints = parse_testpoints(args.testpoints)
+    except FileNotFoundError:
+        logger.error("文件不存在: %s", args.testpoints)
+        sys.exit(1)
+    if not testpoints.points:
+        logger.error("testpoints.md 中未找到测试点（TP_ID）：%s", args.testpoints)
+        sys.exit(1)
+
+    result = review(args.testcases, testpoints, args.max_findings)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if not args.output:
+        print(text)
+        return
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    statuses = " ".join(f"{rule_id}:{rule['status']}" for rule_id, rule in result["rules"].items())
+    print(f"已生成：{args.output}（{result['mode']}，{result['cases']} 条用例，{statuses}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+TestSpec 用例子集选择：在 CI 时间预算或用例数上限内，从 testcases.json 选出价值最高的子集（如冒烟子集）。
+
+价值 = 用例自身权重 + 新覆盖的测试点：
+    自身权重：优先级权重（P1 > P2 > P3）× 类型权重（冒烟最高）
+    覆盖收益：每个首次被覆盖的 TP_ID 加 --coverage-weight；无 tp_refs 的用例按标题 {模块}_{功能点} 计覆盖
+覆盖收益随已选用例递减（已覆盖的 TP 不再计分），属于带预算的最大覆盖问题。
+本脚本用惰性贪心（CELF）求解：按「边际价值 / 耗时」建堆，出堆时才重算边际价值，仍为最大则选入，
+否则以新值放回；边际价值只减不增，多数用例无需重算，10 万条用例也在秒级完成。
+按单位耗时贪心在预算下可能任意差（如高价值的长用例恰好占满预算），因此再与预算内价值最高的单条用例比较，
+取总价值较高者，保证不低于最优解的 (1 - 1/e) / 2。
+
+耗时来源（秒）：--durations 文件（{用例 ID: 秒}，如 import_results.py 输出）> 用例 duration 字段 >
+按步骤行数估算（--seconds-per-step）。
+
+用例流式读取两遍：第一遍只保留权重、耗时与覆盖键，第二遍原样写出被选中的用例（保持原顺序），
+输出为与输入格式相同（v1 数组或 v2 对象）的 testcases.json，可直接交给 generate_excel.py / generate_xmind.py / export_all.py。
+
+用法：
+    python select_subset.py --input testcases.json --output smoke.json --time-budget 15m
+    python select_subset.py --input testcases.json --output smoke.json --max-cases 200 --durations durations.json
+"""
+import argparse
+import heapq
+import json
+import logging
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from testpoints import NAME_RE
+    from utils import configure_logging, iter_and_validate_testcases, iter_testcases, load_json_file, write_testcases
+except ImportError:
+    from .testpoints import NAME_RE
+    from .utils import configure_logging, iter_and_validate_testcases, iter_testcases, load_json_file, write_testcases
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_WEIGHTS = {"P1": 3.0, "P2": 2.0, "P3": 1.0}
+TYPE_WEIGHTS = {"冒烟": 2.0, "正向": 1.0, "负向": 1.0, "边界": 0.8, "异常": 0.8}
+# 未填写或未知的优先级 / 类型
+DEFAULT_PRIORITY_WEIGHT = 1.0
+DEFAULT_TYPE_WEIGHT = 1.0
+
+# 大于任一用例的自身权重上限（3.0 × 2.0），耗时相同时覆盖新测试点的用例总是优先于重复覆盖的用例
+DEFAULT_COVERAGE_WEIGHT = 10.0
+DEFAULT_SECONDS_PER_STEP = 30.0
+
+_STEP_RE = re.compile(r"^\s*\d+\s*[、.．)）]", re.MULTILINE)
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*$", re.IGNORECASE)
+_UNIT_SECONDS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(text: str) -> float:
+    """「90」「90s」「15m」「1.5h」→ 秒。"""
+    match = _DURATION_RE.match(text)
+    if not match:
+        raise ValueError(f"无法识别的时长：{text}（示例：900、15m、1.5h）")
+    return float(match.group(1)) * _UNIT_SECONDS[match.group(2).lower()]
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else str(value).strip()
+
+
+def estimate_duration(tc: Dict[str, Any], seconds_per_step: float) -> float:
+    """按步骤数估算耗时：「1、」「2.」等编号行计为一步，无编号时按非空行计。"""
+    steps = _text(tc.get("steps"))
+    count = len(_STEP_RE.findall(steps)) or sum(1 for line in steps.splitlines() if line.strip())
+    return max(count, 1) * seconds_per_step
+
+
+def case_weight(tc: Dict[str, Any]) -> float:
+    return (PRIORITY_WEIGHTS.get(_text(tc.get("priority")), DEFAULT_PRIORITY_WEIGHT)
+            * TYPE_WEIGHTS.get(_text(tc.get("type")), DEFAULT_TYPE_WEIGHT))
+
+
+def coverage_keys(tc: Dict[str, Any]) -> Tuple[str, ...]:
+    """用例覆盖的键：tp_refs 中的 TP_ID；没有 tp_refs 时为标题的 {模块}_{功能点}。"""
+    refs = tc.get("tp_refs")
+    if isinstance(refs, list):
+        keys = tuple(sorted({_text(ref) for ref in refs if _text(ref)}))
+        if keys:
+            return keys
+    match = NAME_RE.match(_text(tc.get("title")))
+    return (f"{match.group(1)}_{match.group(2)}",) if match else ()
+
+
+def select(
+    weights: Sequence[float],
+    costs: Sequence[float],
+    keys: Sequence[Tuple[str, ...]],
+    time_budget: Optional[float] = None,
+    max_cases: Optional[int] = None,
+    coverage_weight: float = DEFAULT_COVERAGE_WEIGHT,
+) -> List[int]:
+    """
+    惰性贪心选择子集。
+
+    Args:
+        weights: 每条用例的自身权重
+        costs: 每条用例的耗时（秒，> 0）
+        keys: 每条用例覆盖的键
+        time_budget: 总耗时上限（秒），None 表示不限
+        max_cases: 用例数上限，None 表示不限
+        coverage_weight: 每个新覆盖的键的收益
+
+    Returns:
+        选中用例的下标（升序）
+    """
+    # 只限制条数时按边际价值排序，否则按单位耗时的边际价值排序
+    by_ratio = time_budget is not None
+    covered: Set[str] = set()
+
+    def total_value(indices: List[int]) -> float:
+        return (sum(weights[i] for i in indices)
+                + coverage_weight * len({key for i in indices for key in keys[i]}))
+
+    def gain(i: int) -> float:
+        return weights[i] + coverage_weight * sum(1 for key in keys[i] if key not in covered)
+
+    def priority(i: int, value: float) -> float:
+        return value / costs[i] if by_ratio else value
+
+    # 堆元素：(-优先级, 下标)；同分时下标小者优先，结果稳定
+    heap = [(-priority(i, gain(i)), i) for i in range(len(weights))]
+    heapq.heapify(heap)
+    chosen: List[int] = []
+    used = 0.0
+    limit = len(weights) if max_cases is None else max_cases
+    while heap and len(chosen) < limit:
+        _, i = heapq.heappop(heap)
+        if time_budget is not None and used + costs[i] > time_budget:
+            # 放不下的用例不再考虑（预算只减不增）
+            continue
+        current = -priority(i, gain(i))
+        if heap and current > heap[0][0]:
+            # 边际价值已下降且不再是最大，按新值放回
+            heapq.heappush(heap, (current, i))
+            continue
+        chosen.append(i)
+        used += costs[i]
+        covered.update(keys[i])
+
+    if by_ratio and limit > 0:
+        fits = [i for i in range(len(weights)) if costs[i] <= time_budget]
+        if fits:
+            # 同分时下标小者优先
+            best = max(fits, key=lambda i: (total_value([i]), -i))
+            if total_value([best]) > total_value(chosen):
+                return [best]
+    return sorted(chosen)
+
+
+def _load_durations(path: str) -> Dict[str, float]:
+    data = load_json_file(path)
+    if not isinstance(data, dict):
+        logger.error("耗时文件应为 {用例 ID: 秒} 对象：%s", path)
+        sys.exit(1)
+    durations = {}
+    for case_id, seconds in data.items():
+        if isinstance(seconds, (int, float)) and not isinstance(seconds, bool) and seconds > 0:
+            durations[str(case_id)] = float(seconds)
+    return durations
+
+
+def _summarize(indices: Iterable[int], priorities: Sequence[str], types: Sequence[str],
+               costs: Sequence[float], keys: Sequence[Tuple[str, ...]]) -> Dict[str, Any]:
+    indices = list(indices)
+    by_priority: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+    covered: Set[str] = set()
+    for i in indices:
+        by_priority[priorities[i] or "空"] = by_priority.get(priorities[i] or "空", 0) + 1
+        by_type[types[i] or "空"] = by_type.get(types[i] or "空", 0) + 1
+        covered.update(keys[i])
+    return {
+        "cases": len(indices),
+        "seconds": round(sum(costs[i] for i in indices), 1),
+        "coverage_keys": len(covered),
+        "priorities": dict(sorted(by_priority.items())),
+        "types": by_type,
+    }
+
+
+def main() -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Select the most valuable test case subset within a time/count budget")
+    parser.add_argument("--input", "-i", required=True, help="Path to testcases.json")
+    parser.add_argument("--output", "-o", required=True, help="Output testcases.json path for the subset")
+    parser.add_argument("--time-budget", help="Total duration budget, e.g. 900, 15m, 1.5h")
+    parser.add_argument("--max-cases", type=int, help="Maximum number of cases")
+    parser.add_argument("--durations", help="JSON object {case id: seconds} with measured durations")
+    parser.add_argument("--seconds-per-step", type=float, default=DEFAULT_SECONDS_PER_STEP,
+                        help=f"Estimated seconds per step for cases without a duration "
+                             f"(default: {DEFAULT_SECONDS_PER_STEP:g})")
+    parser.add_argument("--coverage-weight", type=float, default=DEFAULT_COVERAGE_WEIGHT,
+                        help=f"Value of each newly covered TP_ID / {{模块}}_{{功能点}} "
+                             f"(default: {DEFAULT_COVERAGE_WEIGHT:g})")
+    parser.add_argument("--report", help="Also write a JSON summary of the selection to this path")
+    args = parser.parse_args()
+
+    if args.time_budget is None and args.max_cases is None:
+        parser.error("至少指定一个预算：--time-budget / --max-cases")
+    time_budget = None
+    if args.time_budget is not None:
+        try:
+            time_budget = parse_duration(args.time_budget)
+        except ValueError as e:
+            logger.error("%s", e)
+            sys.exit(1)
+    if args.max_cases is not None and args.max_cases < 1:
+        logger.error("--max-cases 必须为正整数：%s", args.max_cases)
+        sys.exit(1)
+    if args.seconds_per_step <= 0:
+        logger.error("--seconds-per-step 必须大于 0：%s", args.seconds_per_step)
+        sys.exit(1)
+    durations = _load_durations(args.durations) if args.durations else {}
+
+    # 第一遍：只保留选择所需的信息
+    meta: Dict[str, Any] = {}
+    weights: List[float] = []
+    costs: List[float] = []
+    keys: List[Tuple[str, ...]] = []
+    priorities: List[str] = []
+    types: List[str] = []
+    for tc in iter_and_validate_testcases(args.input, meta):
+        if not isinstance(tc, dict):
+            tc = {}
+        seconds = durations.get(_text(tc.get("id")))
+        if seconds is None:
+            value = tc.get("duration")
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+                seconds = float(value)
+            else:
+                seconds = estimate_duration(tc, args.seconds_per_step)
+        weights.append(case_weight(tc))
+        costs.append(seconds)
+        keys.append(coverage_keys(tc))
+        priorities.append(_text(tc.get("priority")))
+        types.append(_text(tc.get("type")))
+
+    chosen = select(weights, costs, keys, time_budget, args.max_cases, args.coverage_weight)
+    if not chosen:
+        logger.error("预算内放不下任何用例（最短用例耗时 %.0fs）", min(costs))
+        sys.exit(1)
+
+    # 第二遍：原样写出选中的用例，格式（v1 数组 / v2 对象）与输入一致
+    selected = set(chosen)
+    write_testcases(args.output, (tc for index, tc in enumerate(iter_testcases(args.input)) if index in selected),
+                    meta.get("schema_version"))
+
+    report = {
+        "time_budget": time_budget,
+        "max_cases": args.max_cases,
+        "suite": _summarize(range(len(weights)), priorities, types, costs, keys),
+        "selected": _summarize(chosen, priorities, types, costs, keys),
+    }
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    suite, picked = report["suite"], report["selected"]
+    print(f"已生成：{args.output}（{picked['cases']}/{suite['cases']} 条用例，"
+          f"预计 {picked['seconds']:.0f}s / 全量 {suite['seconds']:.0f}s，"
+          f"覆盖 {picked['coverage_keys']}/{suite['coverage_keys']} 个测试点）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+TestSpec 本地生成服务：常驻进程通过 HTTP 或 Unix socket 接收 testcases.json，按需返回 Excel / XMind。
+
+门户等调用方每次生成都启动脚本时，要付出解释器启动、模块导入与用例解析的开销；
+服务启动时导入一次写出器，请求体（testcases.json 内容）解析后的用例按内容摘要缓存，
+同一份用例换格式或选项再次导出时跳过解析，完全相同的请求直接返回缓存的文件。
+每个连接由独立线程处理，各写出器只读共享用例、不持有模块级状态，可并发执行。
+两级缓存按估算字节数限制大小；服务器与缓存等传输层实现见 local_service.py。
+
+用法：
+    python service.py --port 8766
+    python service.py --unix-socket /tmp/testspec.sock
+
+    curl --data-binary @testcases.json -o cases.xlsx http://127.0.0.1:8766/xlsx
+    curl --data-binary @testcases.json -o cases.xmind 'http://127.0.0.1:8766/xmind?title=登录&xmind_format=zen&reproducible=1'
+
+接口：
+    POST /<格式>   格式为 export_all.WRITERS 中的键（xlsx、xmind），请求体为 testcases.json（v1 或 v2）；
+                   查询参数 engine、title、xmind_format、reproducible 与 export_all.py 同名参数含义相同。
+                   成功返回 200 与文件内容，输入无效返回 400 {"error": "..."}
+    GET /health    返回 {"status": "ok", "parse_cache": {...}, "result_cache": {...}}
+
+未加 reproducible=1 时 XMind 主题 ID 随机生成，相同请求命中缓存时返回的是首次生成的文件。
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import socketserver
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+try:
+    import local_service
+    from export_all import WRITERS, cache_options
+    from generate_excel import ENGINES
+    from generate_xmind import FORMATS
+    from local_service import DEFAULT_HOST, LruCache, ServiceHandler, serve
+    from utils import configure_logging, extract_testcases
+except ImportError:
+    from . import local_service
+    from .export_all import WRITERS, cache_options
+    from .generate_excel import ENGINES
+    from .generate_xmind import FORMATS
+    from .local_service import DEFAULT_HOST, LruCache, ServiceHandler, serve
+    from .utils import configure_logging, extract_testcases
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8766
+# 解析结果与生成结果各自的缓存上限（MB）
+DEFAULT_CACHE_MB = 128
+# 解析后的用例按请求体大小的倍数估算内存占用（实测 Python 对象约为 testcases.json 的 3.7 倍）
+PARSED_SIZE_FACTOR = 4
+
+# 各格式的响应类型
+CONTENT_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "xmind": "application/vnd.xmind.workbook",
+}
+
+DEFAULT_OPTIONS = {"engine": "builtin", "title": "测试用例", "xmind_format": "xmind8", "reproducible": False}
+
+
+def parse_options(params: Dict[str, str]) -> Dict[str, Any]:
+    """把查询参数转换为写出选项（缺省值与命令行一致），取值无效时抛出 ValueError。"""
+    unknown = sorted(set(params) - set(DEFAULT_OPTIONS))
+    if unknown:
+        raise ValueError(f"不支持的参数: {', '.join(unknown)}")
+    options = {**DEFAULT_OPTIONS, **params}
+    if options["engine"] not in ENGINES:
+        raise ValueError(f"engine 只能为：{', '.join(sorted(ENGINES))}")
+    if options["xmind_format"] not in FORMATS:
+        raise ValueError(f"xmind_format 只能为：{', '.join(sorted(FORMATS))}")
+    reproducible = str(options["reproducible"]).lower()
+    if reproducible not in ("0", "1", "false", "true"):
+        raise ValueError("reproducible 只能为 0/1/false/true")
+    options["reproducible"] = reproducible in ("1", "true")
+    return options
+
+
+class GenerationService:
+    """请求处理逻辑（与传输层无关）：解析 → 写出，两级缓存。"""
+
+    def __init__(self, cache_mb: int = DEFAULT_CACHE_MB):
+        self.parse_cache = LruCache(cache_mb * 1024 * 1024)
+        self.result_cache = LruCache(cache_mb * 1024 * 1024)
+
+    def generate(self, fmt: str, body: bytes, params: Dict[str, str]) -> bytes:
+        """
+        把请求体中的用例写出为 fmt 格式，返回文件内容
+
+        Raises:
+            ValueError: 选项无效、JSON 格式无效或未找到测试用例
+        """
+        options = parse_options(params)
+        digest = hashlib.sha256(body).hexdigest()
+        # 只以该格式实际使用的选项为键，如 /xlsx 请求不因 title 不同而重复生成
+        result_key = f"{digest}:{fmt}:{json.dumps(cache_options(fmt, options), sort_keys=True)}"
+        data = self.result_cache.get(result_key)
+        if data is not None:
+            return data
+
+        test_cases = self.parse_cache.get(digest)
+        if test_cases is None:
+            test_cases = self._parse(body)
+            self.parse_cache.put(digest, test_cases, len(body) * PARSED_SIZE_FACTOR)
+
+        # 写出器按路径写文件：在请求独立的临时目录中写出后读回
+        with tempfile.TemporaryDirectory(prefix="testspec-service-") as td:
+            output_path = os.path.join(td, f"cases.{fmt}")
+            WRITERS[fmt](test_cases, output_path, options)
+            with open(output_path, "rb") as f:
+                data = f.read()
+        self.result_cache.put(result_key, data, len(data))
+        return data
+
+    @staticmethod
+    def _parse(body: bytes) -> List[dict]:
+        try:
+            raw = json.loads(body.decode("utf-8-sig"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"JSON 格式无效：{e}") from None
+        test_cases = extract_testcases(raw)
+        if not test_cases or not isinstance(test_cases, list):
+            raise ValueError("JSON 格式不正确：应为用例数组或包含 testcases 字段的对象")
+        if not all(isinstance(tc, dict) for tc in test_cases):
+            raise ValueError("JSON 格式不正确：每条用例应为对象")
+        return test_cases
+
+    def health(self) -> Dict[str, Any]:
+        return {"status": "ok", "parse_cache": self.parse_cache.stats(), "result_cache": self.result_cache.stats()}
+
+
+class _Handler(ServiceHandler):
+    server_version = "testspec"
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == "/health":
+            self.send_json(200, self.server.service.health())
+        else:
+            self.send_json(404, {"error": f"未知路径: {self.path}"})
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        fmt = url.path.strip("/")
+        if fmt not in WRITERS:
+            self.send_json(404, {"error": f"未知路径: {url.path}（可选 {', '.join('/' + n for n in WRITERS)}）"})
+            return
+        body = self.read_body()
+        if body is None:
+            return
+        try:
+            data = self.server.service.generate(fmt, body, dict(parse_qsl(url.query)))
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:  # 单个请求出错不影响服务
+            logger.exception("生成失败")
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self.send_bytes(200, data, CONTENT_TYPES.get(fmt, "application/octet-stream"))
+
+
+def make_server(service: GenerationService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                unix_socket: Optional[str] = None) -> socketserver.BaseServer:
+    """创建（尚未开始服务的）服务器，参数见 local_service.make_server。"""
+    return local_service.make_server(service, _Handler, host, port, unix_socket)
+
+
+def main() -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Serve test case exports (xlsx / xmind) over HTTP or a Unix socket")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Listen address (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"Listen port (default: {DEFAULT_PORT}; 0 picks a free port)")
+    parser.add_argument("--unix-socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_MB,
+                        help=f"Memory budget of each of the parse and result caches in MB "
+                             f"(default: {DEFAULT_CACHE_MB}; 0 disables)")
+    args = parser.parse_args()
+
+    try:
+        server = make_server(GenerationService(args.cache_mb), args.host, args.port, args.unix_socket)
+    except OSError as e:
+        logger.error("无法监听: %s", e)
+        sys.exit(1)
+    serve(server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+TestSpec 测试点解析与索引：单次遍历将 specs/testpoints.md 解析为结构化模型，并按命名契约自检。
+
+模型（TestPoints）：
+    modules / features: 命名字典（模块名称 → MODULE，(模块名称, 功能点名称) → FEATURE）
+    hierarchy:          标题层级中的 (模块, 功能点) → 标题所在行号
+    points:             TP_ID → {title, module, feature, category, priority, focus, requirement, line}
+    sections:           按二、三级标题切分的段（起止行号与标题）
+
+增量解析：二、三级标题（`## 命名字典`、`### {模块}模块` 等）处重置解析状态，文档按这些标题切分为段后
+每段可独立解析。TestPointsParser 按段内容缓存解析结果，重新解析时只解析内容变化的段，
+未变化的段只平移行号；编辑单个模块后重建索引只需解析该模块。
+
+命名契约见 testspec-shared/naming-contract.md。
+
+用法：
+    python testpoints.py --input specs/testpoints.md --output testpoints-index.json
+    python testpoints.py --input specs/testpoints.md --check
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from utils import configure_logging
+except ImportError:
+    from .utils import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# 命名契约：{模块}_{功能点}_{验证意图/场景}，仅 3 段
+NAME_RE = re.compile(r"^([^_\s]+)_([^_\s]+)_([^_\s]+)$")
+
+# 命名字典缩写
+MODULE_ABBR_RE = re.compile(r"^[A-Z]{2,5}$")
+FEATURE_ABBR_RE = re.compile(r"^[A-Z]{2,10}$")
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+# 段边界：二、三级标题
+_SECTION_RE = re.compile(r"^#{2,3}[ \t]", re.MULTILINE)
+_TP_RE = re.compile(r"^\s*[-*]\s*(TP_[A-Z]{2,5}_[A-Z]{2,10}_\d{3})\s*[:：]\s*(.*?)\s*$")
+_TP_FIELD_RE = re.compile(r"^\s+[-*]\s*(验证要点|优先级|关联需求)\s*[:：]\s*(.*?)\s*$")
+_TABLE_ROW_RE = re.compile(r"^\s*\|(.+)\|\s*$")
+_TABLE_SEPARATOR_RE = re.compile(r"^[\s|:-]+$")
+# 「功能验证点 (Functional)」取括号内英文类别
+_CATEGORY_RE = re.compile(r"[（(]\s*([^()（）]+?)\s*[)）]\s*$")
+
+_TP_FIELDS = {"验证要点": "focus", "优先级": "priority", "关联需求": "requirement"}
+
+
+class TestPoints:
+    """testpoints.md 的索引模型（行号从 1 开始）。"""
+
+    def __init__(self) -> None:
+        self.modules: Dict[str, str] = {}
+        self.features: Dict[Tuple[str, str], str] = {}
+        self.module_lines: Dict[str, int] = {}
+        self.hierarchy: Dict[Tuple[str, str], int] = {}
+        self.points: Dict[str, Dict[str, Any]] = {}
+        self.duplicates: List[Tuple[str, Dict[str, Any]]] = []
+        self.sections: List[Tuple[int, int, str]] = []
+
+    def by_prefix(self) -> Dict[str, List[Tuple[str, str]]]:
+        """{模块}_{功能点} → [(TP_ID, 验证意图)]，用于 Legacy 模式按标题推断覆盖。"""
+        index: Dict[str, List[Tuple[str, str]]] = {}
+        for tp_id, info in self.points.items():
+            match = NAME_RE.match(info["title"])
+            prefix = f"{info['module']}_{info['feature']}"
+            intent = match.group(3) if match else info["title"]
+            index.setdefault(prefix, []).append((tp_id, intent))
+        return index
+
+    def section_at(self, line: int) -> Optional[Tuple[int, int, str]]:
+        """包含指定行号的段 (起始行, 结束行, 标题)。"""
+        for section in self.sections:
+            if section[0] <= line <= section[1]:
+                return section
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "modules": dict(self.modules),
+            "features": [{"module": m, "feature": f, "abbr": abbr} for (m, f), abbr in self.features.items()],
+            "hierarchy": [{"module": m, "feature": f, "line": line} for (m, f), line in self.hierarchy.items()],
+            "points": self.points,
+            "sections": [{"start": start, "end": end, "heading": heading} for start, end, heading in self.sections],
+        }
+
+
+def _split_sections(text: str) -> List[Tuple[int, str]]:
+    """按二、三级标题切分，返回 [(起始行号, 段文本)]；首个标题之前的内容为第一段。整篇文本上查找，不逐行匹配。"""
+    sections: List[Tuple[int, str]] = []
+    start, line = 0, 1
+    for match in _SECTION_RE.finditer(text):
+        if match.start() > start:
+            sections.append((line, text[start:match.start()]))
+            line += text.count("\n", start, match.start())
+            start = match.start()
+    if start < len(text):
+        sections.append((line, text[start:]))
+    return sections
+
+
+def _parse_section(text: str) -> Dict[str, Any]:
+    """解析单个段，行号为段内偏移（从 0 开始）。段首标题重置全部状态，解析不依赖前文。"""
+    lines = text.splitlines()
+    result: Dict[str, Any] = {"modules": [], "features": [], "module_lines": [], "hierarchy": [], "points": []}
+    first = _HEADING_RE.match(lines[0]) if lines else None
+    result["heading"] = first.group(2) if first else ""
+    module = feature = category = ""
+    dictionary = False
+    current: Optional[Dict[str, Any]] = None
+    for offset, line in enumerate(lines):
+        heading = _HEADING_RE.match(line) if line[:1] == "#" else None
+        if heading:
+            level, text = len(heading.group(1)), heading.group(2)
+            current = None
+            if level <= 3:
+                module = feature = category = ""
+                dictionary = "字典" in text
+                if level == 3 and text.endswith("模块") and not dictionary:
+                    module = text[:-2].strip()
+                    result["module_lines"].append((module, offset))
+            elif level == 4 and module:
+                category = ""
+                feature = text[:-2].strip() if text.endswith("功能") else ""
+                if feature:
+                    result["hierarchy"].append(((module, feature), offset))
+            elif level == 5:
+                match = _CATEGORY_RE.search(text)
+                category = match.group(1) if match else text
+            continue
+
+        if dictionary:
+            row = _TABLE_ROW_RE.match(line)
+            if row and not _TABLE_SEPARATOR_RE.match(line):
+                cells = [cell.strip() for cell in row.group(1).split("|")]
+                if len(cells) == 2 and cells[1] != "MODULE":
+                    result["modules"].append((cells[0], cells[1]))
+                elif len(cells) == 3 and cells[2] != "FEATURE":
+                    result["features"].append(((cells[0], cells[1]), cells[2]))
+            continue
+
+        match = _TP_RE.match(line)
+        if match:
+            current = {
+                "title": match.group(2),
+                "module": module,
+                "feature": feature,
+                "category": category,
+                "priority": "",
+                "focus": "",
+                "requirement": "",
+                "line": offset,
+            }
+            result["points"].append((match.group(1), current))
+            continue
+        if current is not None:
+            match = _TP_FIELD_RE.match(line)
+            if match:
+                current[_TP_FIELDS[match.group(1)]] = match.group(2)
+    result["length"] = len(lines)
+    return result
+
+
+class TestPointsParser:
+    """带段缓存的解析器：同一实例多次解析同一文档的不同版本时，只重新解析内容变化的段。
+
+    用法：
+        parser = TestPointsParser()
+        tps = parser.parse_file("specs/testpoints.md")
+        ... 编辑文档 ...
+        tps = parser.parse_file("specs/testpoints.md")   # parser.reparsed 为本次实际解析的段数
+    """
+
+    def __init__(self) -> None:
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self.reparsed = 0
+        self.reused = 0
+
+    def parse(self, text: str) -> TestPoints:
+        if text.startswith("\ufeff"):
+            text = text[1:]
+        cache: Dict[str, Dict[str, Any]] = {}
+        parsed = []
+        self.reparsed = self.reused = 0
+        for start, key in _split_sections(text.replace("\r\n", "\n")):
+            result = cache.get(key) or self._cache.get(key)
+            if result is None:
+                result = _parse_section(key)
+                self.reparsed += 1
+            else:
+                self.reused += 1
+            cache[key] = result
+            parsed.append((start, result))
+        self._cache = cache
+        return _assemble(parsed)
+
+    def parse_file(self, file_path: str) -> TestPoints:
+        with open(file_path, encoding="utf-8-sig") as f:
+            return self.parse(f.read())
+
+
+def _assemble(parsed: List[Tuple[int, Dict[str, Any]]]) -> TestPoints:
+    """合并各段解析结果，段内偏移换算为文档行号（段缓存共享，此处不修改段结果）。"""
+    tps = TestPoints()
+    for start, result in parsed:
+        tps.sections.append((start, start + result["length"] - 1, result["heading"]))
+        for name, abbr in result["modules"]:
+            tps.modules.setdefault(name, abbr)
+        for key, abbr in result["features"]:
+            tps.features.setdefault(key, abbr)
+        for name, offset in result["module_lines"]:
+            tps.module_lines.setdefault(name, start + offset)
+        for key, offset in result["hierarchy"]:
+            tps.hierarchy.setdefault(key, start + offset)
+        for tp_id, info in result["points"]:
+            point = dict(info, line=start + info["line"])
+            if tp_id in tps.points:
+                tps.duplicates.append((tp_id, point))
+            else:
+                tps.points[tp_id] = point
+    return tps
+
+
+def parse_testpoints(file_path: str) -> TestPoints:
+    """一次性解析 testpoints.md（不保留段缓存）。"""
+    return TestPointsParser().parse_file(file_path)
+
+
+def check_naming(tps: TestPoints) -> List[Dict[str, Any]]:
+    """按命名契约自检清单检查 testpoints.md 本身，返回 [{line, target, problem}]（按行号排序）。"""
+    issues: List[Dict[str, Any]] = []
+
+    def issue(line: int, target: str, problem: str) -> None:
+        issues.append({"line": line, "target": target, "problem": problem})
+
+    if not tps.modules and not tps.features:
+        issue(1, "命名字典", "缺少命名字典（模块字典 / 功能点字典）")
+    else:
+        for name, abbr in tps.modules.items():
+            if not MODULE_ABBR_RE.match(abbr):
+                issue(tps.module_lines.get(name, 1), name, f"MODULE「{abbr}」须为 2-5 位大写字母")
+        for (module, feature), abbr in tps.features.items():
+            if not FEATURE_ABBR_RE.match(abbr):
+                issue(tps.hierarchy.get((module, feature), 1), f"{module}_{feature}",
+                      f"FEATURE「{abbr}」须为 2-10 位大写字母")
+        for name, line in tps.module_lines.items():
+            if name not in tps.modules:
+                issue(line, name, f"模块「{name}」不在模块字典中")
+        for (module, feature), line in tps.hierarchy.items():
+            if (module, feature) not in tps.features:
+                issue(line, f"{module}_{feature}", f"功能点「{module}_{feature}」不在功能点字典中")
+
+    for tp_id, info in tps.points.items():
+        line = info["line"]
+        module, feature = info["module"], info["feature"]
+        if not module or not feature:
+            issue(line, tp_id, "测试点不在 ### {模块}模块 / #### {功能点}功能 标题层级下")
+            continue
+        match = NAME_RE.match(info["title"])
+        if not match:
+            issue(line, tp_id, "名称不符合 {模块}_{功能点}_{验证意图} 三段式")
+        elif match.group(1) != module or match.group(2) != feature:
+            issue(line, tp_id, f"名称前两段「{match.group(1)}_{match.group(2)}」与标题层级「{module}_{feature}」不一致")
+        _, module_abbr, feature_abbr, _ = tp_id.split("_")
+        expected = tps.modules.get(module)
+        if expected and expected != module_abbr:
+            issue(line, tp_id, f"TP_ID 模块缩写应为 {expected}")
+        expected = tps.features.get((module, feature))
+        if expected and expected != feature_abbr:
+            issue(line, tp_id, f"TP_ID 功能点缩写应为 {expected}")
+        if not info["priority"]:
+            issue(line, tp_id, "缺少优先级")
+
+    for tp_id, info in tps.duplicates:
+        issue(info["line"], tp_id, f"TP_ID 重复（首次出现于第 {tps.points[tp_id]['line']} 行）")
+
+    issues.sort(key=lambda item: item["line"])
+    return issues
+
+
+def main() -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Parse specs/testpoints.md into an indexed model")
+    parser.add_argument("--input", "-i", required=True, help="Path to specs/testpoints.md")
+    parser.add_argument("--output", "-o", help="Output index JSON path (default: stdout)")
+    parser.add_argument("--check", action="store_true",
+                        help="Only run the naming-contract self-check; exit 1 if any issue is found")
+    args = parser.parse_args()
+
+    try:
+        tps = parse_testpoints(args.input)
+    except FileNotFoundError:
+        logger.error("文件不存在: %s", args.input)
+        sys.exit(1)
+    issues = check_naming(tps)
+
+    if args.check:
+        for item in issues:
+            print(f"{args.input}:{item['line']}: {item['target']}: {item['problem']}")
+        if issues:
+            logger.error("命名契约自检未通过：%d 个问题", len(issues))
+            sys.exit(1)
+        print(f"命名契约自检通过：{len(tps.points)} 个测试点")
+        return
+
+    text = json.dumps(dict(tps.to_dict(), issues=issues), ensure_ascii=False, indent=2)
+    if not args.output:
+        print(text)
+        return
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"已生成：{args.output}（{len(tps.points)} 个测试点，{len(tps.hierarchy)} 个功能点，{len(issues)} 个命名问题）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+TestSpec 统一命令行入口：testspec.py <子命令> [参数]，每个子命令与直接运行对应脚本完全等价。
+
+用法：
+    python testspec.py --help
+    python testspec.py excel --input testcases.json --output cases.xlsx
+    python testspec.py export --input testcases.json --output-dir artifacts/ --name demo
+    python testspec.py <子命令> --help
+
+入口本身只导入 importlib、os 与 sys，子命令的模块及其依赖（写出器、解析器、numpy、sqlite3、进程池等）
+在该子命令被调用时才导入：`testspec.py excel` 不会加载 XMind、SQLite 等无关模块。
+流水线单次构建会调用这些命令数百次：测试检查各子命令不导入无关模块，
+启动耗时（STARTUP_BUDGET_MS）的检查受机器负载影响，需设置 TEST_STARTUP_TIMING=1 才运行；
+超出时用 `python -X importtime testspec.py <子命令> --help` 定位导入耗时。
+"""
+import importlib
+import os
+import sys
+
+# 子命令 → (模块名, 说明)；顺序即帮助中的显示顺序
+COMMANDS = {
+    "excel": ("generate_excel", "由 testcases.json 生成 Excel 用例"),
+    "xmind": ("generate_xmind", "由 testcases.json 生成 XMind 思维导图"),
+    "export": ("export_all", "只读取一次用例，同时导出 Excel 与 XMind"),
+    "watch": ("watch", "监视变更目录，保存后增量重新生成产物"),
+    "testpoints": ("testpoints", "解析 specs/testpoints.md 并做命名自检"),
+    "review": ("review_rules", "执行 R1-R6 评审规则检查"),
+    "dedup": ("dedup_cases", "检测近似重复用例"),
+    "subset": ("select_subset", "在时间预算内选出冒烟子集"),
+    "index": ("testspec_index", "跨变更 SQLite 索引与检索"),
+    "import-results": ("import_results", "回收 Excel 中回填的执行结果"),
+    "import-xmind": ("import_xmind", "将编辑后的 XMind 还原为 testcases.json"),
+    "serve": ("service", "本地生成服务（HTTP / Unix socket），按需返回 Excel / XMind"),
+}
+
+# 单次调用（解释器启动 + 导入子命令模块 + --help）的耗时上限（毫秒）
+STARTUP_BUDGET_MS = 250
+
+
+def _usage(prog: str) -> str:
+    width = max(len(name) for name in COMMANDS) + 2
+    lines = [f"usage: {prog} <command> [options]", "", "commands:"]
+    lines += [f"  {name:<{width}}{summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", f"使用 {prog} <command> --help 查看子命令参数"]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    prog = os.path.basename(sys.argv[0])
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print(_usage(prog))
+        return
+
+    command = sys.argv[1]
+    if command not in COMMANDS:
+        print(_usage(prog), file=sys.stderr)
+        print(f"\n{prog}: error: 未知子命令 '{command}'", file=sys.stderr)
+        sys.exit(2)
+
+    module = importlib.import_module(COMMANDS[command][0])
+    # 子命令沿用各自的 argparse 解析，prog 显示为「testspec.py excel」
+    sys.argv = [f"{prog} {command}"] + sys.argv[2:]
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
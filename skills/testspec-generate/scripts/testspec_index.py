@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+TestSpec 跨变更索引：将 testspec/changes/ 下全部变更（含 archive/）的测试点与测试用例写入本地 SQLite，
+供评审、生成步骤在毫秒级查询历史，无需重新扫描全部变更目录。
+
+索引内容：
+    testpoints: 每个变更 specs/testpoints.md 中的 TP（testpoints.py 解析）
+    testcases:  每个变更的 artifacts/testcases.json（不存在时取变更根目录下的 testcases.json）
+    case_refs:  用例 tp_refs → TP_ID
+    *_fts:      标题 / 步骤 / 预期结果 / 验证要点的 FTS5 全文索引（trigram 分词，中文可按子串检索）
+
+增量更新：每个文件记录大小、mtime 与内容摘要；大小与 mtime 未变直接跳过，
+变化时再比较摘要，只有内容变化的文件才删除旧记录并重新导入，已删除的文件同步移除。
+查询命令默认先做一次增量更新（无变化时只有 stat 开销），--no-update 跳过。
+
+SQLite 未编译 FTS5 或不支持 trigram 分词（< 3.34）时退化为 LIKE 检索；
+trigram 只能匹配不少于 3 个字符的词，更短的检索词同样使用 LIKE。
+
+用法：
+    python testspec_index.py update --root testspec
+    python testspec_index.py search "验证码 过期" --root testspec
+    python testspec_index.py cases --module 登录 --root testspec
+    python testspec_index.py cases --tp TP_LOGIN_CRED_001 --root testspec
+    python testspec_index.py duplicates --root testspec
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from build_cache import file_digest
+    from testpoints import NAME_RE, parse_testpoints
+    from utils import configure_logging, iter_testcases
+except ImportError:
+    from .build_cache import file_digest
+    from .testpoints import NAME_RE, parse_testpoints
+    from .utils import configure_logging, iter_testcases
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_DB_NAME = ".testspec-index.db"
+DEFAULT_LIMIT = 50
+
+# 每个变更中被索引的文件：(类型, 候选相对路径)，取第一个存在的
+INDEXED_FILES = (
+    ("testpoints", ("specs/testpoints.md",)),
+    ("testcases", ("artifacts/testcases.json", "testcases.json")),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    change TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS testpoints (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    change TEXT NOT NULL,
+    tp_id TEXT NOT NULL,
+    module TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    title TEXT NOT NULL,
+    focus TEXT NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS testpoints_path ON testpoints (path);
+CREATE INDEX IF NOT EXISTS testpoints_tp_id ON testpoints (tp_id);
+CREATE INDEX IF NOT EXISTS testpoints_module ON testpoints (module, feature);
+CREATE TABLE IF NOT EXISTS testcases (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    change TEXT NOT NULL,
+    case_no INTEGER NOT NULL,
+    case_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    module TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    type TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    steps TEXT NOT NULL,
+    expected_result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS testcases_path ON testcases (path);
+CREATE INDEX IF NOT EXISTS testcases_case_id ON testcases (case_id);
+CREATE INDEX IF NOT EXISTS testcases_module ON testcases (module, feature);
+CREATE TABLE IF NOT EXISTS case_refs (
+    case_rowid INTEGER NOT NULL REFERENCES testcases (id) ON DELETE CASCADE,
+    tp_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS case_refs_tp_id ON case_refs (tp_id);
+CREATE INDEX IF NOT EXISTS case_refs_case ON case_refs (case_rowid);
+"""
+
+# 外部内容 FTS 表：删除由触发器同步；导入时每个文件导入完成后整批写入（比逐行触发器快约 4 倍），见 _index_text
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS testcases_fts USING fts5(
+    title, steps, expected_result, content='testcases', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS testcases_fts_delete AFTER DELETE ON testcases BEGIN
+    INSERT INTO testcases_fts (testcases_fts, rowid, title, steps, expected_result)
+    VALUES ('delete', old.id, old.title, old.steps, old.expected_result);
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS testpoints_fts USING fts5(
+    title, focus, content='testpoints', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS testpoints_fts_delete AFTER DELETE ON testpoints BEGIN
+    INSERT INTO testpoints_fts (testpoints_fts, rowid, title, focus) VALUES ('delete', old.id, old.title, old.focus);
+END;
+"""
+
+# 检索范围：表、FTS 表、全文索引的列（LIKE 退化时同样检索这些列）、输出列
+_SEARCH_TARGETS = {
+    "cases": ("testcases", "testcases_fts", ("title", "steps", "expected_result"),
+              "change, case_id, title, module, feature, type, priority, path, case_no"),
+    "points": ("testpoints", "testpoints_fts", ("title", "focus"),
+               "change, tp_id, title, module, feature, category, priority, path, line"),
+}
+
+_MIN_TRIGRAM_LENGTH = 3
+
+# 导入用例时每批写入的行数
+_BATCH_ROWS = 1000
+
+
+def _fts_supported(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts_probe USING fts5(x, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp._fts_probe")
+    return True
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """打开（必要时创建）索引库；schema 版本不一致时删除后重建（索引可随时从变更目录重新生成）。"""
+    conn = _open(db_path)
+    has_tables = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] > 0
+    if has_tables:
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        if row is None or row["value"] != str(SCHEMA_VERSION):
+            conn.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            conn = _open(db_path)
+    conn.executescript(_SCHEMA)
+    fts = _fts_supported(conn)
+    if fts:
+        conn.executescript(_FTS_SCHEMA)
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('fts', ?)", ("1" if fts else "0",))
+    conn.commit()
+    return conn
+
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'fts'").fetchone()
+    return bool(row) and row["value"] == "1"
+
+
+def discover(root: str) -> Iterator[Tuple[str, str, str]]:
+    """遍历 root/changes 下的变更（含 archive/ 下的归档变更），产出 (变更名, 类型, 文件路径)。"""
+    changes_dir = os.path.join(root, "changes")
+    for parent, prefix in ((changes_dir, ""), (os.path.join(changes_dir, "archive"), "archive/")):
+        try:
+            names = sorted(os.listdir(parent))
+        except FileNotFoundError:
+            continue
+        for name in names:
+            change_dir = os.path.join(parent, name)
+            if (not prefix and name == "archive") or not os.path.isdir(change_dir):
+                continue
+            for kind, candidates in INDEXED_FILES:
+                for rel in candidates:
+                    path = os.path.join(change_dir, *rel.split("/"))
+                    if os.path.isfile(path):
+                        yield prefix + name, kind, path
+                        break
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else str(value).strip()
+
+
+def _ingest_testpoints(conn: sqlite3.Connection, change: str, rel: str, path: str) -> int:
+    tps = parse_testpoints(path)
+    conn.executemany(
+        "INSERT INTO testpoints (path, change, tp_id, module, feature, category, priority, title, focus, line) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(rel, change, tp_id, info["module"], info["feature"], info["category"], info["priority"],
+          info["title"], info["focus"], info["line"]) for tp_id, info in tps.points.items()]
+        + [(rel, change, tp_id, info["module"], info["feature"], info["category"], info["priority"],
+            info["title"], info["focus"], info["line"]) for tp_id, info in tps.duplicates],
+    )
+    return len(tps.points) + len(tps.duplicates)
+
+
+def _ingest_testcases(conn: sqlite3.Connection, change: str, rel: str, path: str) -> int:
+    # 预先分配行号，用例与 tp_refs 均可批量插入；用例流式读取，每批写入后释放
+    next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM testcases").fetchone()[0]
+    rows: List[Tuple[Any, ...]] = []
+    refs: List[Tuple[int, str]] = []
+    count = 0
+
+    def flush() -> None:
+        conn.executemany(
+            "INSERT INTO testcases (id, path, change, case_no, case_id, title, module, feature, type, priority, "
+            "steps, expected_result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO case_refs (case_rowid, tp_id) VALUES (?, ?)", refs)
+        rows.clear()
+        refs.clear()
+
+    for count, tc in enumerate(iter_testcases(path), 1):
+        if not isinstance(tc, dict):
+            tc = {}
+        title = _text(tc.get("title"))
+        match = NAME_RE.match(title)
+        rows.append((next_id, rel, change, count, _text(tc.get("id")), title,
+                     _text(tc.get("feature")) or (match.group(1) if match else ""),
+                     match.group(2) if match else "",
+                     _text(tc.get("type")), _text(tc.get("priority")),
+                     _text(tc.get("steps")), _text(tc.get("expected_result"))))
+        tp_refs = tc.get("tp_refs")
+        if isinstance(tp_refs, list):
+            refs.extend((next_id, _text(ref)) for ref in tp_refs if _text(ref))
+        next_id += 1
+        if len(rows) >= _BATCH_ROWS:
+            flush()
+    flush()
+    return count
+
+
+_INGESTERS = {
+    "testpoints": _ingest_testpoints,
+    "testcases": _ingest_testcases,
+}
+
+
+def _index_text(conn: sqlite3.Connection, rel: str) -> None:
+    """将刚导入的文件的记录整批写入 FTS 索引。"""
+    for table, fts_table, columns, _ in _SEARCH_TARGETS.values():
+        conn.execute(f"INSERT INTO {fts_table} (rowid, {', '.join(columns)}) "
+                     f"SELECT id, {', '.join(columns)} FROM {table} WHERE path = ?", (rel,))
+
+
+def _remove_file(conn: sqlite3.Connection, rel: str) -> None:
+    conn.execute("DELETE FROM testpoints WHERE path = ?", (rel,))
+    conn.execute("DELETE FROM testcases WHERE path = ?", (rel,))
+    conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+
+
+def update_index(conn: sqlite3.Connection, root: str) -> Dict[str, int]:
+    """增量更新索引，返回 {updated, unchanged, removed, failed}。"""
+    stats = {"updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    recorded = {row["path"]: row for row in conn.execute("SELECT * FROM files")}
+    fts = _has_fts(conn)
+    seen = set()
+    with conn:
+        for change, kind, path in discover(root):
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            seen.add(rel)
+            st = os.stat(path)
+            old = recorded.get(rel)
+            if old is not None and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                stats["unchanged"] += 1
+                continue
+            digest = file_digest(path)
+            if old is not None and old["digest"] == digest and old["kind"] == kind:
+                # 内容未变（如重新检出）：只刷新 stat，下次无需再计算摘要
+                conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                             (st.st_size, st.st_mtime_ns, rel))
+                stats["unchanged"] += 1
+                continue
+            _remove_file(conn, rel)
+            # 导入中途失败时回滚到保存点；已写入的批次尚未进入 FTS 索引，
+            # 不能用 DELETE 撤销（删除触发器会为未索引的行向 FTS 发送 'delete'，损坏索引）
+            conn.execute("SAVEPOINT ingest_file")
+            try:
+                _INGESTERS[kind](conn, change, rel, path)
+            except (SystemExit, UnicodeDecodeError, OSError) as e:
+                # JSON 无效时读取函数已记录具体错误；跳过该文件，不中断其他变更的索引
+                conn.execute("ROLLBACK TO ingest_file")
+                conn.execute("RELEASE ingest_file")
+                logger.warning("跳过无法解析的文件：%s%s", path, "" if isinstance(e, SystemExit) else f"（{e}）")
+                stats["failed"] += 1
+                continue
+            conn.execute("RELEASE ingest_file")
+            if fts:
+                _index_text(conn, rel)
+            conn.execute("INSERT INTO files (path, change, kind, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                         (rel, change, kind, st.st_size, st.st_mtime_ns, digest))
+            stats["updated"] += 1
+        for rel in recorded.keys() - seen:
+            _remove_file(conn, rel)
+            stats["removed"] += 1
+    return stats
+
+
+def _like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def search(conn: sqlite3.Connection, query: str, target: str = "cases", change: Optional[str] = None,
+           limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """全文检索用例或测试点；空格分隔的多个词需同时命中。FTS 可用时按相关度排序。"""
+    table, fts_table, columns, output = _SEARCH_TARGETS[target]
+    terms = query.split()
+    if not terms:
+        return []
+    params: List[Any] = []
+    if _has_fts(conn) and all(len(term) >= _MIN_TRIGRAM_LENGTH for term in terms):
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        sql = (f"SELECT {', '.join('t.' + c.strip() for c in output.split(','))} FROM {fts_table} f "
+               f"JOIN {table} t ON t.id = f.rowid WHERE {fts_table} MATCH ?")
+        params.append(match)
+        order = " ORDER BY f.rank"
+    else:
+        clauses = []
+        for term in terms:
+            clauses.append("(" + " OR ".join(f"t.{c} LIKE ? ESCAPE '\\'" for c in columns) + ")")
+            params.extend([_like_pattern(term)] * len(columns))
+        sql = (f"SELECT {', '.join('t.' + c.strip() for c in output.split(','))} FROM {table} t "
+               f"WHERE {' AND '.join(clauses)}")
+        order = " ORDER BY t.change, t.id"
+    if change:
+        sql += " AND t.change = ?"
+        params.append(change)
+    params.append(limit)
+    return [dict(row) for row in conn.execute(sql + order + " LIMIT ?", params)]
+
+
+def find_cases(conn: sqlite3.Connection, module: Optional[str] = None, feature: Optional[str] = None,
+               tp_id: Optional[str] = None, change: Optional[str] = None,
+               limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """按模块 / 功能点 / 引用的 TP_ID / 变更筛选用例。"""
+    sql = ("SELECT t.change, t.case_id, t.title, t.module, t.feature, t.type, t.priority, t.path, t.case_no "
+           "FROM testcases t")
+    clauses, params = [], []
+    if tp_id:
+        sql += " JOIN case_refs r ON r.case_rowid = t.id"
+        clauses.append("r.tp_id = ?")
+        params.append(tp_id)
+    for column, value in (("module", module), ("feature", feature), ("change", change)):
+        if value:
+            clauses.append(f"t.{column} = ?")
+            params.append(value)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    params.append(limit)
+    return [dict(row) for row in conn.execute(sql + " ORDER BY t.change, t.id LIMIT ?", params)]
+
+
+def find_points(conn: sqlite3.Connection, module: Optional[str] = None, feature: Optional[str] = None,
+                tp_id: Optional[str] = None, change: Optional[str] = None,
+                limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """按模块 / 功能点 / TP_ID / 变更筛选测试点，附带各变更中引用该 TP_ID 的用例数。"""
+    sql = ("SELECT p.change, p.tp_id, p.title, p.module, p.feature, p.category, p.priority, p.path, p.line, "
+           "(SELECT COUNT(*) FROM case_refs r JOIN testcases t ON t.id = r.case_rowid "
+           " WHERE r.tp_id = p.tp_id AND t.change = p.change) AS cases "
+           "FROM testpoints p WHERE 1")
+    params: List[Any] = []
+    for column, value in (("module", module), ("feature", feature), ("tp_id", tp_id), ("change", change)):
+        if value:
+            sql += f" AND p.{column} = ?"
+            params.append(value)
+    params.append(limit)
+    return [dict(row) for row in conn.execute(sql + " ORDER BY p.change, p.id LIMIT ?", params)]
+
+
+def find_duplicates(conn: sqlite3.Connection) -> Dict[str, List[Dict[str, Any]]]:
+    """同一 TP_ID 出现多次（跨变更或同一文件内重复），以及同一用例 ID 出现在多处。"""
+    result: Dict[str, List[Dict[str, Any]]] = {"tp_ids": [], "case_ids": []}
+    rows = conn.execute(
+        "SELECT tp_id, change, title, path, line FROM testpoints WHERE tp_id IN "
+        "(SELECT tp_id FROM testpoints GROUP BY tp_id HAVING COUNT(*) > 1) ORDER BY tp_id, change, line")
+    for row in rows:
+        if not result["tp_ids"] or result["tp_ids"][-1]["tp_id"] != row["tp_id"]:
+            result["tp_ids"].append({"tp_id": row["tp_id"], "occurrences": []})
+        result["tp_ids"][-1]["occurrences"].append(
+            {"change": row["change"], "title": row["title"], "path": row["path"], "line": row["line"]})
+    rows = conn.execute(
+        "SELECT case_id, change, title, path, case_no FROM testcases WHERE case_id != '' AND case_id IN "
+        "(SELECT case_id FROM testcases WHERE case_id != '' GROUP BY case_id HAVING COUNT(*) > 1) "
+        "ORDER BY case_id, change, case_no")
+    for row in rows:
+        if not result["case_ids"] or result["case_ids"][-1]["case_id"] != row["case_id"]:
+            result["case_ids"].append({"case_id": row["case_id"], "occurrences": []})
+        result["case_ids"][-1]["occurrences"].append(
+            {"change": row["change"], "title": row["title"], "path": row["path"], "index": row["case_no"]})
+    return result
+
+
+def main() -> None:
+    configure_logging()
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--root", default="testspec", help="TestSpec root containing changes/ (default: testspec)")
+    common.add_argument("--db", help=f"Index database path (default: <root>/{DEFAULT_DB_NAME})")
+    refresh = argparse.ArgumentParser(add_help=False, parents=[common])
+    refresh.add_argument("--no-update", action="store_true", help="Query the index as is, without refreshing it")
+    query = argparse.ArgumentParser(add_help=False, parents=[refresh])
+    query.add_argument("--change", help="Only this change (e.g. 2026-login or archive/2025-login)")
+    query.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help=f"Maximum rows (default: {DEFAULT_LIMIT})")
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--module", help="Module name ({模块})")
+    filters.add_argument("--feature", help="Feature name ({功能点})")
+    filters.add_argument("--tp", help="TP_ID")
+
+    parser = argparse.ArgumentParser(description="Cross-change SQLite index of test points and test cases")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("update", parents=[common], help="Incrementally update the index")
+    search_parser = commands.add_parser("search", parents=[query], help="Full-text search")
+    search_parser.add_argument("text", help="Search terms (space separated, all must match)")
+    search_parser.add_argument("--points", action="store_true", help="Search test points instead of test cases")
+    commands.add_parser("cases", parents=[query, filters], help="List test cases by module/feature/TP_ID")
+    commands.add_parser("points", parents=[query, filters], help="List test points with covering case counts")
+    commands.add_parser("duplicates", parents=[refresh], help="TP_IDs and case IDs that occur more than once")
+    args = parser.parse_args()
+
+    if not os.path.isdir(os.path.join(args.root, "changes")):
+        logger.error("未找到变更目录：%s", os.path.join(args.root, "changes"))
+        sys.exit(1)
+    conn = connect(args.db or os.path.join(args.root, DEFAULT_DB_NAME))
+
+    start = time.perf_counter()
+    if args.command == "update" or not args.no_update:
+        stats = update_index(conn, args.root)
+        if args.command == "update":
+            print(f"索引已更新：{stats['updated']} 个文件重新导入，{stats['unchanged']} 个未变化，"
+                  f"{stats['removed']} 个已移除，{stats['failed']} 个无法解析（{time.perf_counter() - start:.2f}s）")
+            return
+
+    if args.command == "search":
+        result: Any = search(conn, args.text, "points" if args.points else "cases", args.change, args.limit)
+    elif args.command == "cases":
+        result = find_cases(conn, args.module, args.feature, args.tp, args.change, args.limit)
+    elif args.command == "points":
+        result = find_points(conn, args.module, args.feature, args.tp, args.change, args.limit)
+    else:
+        result = find_duplicates(conn)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
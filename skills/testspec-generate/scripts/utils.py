@@ -2,13 +2,23 @@
 """
 TestSpec 共享工具函数模块。
 """
+import itertools
 import json
 import logging
 import sys
-from typing import Union
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Union
 
 logger = logging.getLogger(__name__)
 
+# 增量读取时每次读入的字符数
+_CHUNK_SIZE = 1 << 16
+
+# 距缓冲区末尾不足该字符数的解码结果或错误可能是块边界截断所致（最长为 \uXXXX\uXXXX 代理对）
+_TRUNCATION_MARGIN = 16
+
+# 按行分隔的 JSON（每行一个用例）
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
 
 def configure_logging() -> None:
     """配置日志输出格式（用于独立脚本执行）。"""
@@ -54,8 +64,186 @@ def load_json_file(file_path: str) -> Union[list, dict]:
         logger.error("文件不存在: %s", file_path)
         sys.exit(1)
     except json.JSONDecodeError as e:
-        logger.error("%s JSON 格式无效（行 %s 列 %s）。", file_path, e.lineno, e.colno)
-        logger.error("常见原因：字符串值中包含未转义的双引号。请检查并将 \" 转义为 \\\" 或使用「」替代。")
+        _log_json_error(file_path, e)
+        sys.exit(1)
+
+
+def _log_json_error(file_path: str, e: json.JSONDecodeError) -> None:
+    logger.error("%s JSON 格式无效（行 %s 列 %s）。", file_path, e.lineno, e.colno)
+    logger.error("常见原因：字符串值中包含未转义的双引号。请检查并将 \" 转义为 \\\" 或使用「」替代。")
+
+
+class _JsonStream:
+    """在按块读取的文本上逐个解码 JSON 值，并记录已丢弃文本的行列号，报错位置与 json.load 一致。"""
+
+    def __init__(self, f: TextIO) -> None:
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        # buf[0] 在文件中的行号与列号（从 1 开始）
+        self.line = 1
+        self.col = 1
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """丢弃已消费的文本并读入下一块，文件结束时返回 False。"""
+        if self.eof:
+            return False
+        chunk = self.f.read(_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        consumed = self.buf[:self.pos]
+        newlines = consumed.count("\n")
+        if newlines:
+            self.line += newlines
+            self.col = len(consumed) - consumed.rfind("\n")
+        else:
+            self.col += len(consumed)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符，文件结束时返回空字符串。"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """解码下一个完整的 JSON 值。"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # 只有错误位于缓冲区末尾（值被块边界截断）时才读入更多内容重试；
+                # 位置靠前的是真实的语法错误，直接报告，不把剩余文件读入缓冲区
+                if self._truncated(e) and self._fill():
+                    continue
+                raise self.error(e.msg, e.pos) from None
+            # 数字在块尾时可能被截断（如 12|3、1.|5），同样需要读入更多内容
+            if end >= len(self.buf) - _TRUNCATION_MARGIN and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def _truncated(self, e: json.JSONDecodeError) -> bool:
+        """解码错误是否可能只因输入在缓冲区末尾被截断。"""
+        # 未闭合的字符串报告的是起始位置，但它一直延伸到缓冲区末尾
+        return e.pos >= len(self.buf) - _TRUNCATION_MARGIN or e.msg.startswith("Unterminated string")
+
+    def error(self, msg: str, pos: int = -1) -> json.JSONDecodeError:
+        pos = self.pos if pos < 0 else pos
+        err = json.JSONDecodeError(msg, self.buf, pos)
+        before = self.buf[:pos]
+        newlines = before.count("\n")
+        err.lineno = self.line + newlines
+        err.colno = pos - before.rfind("\n") if newlines else self.col + pos
+        return err
+
+
+def _iter_json_array(stream: _JsonStream) -> Iterator[Any]:
+    stream.expect("[")
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        yield stream.value()
+        char = stream.peek()
+        stream.pos += 1
+        if char == "]":
+            return
+        if char != ",":
+            stream.pos -= 1
+            raise stream.error("Expecting ',' delimiter")
+
+
+def _iter_json_testcases(stream: _JsonStream, meta: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """逐个产出 v1（顶层数组）或 v2（testcases 字段）中的用例，其余字段解码后存入 meta（未传入则丢弃）。"""
+    first = stream.peek()
+    if first == "[":
+        yield from _iter_json_array(stream)
+    elif first == "{":
+        stream.pos += 1
+        if stream.peek() == "}":
+            stream.pos += 1
+        else:
+            while True:
+                if stream.peek() != '"':
+                    raise stream.error("Expecting property name enclosed in double quotes")
+                key = stream.value()
+                stream.expect(":")
+                if key == "testcases" and stream.peek() == "[":
+                    yield from _iter_json_array(stream)
+                elif meta is not None:
+                    meta[key] = stream.value()
+                else:
+                    stream.value()
+                char = stream.peek()
+                stream.pos += 1
+                if char == "}":
+                    break
+                if char != ",":
+                    stream.pos -= 1
+                    raise stream.error("Expecting ',' delimiter")
+    else:
+        stream.value()
+    if stream.peek():
+        raise stream.error("Extra data")
+
+
+def _iter_ndjson(f: TextIO) -> Iterator[Any]:
+    for lineno, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            err = json.JSONDecodeError(e.msg, e.doc, e.pos)
+            err.lineno = lineno
+            raise err from None
+
+
+def iter_testcases(file_path: str, meta: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """增量读取 testcases.json，逐条产出测试用例。
+
+    支持 v1 格式（顶层数组）、v2 格式（包含 testcases 键的对象）以及
+    .ndjson/.jsonl（每行一个用例），内存占用与用例数量无关。
+    格式不受支持时不产出任何用例（与 extract_testcases 返回空列表一致）。
+
+    Args:
+        file_path: testcases.json 文件路径
+        meta: 可选字典，v2 格式中 testcases 以外的顶层字段（如 schema_version）解析到时写入其中；
+            字段可能位于 testcases 之后，迭代结束后才完整
+
+    Yields:
+        测试用例字典
+
+    Raises:
+        SystemExit: 文件不存在或 JSON 格式无效时退出（报错行列与 load_json_file 一致）
+    """
+    try:
+        with open(file_path, encoding="utf-8-sig") as f:
+            if file_path.lower().endswith(NDJSON_SUFFIXES):
+                yield from _iter_ndjson(f)
+            else:
+                yield from _iter_json_testcases(_JsonStream(f), meta)
+    except FileNotFoundError:
+        logger.error("文件不存在: %s", file_path)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        _log_json_error(file_path, e)
         sys.exit(1)
 
 
@@ -77,3 +265,51 @@ def load_and_validate_testcases(file_path: str) -> list:
         logger.error("JSON 格式不正确：应为用例数组或包含 testcases 字段的对象")
         sys.exit(1)
     return test_cases
+
+
+def iter_and_validate_testcases(file_path: str, meta: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """增量版的 load_and_validate_testcases，用于流式导出。
+
+    调用时即读取第一条用例，以便在写出任何文件之前发现文件缺失、格式错误或用例为空；
+    之后的用例在迭代时逐条读取。
+
+    Args:
+        file_path: testcases.json（或 .ndjson/.jsonl）文件路径
+        meta: 可选字典，收集 testcases 以外的顶层字段（见 iter_testcases）
+
+    Returns:
+        测试用例迭代器
+
+    Raises:
+        SystemExit: 文件无效或未找到测试用例时退出
+    """
+    test_cases = iter_testcases(file_path, meta)
+    first = next(test_cases, None)
+    if first is None:
+        logger.error("JSON 格式不正确：应为用例数组或包含 testcases 字段的对象")
+        sys.exit(1)
+    return itertools.chain([first], test_cases)
+
+
+def write_testcases(file_path: str, test_cases: Iterable[Any], schema_version: Any = None) -> int:
+    """流式写出 testcases.json，每行一条用例，返回写出的用例数。
+
+    Args:
+        file_path: 输出文件路径
+        test_cases: 测试用例（可迭代，逐条写出）
+        schema_version: 沿用输入的 schema_version；为 None 时写出 v1 格式（顶层数组），
+            避免把没有 tp_refs 的用例标记为 v2（评审会据此判定为 Strict 模式）
+    """
+    if schema_version is None:
+        head, indent, tail, empty_tail = "[", "\n  ", "\n]\n", "]\n"
+    else:
+        head = '{\n  "schema_version": ' + json.dumps(schema_version) + ',\n  "testcases": ['
+        indent, tail, empty_tail = "\n    ", "\n  ]\n}\n", "]\n}\n"
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(head)
+        for tc in test_cases:
+            f.write(("," if count else "") + indent + json.dumps(tc, ensure_ascii=False))
+            count += 1
+        f.write(tail if count else empty_tail)
+    return count
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+TestSpec 监视模式：常驻进程轮询变更目录，testcases.json / testpoints.md 保存后增量重新生成产物。
+
+逐次手动运行 generate_excel.py / generate_xmind.py 时，每次都要启动解释器、导入模块并全量生成；
+监视模式下模块与上一版解析结果常驻内存，文件变化后只处理受影响的部分：
+    testcases.json → 各产物分别计算「可见内容」摘要（Excel 的行、XMind 的层级结构），只重写摘要变化的产物，
+                     如只改 tp_refs 时两者都不重写；--split-by feature 时每个功能模块一个 sheet，
+                     只重新渲染内容变化的 sheet，其余沿用上次渲染的片段
+    testpoints.md  → 段缓存解析器（testpoints.TestPointsParser）只重新解析变化的章节，并输出命名自检结果
+
+变化检测按 (大小, mtime) 轮询（--interval，默认 0.2s），只有 stat 开销，不依赖 inotify 等平台接口。
+产物写出后同步更新构建缓存清单（build_cache.py），之后单独运行生成脚本时不会重复生成。
+testcases.json 保存到一半或格式错误时只输出错误，等待下一次保存。
+
+目录约定（见 testspec-shared/common.md）：
+    <变更目录>/specs/testpoints.md
+    <变更目录>/artifacts/testcases.json（也接受 <变更目录>/testcases.json）
+    <变更目录>/artifacts/<name>_cases.xlsx / <name>_cases.xmind
+
+用法：
+    python watch.py --change testspec/changes/<name>
+    python watch.py --change testspec/changes/<name> --formats xmind --split-by feature --reproducible
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO, Tuple
+
+try:
+    from build_cache import BuildCache
+    from export_all import WRITERS, cache_options
+    from generate_excel import ENGINES, _row_values
+    from generate_xmind import (DEFAULT_MAX_TOPICS, FORMATS, SHEET_WRITERS, _stable_topic_id, _topic_id,
+                                _write_package, build_xmind_structure, shard_structure)
+    from testpoints import TestPointsParser, check_naming
+    from utils import configure_logging, load_and_validate_testcases
+except ImportError:
+    from .build_cache import BuildCache
+    from .export_all import WRITERS, cache_options
+    from .generate_excel import ENGINES, _row_values
+    from .generate_xmind import (DEFAULT_MAX_TOPICS, FORMATS, SHEET_WRITERS, _stable_topic_id, _topic_id,
+                                 _write_package, build_xmind_structure, shard_structure)
+    from .testpoints import TestPointsParser, check_naming
+    from .utils import configure_logging, load_and_validate_testcases
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.2
+# 每次 testpoints.md 变化时最多列出的命名问题条数
+MAX_REPORTED_ISSUES = 10
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _digest(value: Any) -> str:
+    data = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ChangeWatcher:
+    """
+    单个变更目录的增量构建状态。check() 比较输入文件的 (大小, mtime)，处理有变化的输入并返回输出信息；
+    首次调用时处理全部存在的输入（产物已是最新时只记录摘要，不重写）。
+    """
+
+    def __init__(
+        self,
+        change_dir: str,
+        name: Optional[str] = None,
+        formats: Sequence[str] = tuple(WRITERS),
+        options: Optional[Dict[str, Any]] = None,
+        split_by: Optional[str] = None,
+        max_topics: int = DEFAULT_MAX_TOPICS,
+    ) -> None:
+        self.change_dir = change_dir
+        name = name or os.path.basename(os.path.normpath(os.path.abspath(change_dir)))
+        artifacts = os.path.join(change_dir, "artifacts")
+        testcases = os.path.join(artifacts, "testcases.json")
+        if not os.path.exists(testcases) and os.path.exists(os.path.join(change_dir, "testcases.json")):
+            testcases = os.path.join(change_dir, "testcases.json")
+        self.testcases_path = testcases
+        self.testpoints_path = os.path.join(change_dir, "specs", "testpoints.md")
+        self.outputs = {fmt: os.path.join(artifacts, f"{name}_cases.{fmt}") for fmt in formats}
+        self.options = {"engine": "builtin", "title": "测试用例", "xmind_format": "xmind8", "reproducible": False}
+        self.options.update(options or {})
+        self.split_by = split_by
+        self.max_topics = max_topics
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._views: Dict[str, str] = {}
+        # 分片摘要 -> 已渲染的 sheet 片段（只保留最近一次用到的分片）
+        self._sheets: Dict[str, str] = {}
+        self._points_parser = TestPointsParser()
+        self.rendered_sheets = 0
+
+    def check(self) -> List[str]:
+        messages: List[str] = []
+        handlers: List[Tuple[str, Callable[[], List[str]]]] = [
+            (self.testcases_path, self._build_testcases),
+            (self.testpoints_path, self._check_testpoints),
+        ]
+        for path, handler in handlers:
+            stamp = _stamp(path)
+            if path in self._stamps and stamp == self._stamps[path]:
+                continue
+            self._stamps[path] = stamp
+            if stamp is None:
+                messages.append(f"{path} 不存在，等待创建")
+                continue
+            messages.extend(handler())
+        return messages
+
+    def _cache(self, fmt: str, output: str) -> BuildCache:
+        options = cache_options(fmt, self.options)
+        if fmt == "xmind" and self.split_by:
+            # 与 generate_xmind.py --split-by ... 记录的选项一致
+            options.update(split_by=self.split_by, max_topics=self.max_topics, split_output="sheets")
+        return BuildCache(output, [self.testcases_path], options)
+
+    def _build_testcases(self) -> List[str]:
+        start = time.perf_counter()
+        try:
+            test_cases = load_and_validate_testcases(self.testcases_path)
+        except SystemExit:
+            return [f"{self.testcases_path} 无效（见上方错误），等待下次保存"]
+        messages = []
+        for fmt, output in self.outputs.items():
+            prepare = getattr(self, f"_prepare_{fmt}")
+            view, write = prepare(test_cases)
+            digest = _digest(view)
+            cache = self._cache(fmt, output)
+            first = fmt not in self._views
+            if digest == self._views.get(fmt) or (first and cache.is_fresh()):
+                # 产物内容不受影响：只更新清单中的输入摘要
+                self._views[fmt] = digest
+                cache.record()
+                messages.append(f"未受影响，跳过：{output}")
+                continue
+            os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+            detail = write(output)
+            self._views[fmt] = digest
+            cache.record()
+            messages.append(f"已生成：{output}（{detail}{(time.perf_counter() - start) * 1000:.0f}ms）")
+            start = time.perf_counter()
+        return messages
+
+    def _prepare_xlsx(self, test_cases: Sequence[dict]) -> Tuple[Any, Callable[[str], str]]:
+        rows = [_row_values(tc, index) for index, tc in enumerate(test_cases, 1)]
+
+        def write(output: str) -> str:
+            ENGINES[self.options["engine"]](test_cases, output)
+            return f"{len(rows)} 行，"
+
+        return [self.options["engine"], rows], write
+
+    def _prepare_xmind(self, test_cases: Sequence[dict]) -> Tuple[Any, Callable[[str], str]]:
+        title = self.options["title"]
+        fmt = self.options["xmind_format"]
+        reproducible = self.options["reproducible"]
+        structure = build_xmind_structure(test_cases, title)
+        view = [fmt, reproducible, self.split_by, self.max_topics, structure]
+        if not self.split_by:
+            def write_whole(output: str) -> str:
+                FORMATS[fmt](structure, output, title, sheet_title=title, reproducible=reproducible)
+                self.rendered_sheets = 1
+                return ""
+
+            return view, write_whole
+
+        def write_sheets(output: str) -> str:
+            shards = shard_structure(structure, title, self.split_by, self.max_topics)
+            fragments = []
+            sheets: Dict[str, str] = {}
+            self.rendered_sheets = 0
+            for sheet_title, shard in shards:
+                key = _digest([fmt, reproducible, title, sheet_title, shard])
+                fragment = self._sheets.get(key)
+                if fragment is None:
+                    buf = io.StringIO()
+                    SHEET_WRITERS[fmt](buf, shard, title, sheet_title,
+                                       _stable_topic_id if reproducible else _topic_id)
+                    fragment = buf.getvalue()
+                    self.rendered_sheets += 1
+                sheets[key] = fragment
+                fragments.append(fragment)
+            self._sheets = sheets
+
+            def write_package(out: TextIO, separator: str) -> None:
+                out.write(separator.join(fragments))
+
+            _write_package(output, fmt, reproducible, write_package)
+            return f"重新渲染 {self.rendered_sheets}/{len(shards)} 个 sheet，"
+
+        return view, write_sheets
+
+    def _check_testpoints(self) -> List[str]:
+        try:
+            tps = self._points_parser.parse_file(self.testpoints_path)
+        except (OSError, UnicodeDecodeError) as e:
+            return [f"无法读取 {self.testpoints_path}：{e}"]
+        issues = check_naming(tps)
+        parser = self._points_parser
+        messages = [f"{self.testpoints_path}：{len(tps.points)} 个测试点（重新解析 {parser.reparsed} 个章节，"
+                    f"复用 {parser.reused} 个），命名问题 {len(issues)} 个"]
+        for item in issues[:MAX_REPORTED_ISSUES]:
+            messages.append(f"  第 {item['line']} 行 {item['target']}：{item['problem']}")
+        if len(issues) > MAX_REPORTED_ISSUES:
+            messages.append(f"  ……其余 {len(issues) - MAX_REPORTED_ISSUES} 个见 testpoints.py --check")
+        return messages
+
+
+def main() -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Watch a change directory and regenerate artifacts incrementally")
+    parser.add_argument("--change", "-c", required=True, help="Change directory, e.g. testspec/changes/<name>")
+    parser.add_argument("--name", help="Artifact name prefix (default: change directory name)")
+    parser.add_argument("--formats", default=",".join(WRITERS),
+                        help=f"Comma-separated artifacts to keep up to date (default: {','.join(WRITERS)})")
+    parser.add_argument("--title", "-t", default="测试用例", help="XMind root topic / sheet title")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="builtin", help="XLSX writer")
+    parser.add_argument("--xmind-format", choices=sorted(FORMATS), default="xmind8", help="XMind format")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="Content-derived XMind topic IDs and fixed timestamps")
+    parser.add_argument("--split-by", choices=["feature", "size"],
+                        help="Split the XMind map into sheets; only sheets whose content changed are re-rendered")
+    parser.add_argument("--max-topics", type=int, default=DEFAULT_MAX_TOPICS,
+                        help=f"Topic limit per sheet for --split-by size (default: {DEFAULT_MAX_TOPICS})")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"Polling interval in seconds (default: {DEFAULT_INTERVAL:g})")
+    parser.add_argument("--once", action="store_true", help="Build once and exit instead of watching")
+    args = parser.parse_args()
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in WRITERS]
+    if unknown or not formats:
+        parser.error(f"--formats 只能包含：{', '.join(WRITERS)}")
+    if not os.path.isdir(args.change):
+        logger.error("变更目录不存在: %s", args.change)
+        sys.exit(1)
+    if args.interval <= 0 or args.max_topics < 1:
+        logger.error("--interval 必须大于 0，--max-topics 必须为正整数")
+        sys.exit(1)
+
+    watcher = ChangeWatcher(
+        args.change, args.name, formats,
+        {"engine": args.engine, "title": args.title, "xmind_format": args.xmind_format,
+         "reproducible": args.reproducible},
+        split_by=args.split_by, max_topics=args.max_topics,
+    )
+    for message in watcher.check():
+        print(message, flush=True)
+    if args.once:
+        return
+    print(f"正在监视 {args.change}（Ctrl+C 退出）", flush=True)
+    try:
+        while True:
+            time.sleep(args.interval)
+            for message in watcher.check():
+                print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+    except KeyboardInterrupt:
+        print("已停止监视")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+TestSpec 内置 XLSX 写出器：不依赖 openpyxl，用 zipfile 直接流式写出 SpreadsheetML。
+
+与 generate_xmind.py 写 XMind 的方式一致，各部件 XML 预先拼好，工作表按行流式写入压缩包，
+字符串进入共享字符串表（sharedStrings.xml），仅表头使用一个预置样式（加粗白字、蓝色填充、居中）。
+输出可被 Excel / WPS / openpyxl 正常打开，版式与 generate_excel.create_excel_with_openpyxl 一致。
+"""
+import os
+import re
+import zipfile
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# XML 1.0 不允许的控制字符（openpyxl 遇到会抛 IllegalCharacterError，这里直接剔除）
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# 每累积多少行向压缩流写一次，避免逐行调用 write
+_FLUSH_ROWS = 1000
+
+_CONTENT_TYPES = b"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+</Types>"""
+
+_ROOT_RELS = b"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK_RELS = b"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>
+</Relationships>"""
+
+# 样式 0：默认；样式 1：表头（与 openpyxl 版本的 Font/PatternFill/Alignment 相同）
+_STYLES = b"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2">
+<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>
+<font><b/><sz val="11"/><color rgb="00FFFFFF"/><name val="Calibri"/><family val="2"/></font>
+</fonts>
+<fills count="3">
+<fill><patternFill/></fill>
+<fill><patternFill patternType="gray125"/></fill>
+<fill><patternFill patternType="solid"><fgColor rgb="004472C4"/><bgColor rgb="004472C4"/></patternFill></fill>
+</fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+_HEADER_STYLE = 1
+
+
+def _escape(text: str) -> str:
+    text = _ILLEGAL_XML_CHARS.sub("", text)
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _column_letter(index: int) -> str:
+    """列序号（从 1 开始）转为列字母，如 1 -> A，27 -> AA。"""
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _workbook_xml(sheet_name: str) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{_escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ).encode("utf-8")
+
+
+class _SharedStrings:
+    """共享字符串表：相同文本只存一份，单元格中记录其序号。"""
+
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.count = 0
+
+    def add(self, text: str) -> int:
+        self.count += 1
+        idx = self.index.get(text)
+        if idx is None:
+            idx = self.index[text] = len(self.index)
+        return idx
+
+    def to_xml(self) -> bytes:
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'count="{self.count}" uniqueCount="{len(self.index)}">'
+        ]
+        for text in self.index:
+            escaped = _escape(text)
+            if escaped != escaped.strip():
+                parts.append(f'<si><t xml:space="preserve">{escaped}</t></si>')
+            else:
+                parts.append(f"<si><t>{escaped}</t></si>")
+        parts.append("</sst>")
+        return "".join(parts).encode("utf-8")
+
+
+def _cell_xml(ref: str, value: Any, strings: _SharedStrings, style: int = 0) -> str:
+    """生成单个单元格 XML；None 与空字符串不写出。"""
+    style_attr = f' s="{style}"' if style else ""
+    if value is None or value == "":
+        return f'<c r="{ref}"{style_attr}/>' if style else ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+    return f'<c r="{ref}"{style_attr} t="s"><v>{strings.add(str(value))}</v></c>'
+
+
+def write_xlsx(
+    output_path: str,
+    columns: List[Tuple[str, float]],
+    rows: Iterable[Sequence[Any]],
+    sheet_name: str = "Sheet1",
+) -> int:
+    """流式写出单工作表 XLSX。
+
+    Args:
+        output_path: 输出 .xlsx 路径
+        columns: 表头定义 [(名称, 列宽)]，第一行写表头并应用表头样式
+        rows: 数据行（可迭代对象，逐行消费）
+        sheet_name: 工作表名称
+
+    Returns:
+        写出的数据行数（不含表头）
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    try:
+        return _write_xlsx(output_path, columns, rows, sheet_name)
+    except BaseException:
+        # rows 是惰性读取的，中途出错（如输入 JSON 格式无效）时不留下损坏的文件
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+
+
+def _write_xlsx(
+    output_path: str,
+    columns: List[Tuple[str, float]],
+    rows: Iterable[Sequence[Any]],
+    sheet_name: str,
+) -> int:
+    letters = [_column_letter(i) for i in range(1, len(columns) + 1)]
+    strings = _SharedStrings()
+    written = 0
+
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _workbook_xml(sheet_name))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _STYLES)
+
+        with zf.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            cols = "".join(
+                f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+                for i, (_, width) in enumerate(columns, 1)
+            )
+            header = "".join(
+                _cell_xml(f"{letter}1", title, strings, _HEADER_STYLE)
+                for letter, (title, _) in zip(letters, columns)
+            )
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f"<cols>{cols}</cols><sheetData>"
+                f'<row r="1">{header}</row>'
+            ).encode("utf-8"))
+
+            buffer: List[str] = []
+            for row_num, row in enumerate(rows, 2):
+                cells = "".join(
+                    _cell_xml(f"{letter}{row_num}", value, strings)
+                    for letter, value in zip(letters, row)
+                )
+                buffer.append(f'<row r="{row_num}">{cells}</row>')
+                written += 1
+                if len(buffer) >= _FLUSH_ROWS:
+                    sheet.write("".join(buffer).encode("utf-8"))
+                    buffer.clear()
+            buffer.append("</sheetData></worksheet>")
+            sheet.write("".join(buffer).encode("utf-8"))
+
+        zf.writestr("xl/sharedStrings.xml", strings.to_xml())
+
+    return written
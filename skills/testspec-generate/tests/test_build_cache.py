@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts"
+
+# 在同一目录下连续记录 count 个产物
+RECORD_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+import build_cache
+
+base, prefix, count = sys.argv[2], sys.argv[3], int(sys.argv[4])
+cache = build_cache.BuildCache(f"{base}/{prefix}0.out", [f"{base}/testcases.json"], {})
+for i in range(count):
+    cache.key = f"{prefix}{i}.out"
+    cache.record([f"{base}/{prefix}{i}.out"])
+"""
+
+
+class TestBuildCache(unittest.TestCase):
+    def test_concurrent_processes_keep_each_others_entries(self):
+        """两个进程同时向同一清单写入记录（如并行生成 Excel 与 XMind），任何一条记录都不会丢失。"""
+        with tempfile.TemporaryDirectory() as td:
+            (Path(td) / "testcases.json").write_text("[]", encoding="utf-8")
+            count = 150
+            processes = [
+                subprocess.Popen([sys.executable, "-c", RECORD_SCRIPT, str(SCRIPTS_DIR), td, prefix, str(count)])
+                for prefix in ("excel", "xmind")
+            ]
+            for process in processes:
+                self.assertEqual(process.wait(timeout=SUBPROCESS_TIMEOUT), 0)
+
+            manifest = json.loads((Path(td) / ".build-manifest.json").read_text(encoding="utf-8"))
+            expected = {f"{prefix}{i}.out" for prefix in ("excel", "xmind") for i in range(count)}
+            self.assertEqual(set(manifest["entries"]), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
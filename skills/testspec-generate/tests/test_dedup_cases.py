@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _dedup_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "dedup_cases.py")
+
+
+def _case(case_id: str, title: str, steps: str, expected: str) -> dict:
+    return {
+        "id": case_id,
+        "title": title,
+        "feature": "登录",
+        "type": "正向",
+        "preconditions": "",
+        "steps": steps,
+        "expected_result": expected,
+        "priority": "P2",
+    }
+
+
+class TestDedupCases(unittest.TestCase):
+    def test_tokenize_cjk_bigrams_and_words(self):
+        """中文取相邻二字组，单字保留，英文/数字取小写单词。"""
+        sys.path.insert(0, str(Path(_dedup_script()).parent))
+        try:
+            from dedup_cases import tokenize
+        finally:
+            sys.path.pop(0)
+        self.assertEqual(tokenize("输入密码 Login123 后点击按钮"),
+                         ["输入", "入密", "密码", "login123", "后点", "点击", "击按", "按钮"])
+        self.assertEqual(tokenize("点 OK"), ["点", "ok"])
+
+    def test_near_duplicates_clustered(self):
+        """仅个别字不同的用例归为同一簇，无关用例不进入任何簇。"""
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("numpy 未安装")
+        steps = "1、打开登录页面\n2、输入已注册的手机号和正确的密码\n3、点击登录按钮并等待页面跳转"
+        expected = "1、登录成功后跳转到首页，页面顶部显示用户昵称和欢迎语"
+        testcases = {"testcases": [
+            _case("登录_0001", "登录_凭据验证_手机号密码登录成功", steps, expected),
+            _case("导出_0001", "导出_报表_导出月度报表", "1、进入报表中心\n2、选择月份并点击导出",
+                  "1、下载的 xlsx 文件包含当月全部订单"),
+            _case("登录_0002", "登录_凭据验证_手机号密码登录成功", steps.replace("等待", "等候"), expected),
+            _case("搜索_0001", "搜索_关键词_模糊搜索商品", "1、在搜索框输入商品名称的部分关键词\n2、回车",
+                  "1、结果列表按相关度排序展示匹配商品"),
+        ]}
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            output_path = td_path / "h1-candidates.json"
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+            subprocess.check_call(
+                [_venv_python(), _dedup_script(), "--input", str(input_path), "--output", str(output_path)],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+            result = json.loads(output_path.read_text(encoding="utf-8"))
+
+        self.assertEqual(result["cases"], 4)
+        self.assertEqual(len(result["clusters"]), 1)
+        cluster = result["clusters"][0]
+        self.assertEqual([c["id"] for c in cluster["cases"]], ["登录_0001", "登录_0002"])
+        self.assertEqual([c["index"] for c in cluster["cases"]], [1, 3])
+        self.assertGreaterEqual(cluster["max_similarity"], 0.7)
+        self.assertLess(cluster["max_similarity"], 1.0)
+        self.assertEqual(cluster["pairs"][0]["a"], "登录_0001")
+
+
+if __name__ == "__main__":
+    unittest.main()
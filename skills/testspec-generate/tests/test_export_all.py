@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _export_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "export_all.py")
+
+
+class TestExportAll(unittest.TestCase):
+    def test_export_xlsx_and_xmind_in_one_pass(self):
+        """一次加载同时写出 xlsx 与 xmind，两种执行器的产物与单独脚本一致，并输出各写出器耗时。"""
+        testcases = [
+            {"id": "TC-1", "title": "登录_成功", "feature": "登录", "type": "正向", "priority": "P1",
+             "steps": "1、登录", "expected_result": "成功"},
+            {"title": "注册_失败", "feature": "注册", "type": "负向", "priority": "P2"},
+        ]
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+
+            for executor in ("process", "thread"):
+                with self.subTest(executor=executor):
+                    xlsx_path = td_path / executor / "cases.xlsx"
+                    xmind_path = td_path / executor / "cases.xmind"
+                    result = subprocess.run(
+                        [_venv_python(), _export_script(), "--input", str(input_path),
+                         "--xlsx", str(xlsx_path), "--xmind", str(xmind_path), "--xmind-format", "zen",
+                         "--executor", executor],
+                        capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT,
+                    )
+                    self.assertEqual(result.returncode, 0, result.stderr)
+                    self.assertIn("已加载 2 条用例", result.stdout)
+                    self.assertRegex(result.stdout, r"cases\.xlsx（xlsx，\d+\.\d+s）")
+                    self.assertRegex(result.stdout, r"cases\.xmind（xmind，\d+\.\d+s）")
+
+                    wb = load_workbook(xlsx_path)
+                    rows = list(wb.active.iter_rows(min_row=2, values_only=True))
+                    self.assertEqual([r[0] for r in rows], ["TC-1", "TC-002"])
+                    with zipfile.ZipFile(xmind_path) as zf:
+                        content = zf.read("content.json").decode("utf-8")
+                    self.assertIn('"登录_成功"', content)
+                    self.assertIn('"注册_失败"', content)
+
+    def test_export_requires_an_output(self):
+        """未指定任何输出时报错退出。"""
+        with tempfile.TemporaryDirectory() as td:
+            input_path = Path(td) / "testcases.json"
+            input_path.write_text(json.dumps([{"title": "a"}]), encoding="utf-8")
+            result = subprocess.run(
+                [_venv_python(), _export_script(), "--input", str(input_path)],
+                capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT,
+            )
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("--xlsx", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import json
 import os
 import subprocess
@@ -12,6 +13,10 @@ from openpyxl import load_workbook
 # Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
 SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import utils  # noqa: E402
+
 
 def _venv_python() -> str:
     return sys.executable
@@ -168,6 +173,149 @@ class TestGenerateExcel(unittest.TestCase):
             self.assertEqual(ws.cell(row=2, column=3).value, "P1")
             wb.close()
 
+    def test_excel_layout_column_widths_and_header_style(self):
+        """内置写出器与 openpyxl 写出的工作表版式一致：列宽、表头样式、行数。"""
+        testcases = [
+            {"id": f"TC_{i:04d}", "title": f"列表_分页_第{i}条", "steps": "1、打开列表", "expected_result": "1、展示"}
+            for i in range(1, 501)
+        ]
+        testcases[0]["preconditions"] = "  前后空格 & <特殊字符>"
+        for engine in ("builtin", "openpyxl"):
+            with self.subTest(engine=engine), tempfile.TemporaryDirectory() as td:
+                td_path = Path(td)
+                input_path = td_path / "testcases.json"
+                output_path = td_path / "out.xlsx"
+                input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+
+                subprocess.check_call(
+                    [_venv_python(), _excel_script(), "--input", str(input_path), "--output", str(output_path),
+                     "--engine", engine],
+                    timeout=SUBPROCESS_TIMEOUT,
+                )
+
+                wb = load_workbook(output_path)
+                ws = wb["测试用例"]
+                widths = [ws.column_dimensions[letter].width for letter in "ABCDEFGHIJ"]
+                self.assertEqual(widths, [18, 45, 8, 25, 40, 35, 12, 10, 14, 20])
+                for cell in ws[1]:
+                    self.assertTrue(cell.font.bold)
+                    self.assertEqual(cell.font.color.rgb, "00FFFFFF")
+                    self.assertEqual(cell.fill.fgColor.rgb, "004472C4")
+                    self.assertEqual(cell.alignment.horizontal, "center")
+                self.assertEqual(ws.max_row, 501)
+                self.assertEqual(ws.cell(row=501, column=1).value, "TC_0500")
+                self.assertEqual(ws.cell(row=2, column=3).value, "P1")
+                self.assertEqual(ws.cell(row=2, column=4).value, "  前后空格 & <特殊字符>")
+                self.assertIn(ws.cell(row=2, column=7).value, (None, ""))
+                wb.close()
+
+    def test_excel_builtin_strips_illegal_xml_chars(self):
+        """内置写出器剔除 XML 不允许的控制字符，而不是生成损坏的文件。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            output_path = td_path / "out.xlsx"
+            testcases = [{"id": "TC_001", "title": "标题\x07含响铃符", "steps": "1、第一步\x0b"}]
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+
+            subprocess.check_call(
+                [_venv_python(), _excel_script(), "--input", str(input_path), "--output", str(output_path)],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+
+            wb = load_workbook(output_path, read_only=True, data_only=True)
+            ws = wb["测试用例"]
+            self.assertEqual(ws.cell(row=2, column=2).value, "标题含响铃符")
+            self.assertEqual(ws.cell(row=2, column=5).value, "1、第一步")
+            wb.close()
+
+    def test_excel_ndjson_input(self):
+        """.ndjson / .jsonl 输入（每行一个用例）流式生成 Excel。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.jsonl"
+            output_path = td_path / "out.xlsx"
+
+            lines = [json.dumps({"id": f"TC_{i:03d}", "title": f"导出_第{i}条"}, ensure_ascii=False)
+                     for i in range(1, 4)]
+            input_path.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+
+            subprocess.check_call(
+                [_venv_python(), _excel_script(), "--input", str(input_path), "--output", str(output_path)],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+
+            wb = load_workbook(output_path, read_only=True, data_only=True)
+            ws = wb["测试用例"]
+            self.assertEqual([ws.cell(row=r, column=1).value for r in (2, 3, 4)], ["TC_001", "TC_002", "TC_003"])
+            wb.close()
+
+    def test_excel_invalid_json_late_in_large_file(self):
+        """大文件靠后位置 JSON 非法时报告正确的行列号，且不留下半成品文件。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            output_path = td_path / "out.xlsx"
+
+            testcases = [{"id": f"TC_{i:05d}", "title": f"列表_分页_第{i}条", "steps": "1、打开列表"}
+                         for i in range(5000)]
+            text = json.dumps({"schema_version": 2, "testcases": testcases}, ensure_ascii=False, indent=2)
+            lines = text.split("\n")
+            # 在倒数第 3 条用例的标题中插入未转义的双引号
+            bad_line = [n for n, line in enumerate(lines, 1) if '"title"' in line][-3]
+            lines[bad_line - 1] = lines[bad_line - 1].replace("列表", '列"表', 1)
+            input_path.write_text("\n".join(lines), encoding="utf-8")
+
+            result = subprocess.run(
+                [_venv_python(), _excel_script(), "--input", str(input_path), "--output", str(output_path)],
+                capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT,
+            )
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn(f"JSON 格式无效（行 {bad_line} ", result.stderr)
+            self.assertFalse(output_path.exists())
+
+    def test_invalid_json_early_in_large_file_stops_reading(self):
+        """大文件靠前位置 JSON 非法时立即报错（行列号正确），不会为重试把整个文件读入内存。"""
+        testcases = [{"id": f"TC_{i:05d}", "title": f"列表_分页_第{i}条", "steps": "1、打开列表"}
+                     for i in range(20000)]
+        lines = json.dumps({"schema_version": 2, "testcases": testcases}, ensure_ascii=False, indent=2).split("\n")
+        lines[4] = lines[4].replace("TC_", 'T"C_', 1)
+        f = io.StringIO("\n".join(lines))
+
+        with self.assertRaises(json.JSONDecodeError) as cm:
+            list(utils._iter_json_testcases(utils._JsonStream(f)))
+        self.assertEqual(cm.exception.lineno, 5)
+        self.assertEqual(f.tell(), utils._CHUNK_SIZE)
+
+    def test_excel_unchanged_input_skips_regeneration(self):
+        """输入与选项未变化时跳过生成，产物不被改写；修改输入或 --force 时重新生成。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            output_path = td_path / "out.xlsx"
+            input_path.write_text(json.dumps([{"title": "用例一"}], ensure_ascii=False), encoding="utf-8")
+
+            def run(*extra: str) -> str:
+                result = subprocess.run(
+                    [_venv_python(), _excel_script(), "--input", str(input_path), "--output", str(output_path),
+                     *extra],
+                    capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT,
+                )
+                self.assertEqual(result.returncode, 0, result.stderr)
+                return result.stdout
+
+            self.assertIn("已生成", run())
+            mtime = output_path.stat().st_mtime_ns
+            self.assertIn("未变化，跳过", run())
+            self.assertEqual(output_path.stat().st_mtime_ns, mtime)
+            self.assertIn("已生成", run("--force"))
+            self.assertIn("已生成", run("--engine", "openpyxl"))
+
+            input_path.write_text(json.dumps([{"title": "用例二"}], ensure_ascii=False), encoding="utf-8")
+            self.assertIn("已生成", run("--engine", "openpyxl"))
+            wb = load_workbook(output_path)
+            self.assertEqual(wb.active.cell(row=2, column=2).value, "用例二")
+
 
 if __name__ == "__main__":
     unittest.main()
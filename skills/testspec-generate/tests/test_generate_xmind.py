@@ -1,3 +1,4 @@
+import io
 import json
 import os
 import subprocess
@@ -5,6 +6,7 @@ import sys
 import tempfile
 import unittest
 import zipfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
 
 # Timeout for subprocess calls (seconds) - generous timeout for file generation
@@ -153,6 +155,251 @@ class TestGenerateXMind(unittest.TestCase):
             self.assertIn("P1操作步骤：", content)
             self.assertIn("期望结果：", content)
 
+    def test_xmind_schema_v2_with_trailing_fields_streams_all_cases(self):
+        """v2 对象中 testcases 前后还有其他字段时，增量读取仍能取到全部用例。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            output_path = td_path / "out.xmind"
+
+            testcases_v2 = {
+                "schema_version": 2,
+                "source": {"specs": ["specs/login.md"]},
+                "testcases": [
+                    {"id": f"TC_{i:03d}", "title": f"登录_第{i}条", "feature": "登录", "type": "正向",
+                     "steps": "1、打开登录页"}
+                    for i in range(1, 201)
+                ],
+                "generated_at": "2026-03-02",
+            }
+            input_path.write_text(json.dumps(testcases_v2, ensure_ascii=False, indent=2), encoding="utf-8")
+
+            subprocess.check_call(
+                [_venv_python(), _xmind_script(), "--input", str(input_path), "--output", str(output_path)],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+
+            with zipfile.ZipFile(output_path, "r") as zf:
+                content = zf.read("content.xml").decode("utf-8")
+
+            self.assertIn("登录_第1条", content)
+            self.assertIn("登录_第200条", content)
+
+    def test_xmind_content_xml_well_formed_with_special_chars(self):
+        """content.xml 为合法 XML：命名空间正确，特殊字符转义，非法控制字符被剔除。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            output_path = td_path / "out.xmind"
+
+            testcases = [
+                {"title": "比较_a < b && c > d", "feature": "运算", "type": "边界", "priority": "P2",
+                 "preconditions": "含\x07控制符", "steps": "1、输入 <script>", "expected_result": "1、显示 \"&amp;\""},
+            ]
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+
+            subprocess.check_call(
+                [_venv_python(), _xmind_script(), "--input", str(input_path), "--output", str(output_path)],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+
+            with zipfile.ZipFile(output_path, "r") as zf:
+                root = ET.fromstring(zf.read("content.xml"))
+
+            ns = "{urn:xmind:xmap:xmlns:content:2.0}"
+            self.assertEqual(root.tag, f"{ns}xmap-content")
+            titles = [t.text for t in root.iter(f"{ns}title")]
+            self.assertIn("比较_a < b && c > d", titles)
+            self.assertIn("预置条件：含控制符", titles)
+            self.assertIn("P2操作步骤：1、输入 <script>", titles)
+            self.assertIn('期望结果：1、显示 "&amp;"', titles)
+            markers = [m.get("marker-id") for m in root.iter(f"{ns}marker-ref")]
+            self.assertEqual(markers, ["flag-yellow", "priority-2"])
+
+    def test_xmind_deep_hierarchy_exceeds_recursion_limit(self):
+        """层级深度远超 Python 递归上限时仍能写出（显式栈，无递归）。"""
+        sys.path.insert(0, str(Path(_xmind_script()).parent))
+        try:
+            import generate_xmind
+        finally:
+            sys.path.pop(0)
+
+        depth = sys.getrecursionlimit() * 3
+        leaf = {"title": "叶子", "fields": {"preconditions": "前置", "test_steps": "步骤", "priority": "P2"}}
+        node = leaf
+        for level in range(depth):
+            node = {"title": f"层级{level}", "children": [node]}
+
+        with tempfile.TemporaryDirectory() as td:
+            output_path = Path(td) / "deep.xmind"
+            generate_xmind.create_xmind_xmind8([{"title": "根", "children": [node]}], str(output_path), "根")
+            with zipfile.ZipFile(output_path, "r") as zf:
+                content = zf.read("content.xml").decode("utf-8")
+
+        self.assertEqual(content.count("<topic "), depth + 4)
+        self.assertIn("<title>P2操作步骤：步骤</title>", content)
+        self.assertTrue(content.endswith("</sheet></xmap-content>"))
+
+    def test_xmind_reproducible_output_is_byte_identical(self):
+        """--reproducible 时相同输入两次生成的文件逐字节相同，ID 唯一且插入用例不影响其他用例的 ID。"""
+        testcases = [
+            {"title": "登录_重复标题", "feature": "登录", "type": "正向", "steps": "1、登录"},
+            {"title": "登录_重复标题", "feature": "登录", "type": "正向", "steps": "1、登录"},
+            {"title": "注册_成功", "feature": "注册", "type": "冒烟", "priority": "P1", "steps": "1、注册"},
+        ]
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+
+            outputs = []
+            for name in ("a.xmind", "b.xmind"):
+                output_path = td_path / name
+                subprocess.check_call(
+                    [_venv_python(), _xmind_script(), "--input", str(input_path), "--output", str(output_path),
+                     "--reproducible"],
+                    timeout=SUBPROCESS_TIMEOUT,
+                )
+                outputs.append(output_path.read_bytes())
+            self.assertEqual(outputs[0], outputs[1])
+
+            def topic_ids(data: bytes) -> dict:
+                with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                    self.assertEqual({i.date_time for i in zf.infolist()}, {(1980, 1, 1, 0, 0, 0)})
+                    root = ET.fromstring(zf.read("content.xml"))
+                ns = "{urn:xmind:xmap:xmlns:content:2.0}"
+                ids = [t.get("id") for t in root.iter(f"{ns}topic")]
+                self.assertEqual(len(ids), len(set(ids)))
+                return {t.find(f"{ns}title").text: t.get("id") for t in root.iter(f"{ns}topic")}
+
+            before = topic_ids(outputs[0])
+            testcases.insert(0, {"title": "登录_新增用例", "feature": "登录", "type": "正向"})
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+            output_path = td_path / "c.xmind"
+            subprocess.check_call(
+                [_venv_python(), _xmind_script(), "--input", str(input_path), "--output", str(output_path),
+                 "--reproducible"],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+            after = topic_ids(output_path.read_bytes())
+            self.assertEqual(before["注册_成功"], after["注册_成功"])
+            self.assertEqual(before["登录_重复标题"], after["登录_重复标题"])
+
+
+    def test_xmind_zen_format_writes_content_json(self):
+        """--format zen 输出 content.json，树结构、优先级与类型标记与 XMind 8 格式一致。"""
+        testcases = [
+            {"title": "登录_成功", "feature": "登录", "type": "冒烟", "priority": "P1",
+             "preconditions": "已注册", "steps": "1、登录", "expected": "登录成功"},
+            {"title": "登录_\"引号\"", "feature": "登录", "type": "负向", "priority": "P3"},
+        ]
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+            xml_path = td_path / "cases.xmind"
+            zen_path = td_path / "cases_zen.xmind"
+            for output_path, fmt in ((xml_path, "xmind8"), (zen_path, "zen")):
+                subprocess.check_call(
+                    [_venv_python(), _xmind_script(), "--input", str(input_path), "--output", str(output_path),
+                     "--format", fmt],
+                    timeout=SUBPROCESS_TIMEOUT,
+                )
+
+            with zipfile.ZipFile(zen_path) as zf:
+                self.assertEqual(set(zf.namelist()), {"content.json", "metadata.json", "manifest.json"})
+                sheets = json.loads(zf.read("content.json").decode("utf-8"))
+            with zipfile.ZipFile(xml_path) as zf:
+                root = ET.fromstring(zf.read("content.xml"))
+
+            ns = "{urn:xmind:xmap:xmlns:content:2.0}"
+
+            def from_xml(topic) -> dict:
+                return {
+                    "title": topic.find(f"{ns}title").text or "",
+                    "markers": [m.get("marker-id") for m in topic.findall(f"{ns}marker-refs/{ns}marker-ref")],
+                    "children": [from_xml(c) for c in topic.findall(f"{ns}children/{ns}topics/{ns}topic")],
+                }
+
+            def from_json(topic) -> dict:
+                return {
+                    "title": topic["title"],
+                    "markers": [m["markerId"] for m in topic.get("markers", [])],
+                    "children": [from_json(c) for c in topic.get("children", {}).get("attached", [])],
+                }
+
+            self.assertEqual(len(sheets), 1)
+            tree = from_json(sheets[0]["rootTopic"])
+            self.assertEqual(tree, from_xml(root.find(f"{ns}sheet/{ns}topic")))
+            case = tree["children"][0]["children"][0]["children"][0]["children"][0]
+            self.assertEqual(case["title"], "登录_成功")
+            self.assertEqual(case["markers"], ["flag-green", "priority-1"])
+            self.assertEqual(case["children"][0]["title"], "预置条件：已注册")
+
+
+    def test_xmind_split_by_feature_into_sheets(self):
+        """--split-by feature 每个功能模块一个 sheet，分片内仍按用例类型顺序分组，多进程渲染结果保持顺序。"""
+        testcases = [
+            {"title": "注册_异常", "feature": "注册", "type": "异常"},
+            {"title": "登录_负向", "feature": "登录", "type": "负向"},
+            {"title": "登录_冒烟", "feature": "登录", "type": "冒烟"},
+            {"title": "支付_正向", "feature": "支付", "type": "正向"},
+        ]
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+            output_path = td_path / "cases.xmind"
+            subprocess.check_call(
+                [_venv_python(), _xmind_script(), "--input", str(input_path), "--output", str(output_path),
+                 "--split-by", "feature", "--jobs", "2"],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+            with zipfile.ZipFile(output_path) as zf:
+                root = ET.fromstring(zf.read("content.xml"))
+
+        ns = "{urn:xmind:xmap:xmlns:content:2.0}"
+        sheets = root.findall(f"{ns}sheet")
+        self.assertEqual([s.find(f"{ns}title").text for s in sheets],
+                         ["支付 - 测试用例", "注册 - 测试用例", "登录 - 测试用例"])
+        children = f"{ns}children/{ns}topics/{ns}topic"
+        type_nodes = sheets[2].findall(f"{ns}topic/{children}/{children}/{children}")
+        self.assertEqual([t.find(f"{ns}title").text for t in type_nodes], ["冒烟用例", "负向用例"])
+
+    def test_xmind_split_by_size_into_files(self):
+        """--split-by size --split-output files 按主题数上限拆成多个 .xmind，用例不丢失。"""
+        testcases = [
+            {"title": f"登录_{i}", "feature": "登录", "type": "正向", "steps": "1、登录", "expected": "成功"}
+            for i in range(30)
+        ] + [{"title": "注册_冒烟", "feature": "注册", "type": "冒烟"}]
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            input_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+            subprocess.check_call(
+                [_venv_python(), _xmind_script(), "--input", str(input_path),
+                 "--output", str(td_path / "cases.xmind"), "--split-by", "size", "--max-topics", "20",
+                 "--split-output", "files", "--format", "zen", "--jobs", "2"],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+            paths = sorted(td_path.glob("cases_*.xmind"))
+            self.assertGreater(len(paths), 1)
+            self.assertFalse((td_path / "cases.xmind").exists())
+
+            case_titles = []
+            for path in paths:
+                with zipfile.ZipFile(path) as zf:
+                    sheet = json.loads(zf.read("content.json").decode("utf-8"))[0]
+                stack, topics = [sheet["rootTopic"]], 0
+                while stack:
+                    topic = stack.pop()
+                    topics += 1
+                    if topic["title"].startswith(("登录_", "注册_")):
+                        case_titles.append(topic["title"])
+                    stack.extend(topic.get("children", {}).get("attached", []))
+                self.assertLessEqual(topics, 20)
+        self.assertEqual(sorted(case_titles), sorted(tc["title"] for tc in testcases))
+
 
 if __name__ == "__main__":
     unittest.main()
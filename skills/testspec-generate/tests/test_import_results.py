@@ -0,0 +1,119 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import generate_excel  # noqa: E402
+import xlsx_writer  # noqa: E402
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+# 回填后的表格：generate_excel 的列之后追加「耗时」列
+COLUMNS = generate_excel.COLUMNS + [("耗时", 8)]
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _import_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "import_results.py")
+
+
+def _row(case_id: str, title: str, priority: str, result: str = "", executor: str = "", date="",
+         duration: str = "") -> tuple:
+    return (case_id, title, priority, "", "1、操作", "1、成功", result, executor, date, "", duration)
+
+
+class TestImportResults(unittest.TestCase):
+    def _import(self, workbooks, *extra: str, testcases=None):
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            paths = []
+            for name, rows in workbooks:
+                path = td_path / name
+                xlsx_writer.write_xlsx(str(path), COLUMNS, rows, sheet_name="测试用例")
+                paths.append(str(path))
+            args = [_venv_python(), _import_script(), "--input", *paths, "--output", str(td_path / "results.json"),
+                    "--durations-output", str(td_path / "durations.json"), *extra]
+            if testcases is not None:
+                (td_path / "testcases.json").write_text(
+                    json.dumps({"schema_version": 2, "testcases": testcases}, ensure_ascii=False), encoding="utf-8")
+                args += ["--testcases", str(td_path / "testcases.json")]
+            subprocess.check_call(args, timeout=SUBPROCESS_TIMEOUT)
+            result = json.loads((td_path / "results.json").read_text(encoding="utf-8"))
+            durations = json.loads((td_path / "durations.json").read_text(encoding="utf-8"))
+        return result, durations
+
+    def _workbooks(self):
+        return [
+            ("round1.xlsx", [
+                _row("TC-001", "登录_密码_正确", "P1", "通过", "张三", "2026/3/5", "90s"),
+                _row("TC-002", "登录_密码_错误", "P2", "失败", "李四", 46085),  # Excel 序列号：2026-03-05
+                _row("TC-003", "支付_下单_成功", "P1"),
+            ]),
+            ("round2.xlsx", [
+                _row("TC-002", "登录_密码_错误", "P2", "Pass", "李四", "2026-03-07", "2m"),
+                _row("TC-003", "支付_下单_成功", "P1", "阻塞", "王五", "2026年3月6日"),
+                _row("TC-001", "登录_密码_正确", "P1", ""),
+            ]),
+        ]
+
+    def test_merge_latest_result_and_summary(self):
+        """同一用例以执行日期较晚的结果为准，未执行的行不覆盖已有结果；不同结论记为冲突。"""
+        result, durations = self._import(self._workbooks(), "--jobs", "2")
+        by_id = {item["id"]: item for item in result["results"]}
+        self.assertEqual(result["rows"], 6)
+        self.assertEqual(by_id["TC-001"]["status"], "passed")
+        self.assertEqual(by_id["TC-001"]["date"], "2026-03-05")
+        self.assertEqual(by_id["TC-002"]["status"], "passed")
+        self.assertEqual(by_id["TC-002"]["row"], 2)
+        self.assertTrue(by_id["TC-002"]["workbook"].endswith("round2.xlsx"))
+        self.assertEqual(by_id["TC-003"]["status"], "blocked")
+        self.assertEqual(by_id["TC-003"]["date"], "2026-03-06")
+        self.assertEqual(durations, {"TC-001": 90.0, "TC-002": 120.0})
+
+        self.assertEqual(result["conflicts_total"], 1)
+        self.assertEqual([r["status"] for r in result["conflicts"][0]["results"]], ["failed", "passed"])
+        summary = result["summary"]
+        self.assertEqual((summary["total"], summary["passed"], summary["blocked"]), (3, 2, 1))
+        self.assertEqual(summary["pass_rate"], 66.7)
+        self.assertEqual(summary["progress"], 100.0)
+        self.assertEqual(sorted(result["by_module"]), ["支付", "登录"])
+        self.assertEqual(result["by_executor"]["李四"]["passed"], 1)
+
+    def test_testcases_defines_suite(self):
+        """指定 --testcases 时未回填的用例计为未执行，工作簿中多出的编号单独列出。"""
+        testcases = [
+            {"id": "TC-001", "title": "登录_密码_正确", "priority": "P1"},
+            {"id": "TC-004", "title": "登录_验证码_过期", "priority": "P2"},
+        ]
+        result, _ = self._import(self._workbooks()[:1], testcases=testcases)
+        self.assertEqual([item["id"] for item in result["results"]], ["TC-001", "TC-004"])
+        self.assertEqual(result["results"][1]["status"], "not_run")
+        self.assertEqual(sorted(result["unknown_ids"]), ["TC-002", "TC-003"])
+        self.assertEqual(result["summary"]["progress"], 50.0)
+
+    @unittest.skipUnless(importlib.util.find_spec("openpyxl"), "openpyxl not installed")
+    def test_openpyxl_engine_matches_builtin(self):
+        builtin, _ = self._import(self._workbooks())
+        with_openpyxl, _ = self._import(self._workbooks(), "--engine", "openpyxl")
+
+        def rows(data):
+            return [{k: v for k, v in item.items() if k != "workbook"} for item in data["results"]]
+
+        self.assertEqual(rows(builtin), rows(with_openpyxl))
+        self.assertEqual(builtin["summary"], with_openpyxl["summary"])
+
+
+if __name__ == "__main__":
+    unittest.main()
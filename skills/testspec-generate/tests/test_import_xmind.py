@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import generate_xmind  # noqa: E402
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _import_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "import_xmind.py")
+
+
+def _case(case_id: str, title: str, feature: str, tc_type: str, priority: str, **extra) -> dict:
+    tc = {
+        "id": case_id,
+        "title": title,
+        "feature": feature,
+        "type": tc_type,
+        "tp_refs": [f"TP_{case_id}"],
+        "preconditions": "",
+        "steps": "1、打开页面\n2、点击 <提交> & 确认",
+        "expected_result": "1、提交成功",
+        "priority": priority,
+    }
+    tc.update(extra)
+    return tc
+
+
+TESTCASES = [
+    _case("A1", "登录_密码_重复标题", "登录", "正向", "P1", preconditions="已注册"),
+    _case("A2", "登录_密码_错误", "登录", "负向", "P2"),
+    _case("A3", "登录_密码_重复标题", "登录", "冒烟", "P1"),
+    _case("B1", "支付_下单_超时", "支付", "异常", "P3"),
+]
+
+
+class TestImportXMind(unittest.TestCase):
+    def _import(self, td_path: Path, xmind_path: Path, *extra: str) -> list:
+        output_path = td_path / "imported.json"
+        subprocess.check_call([_venv_python(), _import_script(), "--input", str(xmind_path),
+                               "--output", str(output_path), *extra], timeout=SUBPROCESS_TIMEOUT)
+        data = json.loads(output_path.read_text(encoding="utf-8"))
+        # 沿用 --base 的 v2 格式；没有 --base 时没有 tp_refs，输出 v1 数组
+        if "--base" in extra:
+            self.assertEqual(data["schema_version"], 2)
+            return data["testcases"]
+        self.assertIsInstance(data, list)
+        return data
+
+    def test_round_trip_with_base(self):
+        """XMind 8 与 Zen 两种格式导入后与原用例一致（同名用例按类型匹配，保留编号与 tp_refs）。"""
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            base_path = td_path / "testcases.json"
+            base_path.write_text(json.dumps({"schema_version": 2, "testcases": TESTCASES}, ensure_ascii=False),
+                                 encoding="utf-8")
+            structure = generate_xmind.build_xmind_structure(TESTCASES, "测试用例")
+            for fmt, create in sorted(generate_xmind.FORMATS.items()):
+                with self.subTest(fmt=fmt):
+                    xmind_path = td_path / f"{fmt}.xmind"
+                    create(structure, str(xmind_path), "测试用例")
+                    imported = self._import(td_path, xmind_path, "--base", str(base_path))
+                    self.assertEqual(sorted(imported, key=lambda tc: tc["id"]), TESTCASES)
+
+    def test_edited_map(self):
+        """测试人员修改优先级标记、步骤与旗帜，并新增用例：修改写回，新用例按前缀编号。"""
+        structure = generate_xmind.build_xmind_structure(TESTCASES, "测试用例")
+        login = next(feat for feat in structure[0]["children"][0]["children"] if feat["title"] == "登录 - 测试用例")
+        negative = next(group for group in login["children"] if group["title"] == "负向用例")
+        edited = negative["children"][0]
+        edited["markers"] = ["flag-green", "priority-3"]
+        edited["fields"]["test_steps"] = "1、改过的步骤"
+        negative["children"].append({"title": "登录_密码_锁定", "children": [],
+                                     "fields": {"preconditions": "", "test_steps": "1、连续输错",
+                                                "expected_result": "", "priority": "P2"}})
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            xmind_path = td_path / "edited.xmind"
+            generate_xmind.create_xmind_xmind8(structure, str(xmind_path), "测试用例")
+            imported = self._import(td_path, xmind_path, "--id-prefix", "NEW-")
+
+        by_title = {tc["title"]: tc for tc in imported}
+        self.assertEqual(len(imported), 5)
+        self.assertEqual(by_title["登录_密码_错误"]["type"], "冒烟")
+        self.assertEqual(by_title["登录_密码_错误"]["priority"], "P3")
+        self.assertEqual(by_title["登录_密码_错误"]["steps"], "1、改过的步骤")
+        added = by_title["登录_密码_锁定"]
+        self.assertEqual((added["feature"], added["type"], added["priority"]), ("登录", "负向", "P2"))
+        self.assertEqual(added["steps"], "1、连续输错")
+        self.assertEqual(sorted(tc["id"] for tc in imported), [f"NEW-{n:03d}" for n in range(1, 6)])
+
+
+if __name__ == "__main__":
+    unittest.main()
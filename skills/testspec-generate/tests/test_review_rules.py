@@ -0,0 +1,147 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+TESTPOINTS_MD = """# 测试点：登录
+
+## 命名字典
+
+### 模块字典
+| 模块名称 | MODULE |
+|---|---|
+| 登录 | LOGIN |
+
+### 登录模块
+
+#### 凭据验证功能
+
+##### 功能验证点 (Functional)
+
+- TP_LOGIN_CRED_001: 登录_凭据验证_正确凭据登录成功
+  - 验证要点: 正确账号密码可登录
+  - 优先级: P1
+  - 关联需求: 2.1
+
+##### 异常验证点 (Exception)
+
+- TP_LOGIN_CRED_200: 登录_凭据验证_错误密码被拒绝
+  - 验证要点: 错误密码不能登录
+  - 优先级: P2
+  - 关联需求: 2.1
+"""
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _review_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "review_rules.py")
+
+
+def _good_case(**overrides) -> dict:
+    tc = {
+        "id": "登录_202602280001",
+        "title": "登录_凭据验证_正确凭据登录成功",
+        "feature": "登录",
+        "type": "冒烟",
+        "tp_refs": ["TP_LOGIN_CRED_001"],
+        "preconditions": "1、用户已注册",
+        "steps": "1、打开登录页\n2、输入正确账号密码\n3、点击登录",
+        "expected_result": "1、登录成功并跳转首页，顶部显示欢迎语",
+        "priority": "P1",
+    }
+    tc.update(overrides)
+    return tc
+
+
+class TestReviewRules(unittest.TestCase):
+    def _review(self, testcases, *extra: str) -> dict:
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            testcases_path = td_path / "testcases.json"
+            testpoints_path = td_path / "testpoints.md"
+            output_path = td_path / "review-findings.json"
+            testcases_path.write_text(json.dumps(testcases, ensure_ascii=False), encoding="utf-8")
+            testpoints_path.write_text(TESTPOINTS_MD, encoding="utf-8")
+            subprocess.check_call(
+                [_venv_python(), _review_script(), "--testcases", str(testcases_path),
+                 "--testpoints", str(testpoints_path), "--output", str(output_path), *extra],
+                timeout=SUBPROCESS_TIMEOUT,
+            )
+            return json.loads(output_path.read_text(encoding="utf-8"))
+
+    def test_strict_mode_reports_each_rule(self):
+        """schema_version 2 为 Strict 模式：R1 按 tp_refs 统计覆盖，R2/R4/R5/R6 逐条给出问题用例。"""
+        result = self._review({
+            # schema_version 位于 testcases 之后，流式读取结束后才可知
+            "testcases": [
+                _good_case(),
+                _good_case(id="登录_202602280002", title="登陆_凭据验证_错误", type="负向", priority="P2",
+                           tp_refs=["TP_LOGIN_CRED_999"], steps="看一下", expected_result=""),
+            ],
+            "schema_version": 2,
+        })
+        self.assertEqual(result["mode"], "strict")
+        rules = result["rules"]
+
+        self.assertEqual(rules["R1"]["status"], "fail")
+        self.assertEqual(rules["R1"]["metrics"]["coverage"], 50.0)
+        self.assertEqual([f["tp_id"] for f in rules["R1"]["findings"]], ["TP_LOGIN_CRED_200"])
+
+        r2 = rules["R2"]["findings"]
+        self.assertEqual([f["id"] for f in r2], ["登录_202602280002"])
+        self.assertEqual(r2[0]["suggested_title"], "登录_凭据验证_错误")
+
+        self.assertEqual(rules["R4"]["findings"], [
+            {"id": "登录_202602280002", "title": "登陆_凭据验证_错误", "missing": ["expected_result"]},
+        ])
+        self.assertEqual(rules["R5"]["findings"][0]["problems"], ["steps 少于 10 个字符", "steps 缺少动作动词"])
+        self.assertEqual(rules["R6"]["status"], "fail")
+        self.assertEqual(rules["R6"]["findings"][0]["tp_refs"], ["TP_LOGIN_CRED_999"])
+        self.assertEqual(result["summary"], {"S1": 3, "S2": 2, "S3": 1})
+
+    def test_v2_with_partial_tp_refs_is_legacy(self):
+        """v2 但部分用例缺少 tp_refs 仍为 Legacy 模式：R1 按标题推断覆盖，R6 只给出警告。"""
+        result = self._review({"schema_version": 2, "testcases": [
+            _good_case(),
+            _good_case(id="登录_202602280002", title="登录_凭据验证_错误密码被拒绝", type="负向", priority="P2",
+                       tp_refs=[]),
+        ]})
+        self.assertEqual(result["mode"], "legacy")
+        rules = result["rules"]
+        self.assertEqual(rules["R1"]["metrics"]["method"], "title")
+        self.assertEqual(rules["R1"]["metrics"]["coverage"], 100.0)
+        self.assertEqual((rules["R6"]["status"], rules["R6"]["severity"]), ("warn", "S2"))
+        self.assertEqual(rules["R6"]["metrics"]["with_tp_refs"], 1)
+
+    def test_legacy_mode_infers_coverage_from_titles(self):
+        """无 schema_version 为 Legacy 模式：按标题推断覆盖（低置信度），R6 降级为警告；明细按上限截断。"""
+        testcases = [
+            _good_case(tp_refs=None),
+            _good_case(title="登录_凭据验证_错误密码被拒绝", type="负向", priority="P2", tp_refs=None),
+            _good_case(title="登录_凭据验证_错误密码被拒绝", type="边界", priority="P3", tp_refs=None),
+        ]
+        result = self._review(testcases, "--max-findings", "1")
+        self.assertEqual(result["mode"], "legacy")
+        rules = result["rules"]
+        self.assertEqual(rules["R1"]["status"], "pass")
+        self.assertEqual(rules["R1"]["metrics"]["confidence"], "low")
+        self.assertEqual(rules["R2"]["status"], "pass")
+        self.assertEqual(rules["R6"]["status"], "warn")
+        self.assertEqual(rules["R6"]["severity"], "S2")
+        self.assertEqual(rules["R6"]["findings_total"], 3)
+        self.assertEqual(len(rules["R6"]["findings"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
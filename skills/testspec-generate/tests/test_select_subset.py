@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import select_subset  # noqa: E402
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _select_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "select_subset.py")
+
+
+def _case(case_id: str, tc_type: str, priority: str, tp_refs, steps: int = 2, **extra) -> dict:
+    tc = {
+        "id": case_id,
+        "title": f"登录_凭据验证_{case_id}",
+        "feature": "登录",
+        "type": tc_type,
+        "tp_refs": tp_refs,
+        "preconditions": "",
+        "steps": "\n".join(f"{n}、操作{n}" for n in range(1, steps + 1)),
+        "expected_result": "1、成功",
+        "priority": priority,
+    }
+    tc.update(extra)
+    return tc
+
+
+class TestSelectSubset(unittest.TestCase):
+    def _select(self, testcases, *extra: str, durations=None, schema_version=2):
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td)
+            input_path = td_path / "testcases.json"
+            output_path = td_path / "smoke.json"
+            data = testcases if schema_version is None else {"schema_version": schema_version, "testcases": testcases}
+            input_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            args = [_venv_python(), _select_script(), "--input", str(input_path), "--output", str(output_path),
+                    "--report", str(td_path / "report.json"), *extra]
+            if durations is not None:
+                (td_path / "durations.json").write_text(json.dumps(durations), encoding="utf-8")
+                args += ["--durations", str(td_path / "durations.json")]
+            subprocess.check_call(args, timeout=SUBPROCESS_TIMEOUT)
+            result = json.loads(output_path.read_text(encoding="utf-8"))
+            report = json.loads((td_path / "report.json").read_text(encoding="utf-8"))
+        # 输出与输入格式一致：v1 输入仍写出顶层数组，不标记为 v2
+        if schema_version is None:
+            self.assertIsInstance(result, list)
+            return [tc["id"] for tc in result], report
+        self.assertEqual(result["schema_version"], schema_version)
+        return [tc["id"] for tc in result["testcases"]], report
+
+    def test_time_budget_prefers_new_coverage(self):
+        """预算内优先覆盖新的测试点：已被覆盖的 TP 不再计分，低优先级但覆盖新 TP 的用例胜出。"""
+        testcases = [
+            _case("A", "冒烟", "P1", ["TP_LOGIN_CRED_001"]),
+            _case("B", "冒烟", "P1", ["TP_LOGIN_CRED_001"]),
+            _case("C", "异常", "P3", ["TP_LOGIN_CRED_200"]),
+            _case("D", "正向", "P2", ["TP_LOGIN_CRED_001"], steps=10),
+        ]
+        # 每步 30s：A/B/C 各 60s，D 300s
+        ids, report = self._select(testcases, "--time-budget", "2m")
+        self.assertEqual(ids, ["A", "C"])
+        self.assertEqual(report["selected"]["seconds"], 120)
+        self.assertEqual(report["selected"]["coverage_keys"], 2)
+
+    def test_time_budget_falls_back_to_best_single_case(self):
+        """单位耗时贪心不如预算内价值最高的单条用例时，取后者。"""
+        keys = [("a", "b", "c", "d", "e"), ("x",)]
+        self.assertEqual(select_subset.select([3, 1], [100, 1], keys, time_budget=100), [0])
+        # 两条都放得下时仍为贪心结果
+        self.assertEqual(select_subset.select([3, 1], [100, 1], keys, time_budget=101), [0, 1])
+
+    def test_count_budget_and_measured_durations(self):
+        """实测耗时优先于 duration 字段与按步骤估算；输出保持原顺序。"""
+        testcases = [
+            _case("A", "正向", "P2", ["TP_LOGIN_CRED_001"], duration=5),
+            _case("B", "冒烟", "P1", ["TP_LOGIN_CRED_200"]),
+            _case("C", "冒烟", "P1", ["TP_LOGIN_CRED_300"]),
+        ]
+        ids, _ = self._select(testcases, "--max-cases", "2")
+        self.assertEqual(ids, ["B", "C"])
+        ids, report = self._select(testcases, "--time-budget", "70", durations={"B": 65, "C": 600})
+        self.assertEqual(ids, ["A", "B"])
+        self.assertEqual(report["selected"]["seconds"], 70)
+
+    def test_v1_input_keeps_v1_shape(self):
+        testcases = [_case("A", "冒烟", "P1", None), _case("B", "正向", "P2", None)]
+        for tc in testcases:
+            del tc["tp_refs"]
+        ids, _ = self._select(testcases, "--max-cases", "1", schema_version=None)
+        self.assertEqual(ids, ["A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
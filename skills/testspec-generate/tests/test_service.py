@@ -0,0 +1,156 @@
+import http.client
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import service  # noqa: E402
+from export_all import WRITERS  # noqa: E402
+
+
+def _cases(count: int, feature: str = "登录") -> list:
+    return [{
+        "id": f"TC-{i:03d}",
+        "title": f"{feature}_功能点_用例{i}",
+        "feature": feature,
+        "type": "正向",
+        "tp_refs": [f"TP_{i:03d}"],
+        "steps": "1、操作",
+        "expected_result": "1、成功",
+        "priority": "P1",
+    } for i in range(1, count + 1)]
+
+
+def _zip_members(data: bytes) -> dict:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self.unix_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+class TestGenerationService(unittest.TestCase):
+    def _start(self, **kwargs):
+        server = service.make_server(service.GenerationService(), port=0, **kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def _request(self, conn: http.client.HTTPConnection, method: str, path: str, body: bytes = None):
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        return response.status, response.read()
+
+    def test_concurrent_exports_match_writers(self):
+        server = self._start()
+        host, port = server.server_address
+        payloads = {
+            feature: json.dumps({"schema_version": 2, "testcases": _cases(20, feature)}, ensure_ascii=False).encode()
+            for feature in ("登录", "支付")
+        }
+        requests = [(feature, fmt) for feature in payloads for fmt in ("xlsx", "xmind")] * 4
+
+        def post(request):
+            feature, fmt = request
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+            try:
+                return request, self._request(conn, "POST", f"/{fmt}?reproducible=1&title=Cases", payloads[feature])
+            finally:
+                conn.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(post, requests))
+
+        options = {**service.DEFAULT_OPTIONS, "title": "Cases", "reproducible": True}
+        with tempfile.TemporaryDirectory() as td:
+            for (feature, fmt), (status, data) in results:
+                self.assertEqual(status, 200)
+                path = os.path.join(td, f"{feature}.{fmt}")
+                if not os.path.exists(path):
+                    WRITERS[fmt](_cases(20, feature), path, options)
+                self.assertEqual(_zip_members(data), _zip_members(Path(path).read_bytes()))
+            wb = load_workbook(os.path.join(td, "支付.xlsx"), read_only=True)
+            self.assertEqual(len(list(wb.active.iter_rows())), 21)
+            wb.close()
+
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        self.addCleanup(conn.close)
+        stats = json.loads(self._request(conn, "GET", "/health")[1])
+        self.assertEqual(stats["parse_cache"]["size"], 2)
+        self.assertEqual(stats["result_cache"]["size"], 4)
+        # 只影响 XMind 的选项不会让 Excel 重新生成
+        self._request(conn, "POST", "/xlsx?title=Other", payloads["登录"])
+        after = json.loads(self._request(conn, "GET", "/health")[1])
+        self.assertEqual(after["result_cache"]["hits"], stats["result_cache"]["hits"] + 1)
+
+        for path, payload, code in [
+            ("/xmind?xmind_format=xmind2", payloads["登录"], 400),
+            ("/xlsx?reproducible=yes", payloads["登录"], 400),
+            ("/xlsx?sheet=1", payloads["登录"], 400),
+            ("/xlsx", b'{"schema_version": 2, "testcases": [', 400),
+            ("/xlsx", b'{"schema_version": 2, "testcases": []}', 400),
+            ("/xlsx", b'[1, 2]', 400),
+            ("/xlsx", b'[null]', 400),
+            ("/xmind", b'{"testcases": "abc"}', 400),
+            ("/pdf", payloads["登录"], 404),
+        ]:
+            with self.subTest(path=path):
+                status, error = self._request(conn, "POST", path, payload)
+                self.assertEqual(status, code)
+                self.assertIn("error", json.loads(error))
+
+        # 负数 Content-Length 直接拒绝，不会在保持的连接上阻塞读取
+        conn = http.client.HTTPConnection(host, port, timeout=5)
+        self.addCleanup(conn.close)
+        conn.putrequest("POST", "/xlsx")
+        conn.putheader("Content-Length", "-1")
+        conn.endheaders()
+        self.assertEqual(conn.getresponse().status, 400)
+
+    def test_shared_modules_match_api2jmx_copies(self):
+        """共享模块在两个 skill 中各有一份，内容必须一致（见仓库 README「共享模块」）。"""
+        scripts = Path(__file__).resolve().parents[1] / "scripts"
+        other = Path(__file__).resolve().parents[2] / "api2jmx" / "scripts"
+        if not other.exists():
+            self.skipTest("api2jmx 未与 testspec-generate 一同安装")
+        for name in ("local_service.py", "build_cache.py"):
+            with self.subTest(name=name):
+                self.assertEqual((scripts / name).read_bytes(), (other / name).read_bytes())
+
+    def test_unix_socket(self):
+        if not hasattr(socket, "AF_UNIX"):
+            self.skipTest("Unix socket not supported")
+        with tempfile.TemporaryDirectory() as td:
+            sock_path = str(Path(td) / "testspec.sock")
+            self._start(unix_socket=sock_path)
+            conn = _UnixConnection(sock_path)
+            self.addCleanup(conn.close)
+            status, data = self._request(conn, "POST", "/xmind?xmind_format=zen",
+                                         json.dumps(_cases(3), ensure_ascii=False).encode())
+            self.assertEqual(status, 200)
+            self.assertIn("content.json", _zip_members(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
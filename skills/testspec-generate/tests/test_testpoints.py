@@ -0,0 +1,133 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import testpoints  # noqa: E402
+
+TESTPOINTS_MD = """# 测试点：登录
+
+## 命名字典
+
+### 模块字典
+| 模块名称 | MODULE |
+|---|---|
+| 登录 | LOGIN |
+
+### 功能点字典
+| 模块名称 | 功能点名称 | FEATURE |
+|---|---|---|
+| 登录 | 凭据验证 | CRED |
+| 登录 | 找回密码 | PWD |
+
+### 登录模块
+
+#### 凭据验证功能
+
+##### 功能验证点 (Functional)
+
+- TP_LOGIN_CRED_001: 登录_凭据验证_正确凭据登录成功
+  - 验证要点: 正确账号密码可登录
+  - 优先级: P1
+  - 关联需求: 2.1
+
+##### 异常验证点 (Exception)
+
+- TP_LOGIN_CRED_200: 登录_凭据验证_错误密码被拒绝
+  - 验证要点: 错误密码不能登录
+  - 优先级: P2
+  - 关联需求: 2.1
+
+#### 找回密码功能
+
+##### 功能验证点 (Functional)
+
+- TP_LOGIN_PWD_001: 登录_找回密码_短信验证码找回
+  - 验证要点: 通过短信验证码重置密码
+  - 优先级: P2
+  - 关联需求: 2.3
+"""
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _testpoints_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "testpoints.py")
+
+
+class TestTestPoints(unittest.TestCase):
+    def test_parse_model(self):
+        """命名字典、标题层级、TP 类别与字段、行号均被索引。"""
+        tps = testpoints.TestPointsParser().parse(TESTPOINTS_MD)
+        self.assertEqual(tps.modules, {"登录": "LOGIN"})
+        self.assertEqual(tps.features, {("登录", "凭据验证"): "CRED", ("登录", "找回密码"): "PWD"})
+        self.assertEqual(tps.hierarchy, {("登录", "凭据验证"): 18, ("登录", "找回密码"): 34})
+        self.assertEqual(list(tps.points), ["TP_LOGIN_CRED_001", "TP_LOGIN_CRED_200", "TP_LOGIN_PWD_001"])
+        self.assertEqual(tps.points["TP_LOGIN_CRED_200"], {
+            "title": "登录_凭据验证_错误密码被拒绝",
+            "module": "登录",
+            "feature": "凭据验证",
+            "category": "Exception",
+            "priority": "P2",
+            "focus": "错误密码不能登录",
+            "requirement": "2.1",
+            "line": 29,
+        })
+        self.assertEqual(tps.section_at(29), (16, 41, "登录模块"))
+        self.assertEqual(testpoints.check_naming(tps), [])
+
+    def test_incremental_reparse_only_changed_sections(self):
+        """只重新解析内容变化的段；其后各段行号随之平移，结果与全量解析一致。"""
+        parser = testpoints.TestPointsParser()
+        parser.parse(TESTPOINTS_MD)
+        edited = TESTPOINTS_MD.replace("| 登录 | LOGIN |", "| 登录 | LOGIN |\n| 注册 | REG |")
+        tps = parser.parse(edited)
+        self.assertEqual(parser.reparsed, 1)
+        self.assertEqual(parser.reused, 4)
+        self.assertEqual(tps.modules, {"登录": "LOGIN", "注册": "REG"})
+        self.assertEqual(tps.points["TP_LOGIN_PWD_001"]["line"], 39)
+        self.assertEqual(tps.to_dict(), testpoints.TestPointsParser().parse(edited).to_dict())
+
+    def test_check_naming(self):
+        """自检：字典缺失、名称前两段与标题层级不一致、TP_ID 缩写与字典不一致、TP_ID 重复。"""
+        text = TESTPOINTS_MD.replace("| 登录 | 找回密码 | PWD |\n", "").replace(
+            "TP_LOGIN_CRED_200: 登录_凭据验证_", "TP_LOGIN_CRD_200: 登录_凭证_") + (
+            "\n- TP_LOGIN_PWD_001: 登录_找回密码_邮箱找回\n  - 优先级: P3\n")
+        issues = testpoints.check_naming(testpoints.TestPointsParser().parse(text))
+        self.assertEqual([(item["line"], item["target"]) for item in issues], [
+            (28, "TP_LOGIN_CRD_200"),
+            (28, "TP_LOGIN_CRD_200"),
+            (33, "登录_找回密码"),
+            (42, "TP_LOGIN_PWD_001"),
+        ])
+        self.assertIn("与标题层级「登录_凭据验证」不一致", issues[0]["problem"])
+        self.assertEqual(issues[1]["problem"], "TP_ID 功能点缩写应为 CRED")
+        self.assertIn("首次出现于第 37 行", issues[3]["problem"])
+
+    def test_cli_check_exit_code(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "testpoints.md"
+            path.write_text(TESTPOINTS_MD, encoding="utf-8")
+            ok = subprocess.run([_venv_python(), _testpoints_script(), "--input", str(path), "--check"],
+                                capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT)
+            self.assertEqual(ok.returncode, 0, ok.stderr)
+            path.write_text(TESTPOINTS_MD.replace("| 登录 | LOGIN |", "| 登录 | LG1 |"), encoding="utf-8")
+            bad = subprocess.run([_venv_python(), _testpoints_script(), "--input", str(path), "--check"],
+                                 capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT)
+            self.assertEqual(bad.returncode, 1)
+            self.assertIn("MODULE「LG1」须为 2-5 位大写字母", bad.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
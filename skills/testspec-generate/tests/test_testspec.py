@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import testspec  # noqa: E402
+
+# Wall-clock startup check depends on machine load, so it only runs when TEST_STARTUP_TIMING=1;
+# the budget per invocation (ms) can be adjusted via TEST_STARTUP_BUDGET_MS
+STARTUP_TIMING = os.getenv('TEST_STARTUP_TIMING') == '1'
+STARTUP_BUDGET_MS = int(os.getenv('TEST_STARTUP_BUDGET_MS', str(testspec.STARTUP_BUDGET_MS)))
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _testspec_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "testspec.py")
+
+
+def _imported_modules(*args: str) -> set:
+    """运行 `python -X importtime testspec.py ...`，返回该次调用导入过的模块名。
+
+    子命令模块本身经 importlib.import_module 导入，不出现在输出中，只能看到它的依赖。
+    """
+    stderr = subprocess.run(
+        [_venv_python(), "-X", "importtime", _testspec_script(), *args],
+        capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT, check=True,
+    ).stderr
+    return {line.rsplit("|", 1)[1].strip() for line in stderr.splitlines() if line.startswith("import time:")}
+
+
+class TestTestspecCli(unittest.TestCase):
+    def test_dispatches_to_subcommand(self):
+        tc = {
+            "id": "TC-001", "title": "登录_凭据验证_正确凭据登录成功", "feature": "登录", "type": "正向",
+            "tp_refs": ["TP_LOGIN_CRED_001"], "steps": "1、输入正确凭据", "expected_result": "1、登录成功",
+            "priority": "P1",
+        }
+        with tempfile.TemporaryDirectory() as td:
+            input_path = Path(td) / "testcases.json"
+            input_path.write_text(json.dumps({"schema_version": 2, "testcases": [tc]}, ensure_ascii=False),
+                                  encoding="utf-8")
+            output_path = Path(td) / "cases.xlsx"
+            out = subprocess.run(
+                [_venv_python(), _testspec_script(), "excel", "--input", str(input_path), "--output", str(output_path)],
+                capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT, check=True,
+            ).stdout
+            self.assertIn("已生成", out)
+            self.assertTrue(output_path.exists())
+
+        usage = subprocess.run([_venv_python(), _testspec_script(), "--help"],
+                               capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT, check=True).stdout
+        for name in testspec.COMMANDS:
+            self.assertIn(name, usage)
+
+        proc = subprocess.run([_venv_python(), _testspec_script(), "excle"],
+                              capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT)
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn("未知子命令", proc.stderr)
+
+        proc = subprocess.run([_venv_python(), _testspec_script(), "xmind", "--input", "missing.json"],
+                              capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT)
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn("testspec.py xmind", proc.stderr)
+
+    def test_imports_only_invoked_subcommand(self):
+        command_modules = {module for module, _ in testspec.COMMANDS.values()}
+        self.assertFalse(_imported_modules("--help") & (command_modules | {"utils", "build_cache"}))
+
+        modules = _imported_modules("excel", "--help")
+        self.assertIn("xlsx_writer", modules)
+        self.assertFalse(modules & command_modules)
+        for heavy in ("sqlite3", "numpy", "concurrent.futures.process", "xml.dom.minidom"):
+            self.assertNotIn(heavy, modules)
+
+        # numpy 只在真正检测时导入；导出入口只在多核并行时导入进程池
+        self.assertNotIn("numpy", _imported_modules("dedup", "--help"))
+        self.assertNotIn("concurrent.futures.process", _imported_modules("export", "--help"))
+
+    @unittest.skipUnless(STARTUP_TIMING, "set TEST_STARTUP_TIMING=1 to measure startup time")
+    def test_startup_within_budget(self):
+        for name in [None, *testspec.COMMANDS]:
+            argv = [_venv_python(), _testspec_script()] + ([name] if name else []) + ["--help"]
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                subprocess.run(argv, capture_output=True, timeout=SUBPROCESS_TIMEOUT, check=True)
+                best = min(best, (time.perf_counter() - start) * 1000)
+            with self.subTest(command=name):
+                self.assertLess(best, STARTUP_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import testspec_index  # noqa: E402
+
+TESTPOINTS_MD = """# 测试点：登录
+
+### 登录模块
+
+#### 凭据验证功能
+
+##### 功能验证点 (Functional)
+
+- TP_LOGIN_CRED_001: 登录_凭据验证_正确凭据登录成功
+  - 验证要点: 正确账号密码可登录
+  - 优先级: P1
+"""
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _index_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "testspec_index.py")
+
+
+def _case(case_id: str, title: str, steps: str, tp_refs=None) -> dict:
+    return {
+        "id": case_id,
+        "title": title,
+        "feature": title.split("_")[0],
+        "type": "正向",
+        "preconditions": "",
+        "steps": steps,
+        "expected_result": "1、操作成功",
+        "priority": "P1",
+        "tp_refs": tp_refs or [],
+    }
+
+
+def _write_change(root: Path, name: str, testcases, testpoints: str = TESTPOINTS_MD) -> Path:
+    change = root / "changes" / name
+    (change / "specs").mkdir(parents=True)
+    (change / "artifacts").mkdir()
+    (change / "specs" / "testpoints.md").write_text(testpoints, encoding="utf-8")
+    path = change / "artifacts" / "testcases.json"
+    path.write_text(json.dumps({"schema_version": 2, "testcases": testcases}, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+class TestTestSpecIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "testspec"
+        self.login_cases = _write_change(self.root, "login", [
+            _case("登录_0001", "登录_凭据验证_正确凭据登录", "1、打开登录页\n2、输入短信验证码后提交", ["TP_LOGIN_CRED_001"]),
+            _case("登录_0002", "登录_凭据验证_错误密码", "1、打开登录页\n2、输入错误密码"),
+        ])
+        _write_change(self.root, "archive/login-v1", [
+            _case("登录_0001", "登录_凭据验证_旧版登录", "1、打开旧版登录页", ["TP_LOGIN_CRED_001"]),
+        ])
+        self.conn = testspec_index.connect(str(self.root / testspec_index.DEFAULT_DB_NAME))
+
+    def tearDown(self):
+        self.conn.close()
+        self._tmp.cleanup()
+
+    def test_incremental_update(self):
+        """首次全部导入；未变化的文件跳过，修改的文件重新导入，删除的文件移除。"""
+        stats = testspec_index.update_index(self.conn, str(self.root))
+        self.assertEqual(stats, {"updated": 4, "unchanged": 0, "removed": 0, "failed": 0})
+        self.assertEqual(testspec_index.update_index(self.conn, str(self.root))["updated"], 0)
+
+        self.login_cases.write_text(json.dumps([_case("登录_0003", "登录_凭据验证_新增", "1、打开登录页")],
+                                               ensure_ascii=False), encoding="utf-8")
+        (self.root / "changes" / "archive" / "login-v1" / "specs" / "testpoints.md").unlink()
+        stats = testspec_index.update_index(self.conn, str(self.root))
+        self.assertEqual(stats, {"updated": 1, "unchanged": 2, "removed": 1, "failed": 0})
+        cases = testspec_index.find_cases(self.conn, module="登录")
+        self.assertEqual([(c["change"], c["case_id"]) for c in cases],
+                         [("archive/login-v1", "登录_0001"), ("login", "登录_0003")])
+        # 旧记录已从全文索引中删除
+        self.assertEqual(testspec_index.search(self.conn, "错误密码"), [])
+
+    def test_queries(self):
+        testspec_index.update_index(self.conn, str(self.root))
+        # 不少于 3 个字符走 FTS5，更短的词退化为 LIKE，多个词需同时命中
+        self.assertEqual([c["case_id"] for c in testspec_index.search(self.conn, "短信验证码")], ["登录_0001"])
+        self.assertEqual([c["change"] for c in testspec_index.search(self.conn, "旧版 登录")], ["archive/login-v1"])
+        self.assertEqual([c["change"] for c in testspec_index.find_cases(self.conn, tp_id="TP_LOGIN_CRED_001")],
+                         ["archive/login-v1", "login"])
+        points = testspec_index.find_points(self.conn, tp_id="TP_LOGIN_CRED_001", change="login")
+        self.assertEqual(points[0]["cases"], 1)
+        self.assertEqual(points[0]["line"], 9)
+
+        duplicates = testspec_index.find_duplicates(self.conn)
+        self.assertEqual([d["tp_id"] for d in duplicates["tp_ids"]], ["TP_LOGIN_CRED_001"])
+        self.assertEqual([o["change"] for o in duplicates["case_ids"][0]["occurrences"]],
+                         ["archive/login-v1", "login"])
+
+    def test_unparsable_files_are_skipped(self):
+        """JSON 在首批写入之后才出错、testpoints.md 不是 UTF-8：跳过该文件，索引保持完好。"""
+        testspec_index.update_index(self.conn, str(self.root))
+        cases = [_case(f"登录_{i:04d}", f"登录_凭据验证_批量用例{i}", "1、打开登录页") for i in range(1, 2501)]
+        text = json.dumps({"schema_version": 2, "testcases": cases}, ensure_ascii=False)
+        broken = text[:text.rindex("}, {")] + "}, oops {" + text[text.rindex("}, {") + 4:]
+        self.login_cases.write_text(broken, encoding="utf-8")
+        (self.root / "changes" / "archive" / "login-v1" / "specs" / "testpoints.md").write_bytes(
+            TESTPOINTS_MD.encode("gbk"))
+
+        stats = testspec_index.update_index(self.conn, str(self.root))
+        self.assertEqual(stats, {"updated": 0, "unchanged": 2, "removed": 0, "failed": 2})
+        self.assertEqual([c["change"] for c in testspec_index.find_cases(self.conn, module="登录")],
+                         ["archive/login-v1"])
+        self.assertEqual(testspec_index.search(self.conn, "批量用例"), [])
+        self.assertEqual([c["change"] for c in testspec_index.search(self.conn, "旧版登录页")], ["archive/login-v1"])
+        self.assertEqual(self.conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+
+        # 修复后再次更新即可重新导入
+        self.login_cases.write_text(text, encoding="utf-8")
+        stats = testspec_index.update_index(self.conn, str(self.root))
+        self.assertEqual(stats, {"updated": 1, "unchanged": 2, "removed": 0, "failed": 1})
+        self.assertEqual(len(testspec_index.search(self.conn, "批量用例", limit=5000)), 2500)
+
+    def test_cli_updates_before_query(self):
+        result = subprocess.run(
+            [_venv_python(), _index_script(), "cases", "--root", str(self.root), "--tp", "TP_LOGIN_CRED_001",
+             "--change", "login"],
+            capture_output=True, text=True, encoding="utf-8", timeout=SUBPROCESS_TIMEOUT, check=True,
+        )
+        self.assertEqual([c["case_id"] for c in json.loads(result.stdout)], ["登录_0001"])
+
+
+if __name__ == "__main__":
+    unittest.main()
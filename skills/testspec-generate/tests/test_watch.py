@@ -0,0 +1,152 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Timeout for subprocess calls (seconds) - generous timeout for file generation
+# Can be overridden via TEST_SUBPROCESS_TIMEOUT environment variable
+SUBPROCESS_TIMEOUT = int(os.getenv('TEST_SUBPROCESS_TIMEOUT', '60'))
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import watch  # noqa: E402
+
+
+def _venv_python() -> str:
+    return sys.executable
+
+
+def _watch_script() -> str:
+    pkg_root = Path(__file__).resolve().parents[1]
+    return str(pkg_root / "scripts" / "watch.py")
+
+
+def _case(case_id: str, feature: str, **extra) -> dict:
+    tc = {
+        "id": case_id,
+        "title": f"{feature}_功能点_{case_id}",
+        "feature": feature,
+        "type": "正向",
+        "tp_refs": [f"TP_{case_id}"],
+        "steps": "1、操作",
+        "expected_result": "1、成功",
+        "priority": "P1",
+    }
+    tc.update(extra)
+    return tc
+
+
+TESTPOINTS_MD = """# 测试点
+
+## 命名字典
+
+### 模块字典
+| 模块名称 | MODULE |
+|---|---|
+| 登录 | LOGIN |
+
+### 功能点字典
+| 模块名称 | 功能点名称 | FEATURE |
+|---|---|---|
+| 登录 | 凭据验证 | CRED |
+
+### 登录模块
+
+#### 凭据验证功能
+
+- TP_LOGIN_CRED_001: 登录_凭据验证_正确凭据登录成功
+  - 优先级: P1
+"""
+
+
+class TestChangeWatcher(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.change = Path(self._tmp.name) / "demo"
+        (self.change / "artifacts").mkdir(parents=True)
+        self.testcases_path = self.change / "artifacts" / "testcases.json"
+        self.testcases = [_case("A1", "登录"), _case("A2", "登录"), _case("B1", "支付")]
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _save(self, path: Path, text: str) -> None:
+        """写入并推进 mtime，避免同一时钟刻度内的两次保存被当作未变化。"""
+        previous = path.stat().st_mtime_ns if path.exists() else 0
+        path.write_text(text, encoding="utf-8")
+        os.utime(path, ns=(previous + 10**9, previous + 10**9))
+
+    def _save_cases(self) -> None:
+        self._save(self.testcases_path, json.dumps({"schema_version": 2, "testcases": self.testcases},
+                                                   ensure_ascii=False))
+
+    def test_regenerates_only_affected_artifacts_and_sheets(self):
+        self._save_cases()
+        watcher = watch.ChangeWatcher(str(self.change), split_by="feature", options={"reproducible": True})
+        messages = watcher.check()
+        xlsx = self.change / "artifacts" / "demo_cases.xlsx"
+        xmind = self.change / "artifacts" / "demo_cases.xmind"
+        self.assertTrue(xlsx.exists() and xmind.exists())
+        self.assertEqual(watcher.rendered_sheets, 2)
+        self.assertTrue(any("testpoints.md" in m for m in messages))
+        self.assertEqual(watcher.check(), [])
+
+        # 只改 tp_refs：两个产物的可见内容都不变
+        xmind_bytes = xmind.read_bytes()
+        self.testcases[0]["tp_refs"] = ["TP_OTHER"]
+        self._save_cases()
+        self.assertTrue(all(m.startswith("未受影响") for m in watcher.check()))
+
+        # 改「登录」的一条用例：Excel 重写，XMind 只重新渲染「登录」sheet
+        self.testcases[1]["steps"] = "1、改过的操作"
+        self._save_cases()
+        messages = watcher.check()
+        self.assertTrue(all(m.startswith("已生成") for m in messages), messages)
+        self.assertEqual(watcher.rendered_sheets, 1)
+        self.assertNotEqual(xmind.read_bytes(), xmind_bytes)
+
+        # 保存到一半的文件：只提示，不抛出异常，也不改动产物
+        self._save(self.testcases_path, '{"schema_version": 2, "testcases": [')
+        self.assertIn("等待下次保存", watcher.check()[0])
+
+        # 同一份用例由独立进程生成的结果与监视模式一致，且构建缓存清单已更新
+        self.testcases[1]["steps"] = "1、改过的操作"
+        self._save_cases()
+        watcher.check()
+        out = subprocess.run(
+            [_venv_python(), str(Path(_watch_script()).with_name("generate_xmind.py")),
+             "--input", str(self.testcases_path), "--output", str(xmind),
+             "--split-by", "feature", "--reproducible"],
+            capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT, check=True,
+        ).stdout
+        self.assertIn("未变化，跳过", out)
+
+    def test_testpoints_reparsed_incrementally(self):
+        points = self.change / "specs" / "testpoints.md"
+        points.parent.mkdir()
+        self._save(points, TESTPOINTS_MD)
+        watcher = watch.ChangeWatcher(str(self.change), formats=["xlsx"])
+        messages = watcher.check()
+        self.assertTrue(any("1 个测试点" in m and "命名问题 0 个" in m for m in messages), messages)
+
+        self._save(points, TESTPOINTS_MD + "- TP_LOGIN_CRED_002: 登录_错误的功能点_标题\n  - 优先级: P2\n")
+        messages = watcher.check()
+        self.assertIn("复用", messages[0])
+        self.assertNotIn("命名问题 0 个", messages[0])
+        self.assertTrue(any("TP_LOGIN_CRED_002" in m for m in messages[1:]), messages)
+
+    def test_once_cli(self):
+        self._save_cases()
+        out = subprocess.run([_venv_python(), _watch_script(), "--change", str(self.change), "--once",
+                              "--formats", "xlsx"],
+                             capture_output=True, text=True, timeout=SUBPROCESS_TIMEOUT, check=True).stdout
+        self.assertIn("已生成", out)
+        self.assertTrue((self.change / "artifacts" / "demo_cases.xlsx").exists())
+        self.assertFalse((self.change / "artifacts" / "demo_cases.xmind").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()